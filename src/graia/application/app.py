@@ -0,0 +1,2245 @@
+import asyncio
+import atexit
+import functools
+import hashlib
+import io
+import tempfile
+import time
+import traceback
+from contextlib import asynccontextmanager, nullcontext
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import aiohttp.client_exceptions
+import aiohttp.web_exceptions
+import aiohttp.client_ws
+from aiohttp import ClientSession, FormData
+from aiohttp.http_websocket import WSMsgType
+from graia.application.event import MiraiEvent, load_events
+from graia.application.event.lifecycle import (  # for init lifecycle events
+    ApplicationLaunched,
+    ApplicationLaunchedBlocking,
+    ApplicationShutdowned,
+)
+from graia.broadcast import Broadcast
+from graia.broadcast.entities.event import Dispatchable
+from graia.broadcast.entities.listener import Listener
+from graia.broadcast.utilles import printer, run_always_await
+from yarl import URL
+
+from graia.application.event.network import (
+    RemoteException,
+    SessionRefreshFailed,
+    SessionRefreshed,
+)
+
+from .codec import JsonCodec, StdlibJsonCodec, default_codec
+from .contact import ContactDirectory
+from .context import application, enter_context, enter_message_send_context
+from .entities import MiraiConfig, UploadMethods
+from .event.decoder import EventDecoder, strict_decoder
+from .event.messages import FriendMessage, GroupMessage, TempMessage
+from .exceptions import (
+    InvaildArgument,
+    InvaildSession,
+    InvaildVerifyKey,
+    NotSupportedVersion,
+    UploadStreamConsumed,
+    UploadTooLarge,
+)
+from .friend import Friend
+from .group import Group, GroupConfig, Member, MemberInfo, FileList, FileInfo
+from .ingestion import IngestionQueue
+from .logger import AbstractLogger, LoggingLogger
+from .media import MediaClient
+from .message import BotMessage
+from .message.chain import MessageChain
+from .message.elements import external
+from .message.elements.internal import Image, Source, Voice
+from .message_store import MessageStore
+from .polling import AdaptivePoller
+from .reconnect import ReconnectPolicy
+from .scheduler import SendScheduler
+from .session import Session
+from .startup import StartupPipeline
+from .upload_cache import (
+    UploadCache,
+    UploadSource,
+    digest_bytes,
+    digest_file,
+    digest_fileobj,
+)
+from .utilles import (
+    AppMiddlewareAsDispatcher,
+    LimitedStream,
+    SinceVersion,
+    applicationContextManager,
+    install_once,
+    iterate_file,
+    iterate_stream,
+    raise_for_return_code,
+    requireAuthenticated,
+    yes_or_no,
+)
+
+if TYPE_CHECKING:
+    from .message.parser.router import CommandRouter
+
+# 使 `Broadcast.findEvent` (以及 `broadcast.receiver("MemberJoinEvent")` 等)能以类型名找到所有内置事件.
+load_events()
+
+
+def error_wrapper(network_action_callable: Callable):
+    @functools.wraps(network_action_callable)
+    async def wrapped_network_action_callable(self: "GraiaMiraiApplication", *args, **kwargs):
+        running_count = 0
+
+        while running_count < 5:
+            running_count += 1
+            try:
+                return await network_action_callable(self, *args, **kwargs)
+            except InvaildSession as invaild_session_exc:
+                self.logger.error("Graia detected a invaild session, did you restart your mirai-console?")
+                self.logger.error("refreshing session, because of an invaild session.")
+
+                step_count = 0
+                while step_count < 5:
+                    step_count += 1
+                    await asyncio.sleep(
+                        self.reconnect_policy.delay(step_count - 1) if self.reconnect_policy is not None else 5
+                    )
+                    self.logger.error("refreshing session...")
+                    try:
+                        await self.authenticate()
+                        await self.activeSession()
+                        await self.switch_event_detect_method()
+                        self.broadcast.postEvent(SessionRefreshed())
+                        break
+                    except Exception as e:
+                        self.logger.error(
+                            "failed to refreshing session, we had retried {0} times, and we will have a try again.".format(
+                                running_count
+                            )
+                        )
+                        traceback.print_exc()
+                        continue
+                else:
+                    self.logger.error("failed to refreshing session at last, so raise the error.")
+                    self.broadcast.postEvent(SessionRefreshFailed())
+                    raise invaild_session_exc
+            except aiohttp.web_exceptions.HTTPNotFound:
+                raise NotSupportedVersion(
+                    "{}: this action does not supported because remote returned 404.".format(
+                        network_action_callable.__name__
+                    )
+                )
+            except aiohttp.web_exceptions.HTTPInternalServerError as e:
+                self.broadcast.postEvent(RemoteException())
+                self.logger.error("the remote throwed a exception, please check the console!")
+                raise
+            except (
+                aiohttp.web_exceptions.HTTPMethodNotAllowed,
+                aiohttp.web_exceptions.HTTPRequestURITooLong,
+                aiohttp.web_exceptions.HTTPTooManyRequests,
+            ):
+
+                self.logger.error(
+                    "ouch! it seems that we post in a wrong way for the action '{}', you should open a issue for Graia Application.".format(
+                        network_action_callable.__name__
+                    )
+                )
+                raise
+            except aiohttp.web_exceptions.HTTPRequestTimeout:
+                self.logger.error("timeout on {}, retry after 5 seconds...".format(network_action_callable.__name__))
+                await asyncio.sleep(5)
+                continue
+
+    return wrapped_network_action_callable
+
+
+class GraiaMiraiApplication:
+    """本类的实例即 应用实例(Application), 是面向 `mirai-api-http` 接口的实际功能实现.
+    你的应用大多都围绕着本类及本类的实例展开.
+
+    Attributes:
+        broadcast (Broadcast): 被指定的, 外置的事件系统, 即 `Broadcast Control`,
+            通常你不需要干涉该属性;
+        session (ClientSession): 即 `aiohttp.ClientSession` 的实例, 用于与 `mirai-api-http` 通讯.
+        connect_info (Session): 用于描述会话对象, 其中最重要的属性是 `verifyKey`, 用于存储当前的会话标识.
+        authenticated (bool): 是否持有通过 `authenticate` 获取, 且尚未经 `signout` 释放的会话标识;
+            为 True 时 `shutdown` 会释放该会话.
+        logger (AbstractLogger): 日志系统实现类的实例, 默认以 `logging` 为日志驱动.
+        contacts (ContactDirectory): 联系人目录, `getGroup`, `getMember` 和 `getFriend` 通过其查询并缓存结果.
+        json_codec (JsonCodec): JSON 编解码器, 用于所有接口的请求体, 响应与 websocket 推送的数据;
+            默认按 `orjson`, `ujson`, `json` 的顺序选用首个可用的实现.
+        event_decoder (EventDecoder): 事件解码器; 当 `trusted_upstream` 为 True 且未开启调试模式时,
+            接收到的事件将跳过 pydantic 的逐字段校验, 直接通过预先编译的构造器解码;
+            当 `lazy_message_chain` 为 True 时, 事件中的消息链将在第一次被访问时才进行解码
+            (开启聊天日志时, 每条消息都会在记录日志时被解码).
+        ingestion (Optional[IngestionQueue]): 事件摄入队列; 若指定, 接收到的事件会先进入该有界队列,
+            再由固定数量的工作者交由 `Broadcast` 处理, 否则直接调用 `broadcast.postEvent`.
+        send_scheduler (Optional[SendScheduler]): 发送调度器; 若指定, 发送的消息将按发送对象与全局的速率限制,
+            以轮转的方式依次发出.
+        upload_cache (Optional[UploadCache]): 上传缓存; 若指定, 上传图片与语音前会以内容的哈希查询此前上传的结果.
+        max_upload_size (Optional[int]): 上传图片与语音时允许的最大字节数, 为 None 时不作限制;
+            大小未知的数据流在超过限制时会被立即中止.
+        media (MediaClient): 用于下载消息元素中媒体资源的 HTTP 客户端, 与 `session` 相互独立,
+            拥有各自的连接池, 并发限制, DNS 缓存与超时设置; 仅当其由应用实例自行创建时, 才会在 `shutdown` 时被关闭.
+        reconnect_policy (Optional[ReconnectPolicy]): websocket 的重连策略; 若指定, 断线重连与刷新会话将以指数退避进行,
+            重新连接后会先补取断线期间积压的事件; 否则以固定的间隔重试, 且不进行补取.
+        http_poller (Optional[AdaptivePoller]): 自适应的 HTTP 轮询器; 若指定, 未启用 websocket 时将由其获取事件,
+            否则以固定的间隔与数量进行轮询.
+        message_store (Optional[MessageStore]): 消息存储; 若指定, 接收到的消息事件与自身发出的消息将被记录,
+            `messageFromId` 会优先从中查询接收到的消息, 未找到时才请求 `mirai-api-http`.
+        command_router (Optional[CommandRouter]): 命令路由器; 若指定, 分发消息事件时将以前缀树一次性找出
+            所有前缀匹配的 `Literature`, 并直接略过其余带有 `Literature` 的监听器.
+        startup_pipeline (Optional[StartupPipeline]): 启动流水线; 若指定, `initialize` 将并发地进行相互独立的启动步骤,
+            预热惰性状态, 尽早开始接收事件, 并输出各阶段的耗时; 否则依次进行各个步骤.
+    """
+
+    __slots__ = (
+        "broadcast",
+        "session",
+        "connect_info",
+        "authenticated",
+        "logger",
+        "debug",
+        "chat_log_enabled",
+        "group_message_log_format",
+        "friend_message_log_format",
+        "temp_message_log_format",
+        "json_loader",
+        "json_codec",
+        "contacts",
+        "event_decoder",
+        "ingestion",
+        "send_scheduler",
+        "upload_cache",
+        "max_upload_size",
+        "media",
+        "_owns_media",
+        "command_router",
+        "message_store",
+        "http_poller",
+        "reconnect_policy",
+        "startup_pipeline",
+    )
+
+    broadcast: Optional[Broadcast]
+    session: ClientSession
+    connect_info: Session
+    authenticated: bool
+    logger: AbstractLogger
+    debug: bool
+    chat_log_enabled: bool
+
+    group_message_log_format: str
+    friend_message_log_format: str
+    temp_message_log_format: str
+
+    json_loader: Callable[[Any], Any]
+    json_codec: JsonCodec
+
+    contacts: ContactDirectory
+    event_decoder: EventDecoder
+    ingestion: Optional[IngestionQueue]
+    send_scheduler: Optional[SendScheduler]
+    upload_cache: Optional[UploadCache]
+    max_upload_size: Optional[int]
+    command_router: Optional["CommandRouter"]
+    message_store: Optional[MessageStore]
+    http_poller: Optional[AdaptivePoller]
+    reconnect_policy: Optional[ReconnectPolicy]
+    startup_pipeline: Optional[StartupPipeline]
+    media: MediaClient
+    _owns_media: bool
+
+    def __init__(
+        self,
+        *,
+        broadcast: Optional[Broadcast],
+        connect_info: Session,
+        session: Optional[ClientSession] = None,
+        logger: Optional[AbstractLogger] = None,
+        debug: bool = False,
+        enable_chat_log: bool = True,
+        group_message_log_format: str = "{bot_id}: [{group_name}({group_id})] {member_name}({member_id}) -> {message_string}",
+        friend_message_log_format: str = "{bot_id}: [{friend_name}({friend_id})] -> {message_string}",
+        temp_message_log_format: str = "{bot_id}: [{group_name}({group_id}.{member_name}({member_id})] -> {message_string}",
+        json_loader: Optional[Callable[[Any], Any]] = None,
+        json_codec: Optional[JsonCodec] = None,
+        contact_cache_ttl: float = 300.0,
+        contact_cache_size: int = 256,
+        trusted_upstream: bool = False,
+        ingestion: Optional[IngestionQueue] = None,
+        send_scheduler: Optional[SendScheduler] = None,
+        upload_cache: Optional[UploadCache] = None,
+        max_upload_size: Optional[int] = None,
+        media_client: Optional[MediaClient] = None,
+        command_router: Optional["CommandRouter"] = None,
+        lazy_message_chain: bool = False,
+        message_store: Optional[MessageStore] = None,
+        http_poller: Optional[AdaptivePoller] = None,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        startup_pipeline: Optional[StartupPipeline] = None,
+    ):
+        self.broadcast = broadcast
+        self.connect_info = connect_info
+        self.authenticated = False
+        self.logger = logger or LoggingLogger(**({"debug": True} if debug else {}))
+        self.debug = debug
+        self.session = session or ClientSession(loop=broadcast.loop)
+        # if debug:
+        #    from .test.request_tracing import HttpRequestTracing
+        #    self.session = HttpRequestTracing(self.logger).build_session(self.session)
+
+        self.chat_log_enabled = enable_chat_log
+        self.contacts = ContactDirectory(self, ttl=contact_cache_ttl, max_groups=contact_cache_size)
+
+        if broadcast is not None:
+            if install_once(self.broadcast, "middleware"):
+                self.broadcast.dispatcher_interface.inject_global_raw(AppMiddlewareAsDispatcher(self))
+            if self.contacts.enabled:
+                self.contacts.install(self.broadcast)
+            if message_store is not None:
+                message_store.install(self.broadcast)
+            if self.chat_log_enabled and install_once(self.broadcast, "chat_log"):
+                self.broadcast.receiver("GroupMessage")(self.logger_group_message)
+                self.broadcast.receiver("FriendMessage")(self.logger_friend_message)
+                self.broadcast.receiver("TempMessage")(self.logger_temp_message)
+
+        self.group_message_log_format = group_message_log_format
+        self.friend_message_log_format = friend_message_log_format
+        self.temp_message_log_format = temp_message_log_format
+
+        # `json_loader` 为旧有的参数, 仅在未指定 `json_codec` 时生效.
+        self.json_codec = json_codec or (StdlibJsonCodec(json_loader) if json_loader else default_codec())
+        self.json_loader = self.json_codec.loads
+        self.event_decoder = EventDecoder(trusted=trusted_upstream and not debug, lazy=lazy_message_chain)
+        self.ingestion = ingestion
+        self.send_scheduler = send_scheduler
+        self.upload_cache = upload_cache
+        self.max_upload_size = max_upload_size
+        self.media = media_client or MediaClient()
+        # 由外部传入的媒体下载客户端可能被多个应用实例共用, 应由其创建者关闭.
+        self._owns_media = media_client is None
+        self.command_router = command_router
+        self.message_store = message_store
+        self.http_poller = http_poller
+        self.reconnect_policy = reconnect_policy
+        self.startup_pipeline = startup_pipeline
+
+    def logger_group_message(self, event: GroupMessage):
+        app = application.get(self)
+        if app is not self:  # 由共用 Broadcast 的其他应用实例接收
+            if app.chat_log_enabled:
+                app.logger_group_message(event)
+            return
+        self.logger.info(
+            self.group_message_log_format.format_map(
+                dict(
+                    group_id=event.sender.group.id,
+                    group_name=event.sender.group.name,
+                    member_id=event.sender.id,
+                    member_name=event.sender.name,
+                    member_permission=event.sender.permission.name,
+                    bot_id=self.connect_info.account,
+                    bot_permission=event.sender.group.accountPerm.name,
+                    message_string=event.messageChain.asSerializationString().__repr__(),
+                )
+            )
+        )
+
+    def logger_friend_message(self, event: FriendMessage):
+        app = application.get(self)
+        if app is not self:
+            if app.chat_log_enabled:
+                app.logger_friend_message(event)
+            return
+        self.logger.info(
+            self.friend_message_log_format.format_map(
+                dict(
+                    bot_id=self.connect_info.account,
+                    friend_name=event.sender.nickname,
+                    friend_id=event.sender.id,
+                    message_string=event.messageChain.asSerializationString().__repr__(),
+                )
+            )
+        )
+
+    def logger_temp_message(self, event: TempMessage):
+        app = application.get(self)
+        if app is not self:
+            if app.chat_log_enabled:
+                app.logger_temp_message(event)
+            return
+        self.logger.info(
+            self.temp_message_log_format.format_map(
+                dict(
+                    group_id=event.sender.group.id,
+                    group_name=event.sender.group.name,
+                    member_id=event.sender.id,
+                    member_name=event.sender.name,
+                    member_permission=event.sender.permission.name,
+                    bot_id=self.connect_info.account,
+                    bot_permission=event.sender.group.accountPerm.name,
+                    message_string=event.messageChain.asSerializationString().__repr__(),
+                )
+            )
+        )
+
+    def url_gen(self, path) -> str:
+        """从 connect_info 和 path 生成接口的地址.
+
+        Args:
+            path (str): 需求的接口地址
+
+        Returns:
+            str: 作为结果的地址
+        """
+        return str(URL(str(self.connect_info.host)).parent / path)
+
+    @SinceVersion(1, 6, 2)
+    @error_wrapper
+    @applicationContextManager
+    async def getVersion(self, auto_set=True) -> Tuple:
+        """从 `/about` 路由下获取当前使用的 `mirai-api-http` 版本, 注意, 该 API 并不是一开始就有的(1.6.2 版本才支持本接口).
+
+        Args:
+            auto_set (bool, optional): 是否自动将版本存入 connect_info 以判断接口是否有效. Defaults to True.
+
+        Returns:
+            Tuple: 以元组形式表示的版本信息.
+        """
+        async with self.session.get(self.url_gen("about")) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            version = tuple(int(i[1:] if i.startswith("v") else i) for i in data["data"]["version"].split("."))
+            if auto_set:
+                self.connect_info.current_version = version
+            return version
+
+    @applicationContextManager
+    async def authenticate(self) -> str:
+        """从路由 `/verify` 下获取尚未被激活的会话标识并返回; 通常的, 你还需要使用 `activeSession` 方法激活它.
+        需 mirai-api-http 处启用 `enableVerify` 才可使用。
+
+        Returns:
+            str: 即返回的会话标识
+        """
+        if self.connect_info.verifyKey is None:
+            raise InvaildVerifyKey("require non-null verifykey.")
+        async with self.session.post(
+            self.url_gen("verify"),
+            data=self.json_codec.payload({"verifyKey": self.connect_info.verifyKey}),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            self.connect_info.verifyKey = data["session"]
+            self.authenticated = True
+            return data["session"]
+
+    @applicationContextManager
+    async def activeSession(self) -> NoReturn:
+        """激活当前已经存入 connect_info 的会话标识,
+        如果没有事先调用 `authenticate` 方法获取未激活的会话标识, 则会触发 `InvaildSession` 错误.
+        若于 mirai-api-http 处启用了 `singleMode`, 该方法不应该被执行, 但仍然建议在 Session 处填写 `account` 字段.
+
+        Raises:
+            InvaildSession: 没有事先调用 `authenticate` 方法获取未激活的会话标识
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        if not self.connect_info.verifyKey:
+            raise InvaildSession("you should call 'authenticate' before this to get a verifyKey!")
+        async with self.session.post(
+            self.url_gen("bind"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "qq": self.connect_info.account,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @requireAuthenticated
+    @applicationContextManager
+    async def signout(self) -> NoReturn:
+        """释放当前激活/未激活的会话标识
+
+        Raises:
+            InvaildSession: 没有事先调用 `authenticate` 方法获取会话标识
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        if not self.connect_info.verifyKey:
+            raise InvaildSession("you should call 'authenticate' before this to get a verifyKey!")
+        async with self.session.post(
+            self.url_gen("release"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "qq": self.connect_info.account,
+                }
+            ),
+        ) as response:
+            self.connect_info.verifyKey = None
+            self.authenticated = False
+
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getGroup(self, group_id: int) -> Optional[Group]:
+        """尝试从已知的群组唯一ID, 获取对应群组的信息; 可能返回 None.
+        结果来自联系人目录 `contacts`, 仅在缓存未命中或过期时请求群组列表.
+
+        Args:
+            group_id (int): 尝试获取的群组的唯一 ID.
+
+        Returns:
+            Group: 操作成功, 你得到了你应得的.
+            None: 未能获取到.
+        """
+        return await self.contacts.getGroup(group_id)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def groupList(self) -> List[Group]:
+        """获取当前会话账号所加入的所有群组的信息.
+
+        Returns:
+            List[Group]: 当前会话账号所加入的所有群组的信息
+        """
+        async with self.session.get(
+            str(URL(self.url_gen("groupList")).with_query({"verifyKey": self.connect_info.verifyKey}))
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            return [Group.parse_obj(i) for i in data["data"]]
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getMember(self, group: Union[Group, int], member_id: int) -> Optional[Member]:
+        """尝试从已知的群组唯一 ID 和已知的群组成员的 ID, 获取对应成员的信息; 可能返回 None.
+        结果来自联系人目录 `contacts`, 仅在缓存未命中或过期时请求该群组的成员列表.
+
+        Args:
+            group_id (Union[Group, int]): 已知的群组唯一 ID
+            member_id (int): 已知的群组成员的 ID
+
+        Returns:
+            Member: 操作成功, 你得到了你应得的.
+            None: 未能获取到.
+        """
+        return await self.contacts.getMember(group.id if isinstance(group, Group) else group, member_id)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def memberList(self, group: Union[Group, int]) -> List[Member]:
+        """获取群组中所有群组成员的信息
+
+        Args:
+            group (Union[Group, int]): 群组/群组ID
+
+        Returns:
+            List[Member]: 即群组中所有成员的可被获取到的信息.
+        """
+        async with self.session.get(
+            str(
+                URL(self.url_gen("memberList")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        "target": group.id if isinstance(group, Group) else group,
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            return [Member.parse_obj(i) for i in data["data"]]
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def friendList(self) -> List[Friend]:
+        """获取当前会话账号所拥有的所有好友的信息
+
+        Returns:
+            List[Friend]: 当前会话账号所拥有的所有好友的信息
+        """
+        async with self.session.get(
+            str(URL(self.url_gen("friendList")).with_query({"verifyKey": self.connect_info.verifyKey}))
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            return [Friend.parse_obj(i) for i in data["data"]]
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getFriend(self, friend_id: int) -> Optional[Friend]:
+        """从已知的可能的好友 ID, 获取 Friend 实例.
+        结果来自联系人目录 `contacts`, 仅在缓存未命中或过期时请求好友列表.
+
+        Args:
+            friend_id (int): 已知的可能的好友 ID.
+
+        Returns:
+            Friend: 操作成功, 你得到了你应得的.
+            None: 未能获取到.
+        """
+        return await self.contacts.getFriend(friend_id)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def uploadImage(
+        self,
+        image_bytes: UploadSource,
+        method: UploadMethods,
+        return_external: bool = False,
+    ) -> Union[Image, external.Image]:
+        """上传一张图片到远端服务器, 需要提供: 图片的原始数据(bytes), 图片的上传类型; 你可以控制是否返回外部态的 Image 消息元素.
+        若配置了上传缓存, 则相同内容的图片只会以同一种上传类型上传一次.
+        Args:
+            image_bytes (UploadSource): 图片的原始数据, 图片文件的路径, 以二进制模式打开的文件对象, 异步的数据流,
+                或每次调用时重新打开数据源的函数; 除 bytes 外均以流的方式上传, 其中异步的数据流在失败后无法重试.
+            method (UploadMethods): 图片的上传类型
+            return_external (bool, optional): 是否返回外部态的 Image 消息元素. 默认为 False.
+        Returns:
+            Image(internal): 内部态的 Image 消息元素
+            Image(external): 外部态的 Image 消息元素
+        """
+        resp_json = await self._upload("image", "img", image_bytes, method)
+        external_component = external.Image.parse_obj(resp_json)
+        if return_external:
+            return external_component
+        else:
+            return Image.fromExternal(external_component)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def uploadVoice(
+        self,
+        voice_bytes: UploadSource,
+        method: UploadMethods = UploadMethods.Group,
+        return_external: bool = False,
+    ) -> Union[Voice, external.Voice]:
+        """上传一份语音数据(类型为原始 bytes)到远端服务器, 需要提供: 语音的原始数据(bytes), 语音的上传类型(默认为 Group); 你可以控制是否返回外部态的 Voice 消息元素.
+        若配置了上传缓存, 则相同内容的语音只会以同一种上传类型上传一次.
+
+        Args:
+            voice_bytes (UploadSource): 语音的原始数据, 语音文件的路径, 以二进制模式打开的文件对象, 异步的数据流,
+                或每次调用时重新打开数据源的函数; 除 bytes 外均以流的方式上传, 其中异步的数据流在失败后无法重试.
+            method (UploadMethods): 语音的上传类型, 默认为 `UploadMethods.Group`.
+            return_external (bool, optional): 是否返回外部态的 Voice 消息元素. 默认为 False.
+
+        Returns:
+            Voice(internal): 内部态的 Voice 消息元素
+            Voice(external): 外部态的 Voice 消息元素
+        """
+        resp_json = await self._upload("voice", "voice", voice_bytes, method)
+        external_component = external.Voice.parse_obj(resp_json)
+        if return_external:
+            return external_component
+        else:
+            return Voice.fromExternal(external_component)
+
+    async def _upload(
+        self, kind: str, field: str, data: UploadSource, method: UploadMethods, reopenable: bool = False
+    ) -> dict:
+        """上传图片或语音, 并返回远端的响应; 若配置了上传缓存, 则先以内容的哈希查询缓存.
+        除 bytes 外, 数据均以流的方式上传, 不会被完整地读入内存.
+
+        Args:
+            kind (str): 资源种类, 为 `image` 或 `voice`, 对应接口 `uploadImage` 与 `uploadVoice`.
+            field (str): 表单中承载数据的字段名.
+            data (UploadSource): 原始数据, 文件的路径, 以二进制模式打开的文件对象, 异步的数据流, 或重新打开数据源的函数.
+            method (UploadMethods): 上传类型.
+            reopenable (bool, optional): 数据流是否由重新打开数据源的函数得到, 即重试时是否会被重新打开.
+
+        Raises:
+            UploadTooLarge: 数据的大小超过了 `max_upload_size`.
+            UploadStreamConsumed: 一次性的数据流已被读取, 而上传因可以重试的原因失败.
+
+        Returns:
+            dict: 远端的响应, 或此前缓存的响应.
+        """
+        # 计算哈希需要读取全部数据, 因此在线程池中进行, 以免大文件或较慢的磁盘阻塞事件循环.
+        loop = asyncio.get_event_loop()
+        if callable(data):
+            # `error_wrapper` 的每次重试都会再次调用本方法, 因此数据源会被重新打开.
+            async with data() as opened:
+                if self.upload_cache is None:
+                    return await self._upload(kind, field, opened, method, reopenable=True)
+                # 数据流的哈希只有在读取完毕后才能得到; 先将其暂存到临时文件中, 使得缓存在上传之前即可被查询.
+                with tempfile.TemporaryFile() as spool:
+                    async for chunk in LimitedStream(
+                        iterate_stream(opened)
+                        if asyncio.iscoroutinefunction(getattr(opened, "read", None))
+                        else opened,
+                        self.max_upload_size,
+                    ):
+                        await loop.run_in_executor(None, spool.write, chunk)
+                    spool.seek(0)
+                    return await self._upload(kind, field, spool, method, reopenable=True)
+
+        digest = None
+        stream = None
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            self.check_upload_size(len(data))
+            if self.upload_cache is not None:
+                digest = await loop.run_in_executor(None, digest_bytes, data)
+        elif isinstance(data, Path):
+            self.check_upload_size(data.stat().st_size)
+            if self.upload_cache is not None:
+                digest = await loop.run_in_executor(None, digest_file, data)
+        elif hasattr(data, "__aiter__"):
+            # `aiohttp.StreamReader` 与 `asyncio.StreamReader` 等异步数据流同样具有 `read` 方法,
+            # 因此需先于文件对象判断.
+            data = stream = LimitedStream(
+                iterate_stream(data) if asyncio.iscoroutinefunction(getattr(data, "read", None)) else data,
+                self.max_upload_size,
+                hashlib.sha1() if self.upload_cache is not None else None,
+            )
+        else:
+            seekable = getattr(data, "seekable", None)
+            if seekable is not None and seekable():
+                position = data.tell()
+                self.check_upload_size(data.seek(0, io.SEEK_END) - position)
+                data.seek(position)
+                if self.upload_cache is not None:
+                    digest = await loop.run_in_executor(None, digest_fileobj, data)
+            else:
+                data = stream = LimitedStream(
+                    iterate_file(data),
+                    self.max_upload_size,
+                    hashlib.sha1() if self.upload_cache is not None else None,
+                )
+
+        if digest is not None:
+            cached = await self.upload_cache.lookup(kind, method, digest)
+            if cached is not None:
+                return cached
+
+        form = FormData()
+        form.add_field("verifyKey", self.connect_info.verifyKey)
+        form.add_field("type", method.value)
+        with (data.open("rb") if isinstance(data, Path) else nullcontext(data)) as value:
+            form.add_field(field, value, filename=field)
+            try:
+                async with self.session.post(self.url_gen("upload" + kind.capitalize()), data=form) as response:
+                    response.raise_for_status()
+                    resp_json = self.json_codec.loads(await response.read())
+                    raise_for_return_code(resp_json)
+            except Exception as e:
+                if stream is not None and stream.exceeded:
+                    # 中止数据流所引发的异常可能被 aiohttp 包装为其他的异常.
+                    raise UploadTooLarge(
+                        "the data is larger than the limit of {0} bytes".format(self.max_upload_size)
+                    ) from None
+                if (
+                    not reopenable
+                    and not isinstance(data, (bytes, bytearray, memoryview, Path))
+                    and isinstance(e, (InvaildSession, aiohttp.web_exceptions.HTTPRequestTimeout))
+                ):
+                    # 数据流与文件对象(会被 aiohttp 关闭)都无法被重新上传, 重试只会上传空的或不完整的数据.
+                    raise UploadStreamConsumed(
+                        "the stream has been consumed by a failed upload and cannot be uploaded again"
+                    ) from e
+                raise
+
+        if stream is not None and stream.hasher is not None:
+            digest = stream.hasher.hexdigest()
+        if digest is not None:
+            await self.upload_cache.store(
+                kind,
+                method,
+                digest,
+                {key: resp_json.get(key) for key in (kind + "Id", "url")},
+            )
+        return resp_json
+
+    def check_upload_size(self, size: Optional[int]) -> None:
+        """检查将要上传的数据的大小是否超过了 `max_upload_size`.
+
+        Args:
+            size (Optional[int]): 数据的字节数, 为 None (例如未知的 Content-Length)时不作检查.
+
+        Raises:
+            UploadTooLarge: 数据的大小超过了限制.
+        """
+        if self.max_upload_size is not None and size is not None and size > self.max_upload_size:
+            raise UploadTooLarge(
+                "the data ({0} bytes) is larger than the limit of {1} bytes".format(size, self.max_upload_size)
+            )
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def sendFriendMessage(
+        self,
+        target: Union[Friend, int],
+        message: MessageChain,
+        *,
+        quote: Optional[Union[Source, int]] = None,
+    ) -> BotMessage:
+        """发送消息给好友, 可以指定回复的消息.
+
+        Args:
+            target (Union[Friend, int]): 指定的好友
+            message (MessageChain): 有效的, 可发送的(Sendable)消息链.
+            quote (Optional[Union[Source, int]], optional): 需要回复的消息, 不要忽视我啊喂?!!, 默认为 None.
+
+        Returns:
+            BotMessage: 即当前会话账号所发出消息的元数据, 内包含有一 `messageId` 属性, 可用于回复.
+        """
+        with enter_message_send_context(UploadMethods.Friend):
+            message_result = await message.build()
+        target = target.id if isinstance(target, Friend) else target
+        return await self._post_message(
+            "sendFriendMessage",
+            ("Friend", target),
+            {"target": target},
+            message_result,
+            quote,
+            "Friend({0})".format(target),
+        )
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def sendGroupMessage(
+        self,
+        group: Union[Group, int],
+        message: MessageChain,
+        *,
+        quote: Optional[Union[Source, int]] = None,
+    ) -> BotMessage:
+        """发送消息到群组内, 可以指定回复的消息.
+
+        Args:
+            group (Union[Group, int]): 指定的群组, 可以是群组的 ID 也可以是 Group 实例.
+            message (MessageChain): 有效的, 可发送的(Sendable)消息链.
+            quote (Optional[Union[Source, int]], optional): 需要回复的消息, 不要忽视我啊喂?!!, 默认为 None.
+
+        Returns:
+            BotMessage: 即当前会话账号所发出消息的元数据, 内包含有一 `messageId` 属性, 可用于回复.
+        """
+        with enter_message_send_context(UploadMethods.Group):
+            message_result = await message.build()
+        group = group.id if isinstance(group, Group) else group
+        return await self._post_message(
+            "sendGroupMessage",
+            ("Group", group),
+            {"target": group},
+            message_result,
+            quote,
+            "Group({0})".format(group),
+        )
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def sendTempMessage(
+        self,
+        group: Union[Group, int],
+        target: Union[Member, int],
+        message: MessageChain,
+        *,
+        quote: Optional[Union[Source, int]] = None,
+    ) -> BotMessage:
+        """发送临时会话给群组中的特定成员, 可指定回复的消息.
+
+        Args:
+            group (Union[Group, int]): 指定的群组, 可以是群组的 ID 也可以是 Group 实例.
+            target (Union[Member, int]): 指定的群组成员, 可以是成员的 ID 也可以是 Member 实例.
+            message (MessageChain): 有效的, 可发送的(Sendable)消息链.
+            quote (Optional[Union[Source, int]], optional): 需要回复的消息, 不要忽视我啊喂?!!, 默认为 None.
+
+        Returns:
+            BotMessage: 即当前会话账号所发出消息的元数据, 内包含有一 `messageId` 属性, 可用于回复.
+        """
+        with enter_message_send_context(UploadMethods.Temp):
+            message_result = await message.build()
+        group = group.id if isinstance(group, Group) else group
+        target = target.id if isinstance(target, Member) else target
+        return await self._post_message(
+            "sendTempMessage",
+            ("Temp", group, target),
+            {"group": group, "qq": target},
+            message_result,
+            quote,
+            "Member({0}, in {1})".format(target, group),
+        )
+
+    async def _post_message(
+        self,
+        route: str,
+        target: Hashable,
+        payload: dict,
+        message_result: MessageChain,
+        quote: Optional[Union[Source, int]],
+        description: str,
+    ) -> BotMessage:
+        """发出一条已经构建好的消息; 若配置了发送调度器, 则经由调度器限速后发出.
+
+        Args:
+            route (str): 发送消息所使用的接口.
+            target (Hashable): 发送对象的标识, 用于发送调度器的限速与轮转.
+            payload (dict): 请求体中标识发送对象的字段.
+            message_result (MessageChain): 已经构建好的消息链.
+            quote (Optional[Union[Source, int]]): 需要回复的消息.
+            description (str): 日志中发送对象的描述.
+
+        Raises:
+            SendQueueFull: 发送调度器中等待发送的消息过多.
+
+        Returns:
+            BotMessage: 即当前会话账号所发出消息的元数据.
+        """
+
+        async def post() -> BotMessage:
+            async with self.session.post(
+                self.url_gen(route),
+                data=self.json_codec.payload(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        **payload,
+                        "messageChain": message_result.dict()["__root__"],
+                        **({"quote": quote.id if isinstance(quote, Source) else quote} if quote else {}),
+                    }
+                ),
+            ) as response:
+                response.raise_for_status()
+                data = self.json_codec.loads(await response.read())
+                raise_for_return_code(data)
+
+            self.logger.info(
+                "[BOT {bot_id}] {target} <- {message}".format_map(
+                    {
+                        "bot_id": self.connect_info.account,
+                        "target": description,
+                        "message": message_result.asSerializationString().__repr__(),
+                    }
+                )
+            )
+            if self.message_store is not None:
+                self.message_store.addSent(data["messageId"], target, message_result, self.connect_info.account)
+            return BotMessage(messageId=data["messageId"])
+
+        if self.send_scheduler is None:
+            return await post()
+        return await self.send_scheduler.submit(target, post)
+
+    @error_wrapper
+    async def _post_built_message(
+        self,
+        target: Union[Group, Friend, Member],
+        message_result: MessageChain,
+        quote: Optional[Union[Source, int]] = None,
+    ) -> BotMessage:
+        if isinstance(target, Group):
+            return await self._post_message(
+                "sendGroupMessage",
+                ("Group", target.id),
+                {"target": target.id},
+                message_result,
+                quote,
+                "Group({0})".format(target.id),
+            )
+        elif isinstance(target, Friend):
+            return await self._post_message(
+                "sendFriendMessage",
+                ("Friend", target.id),
+                {"target": target.id},
+                message_result,
+                quote,
+                "Friend({0})".format(target.id),
+            )
+        return await self._post_message(
+            "sendTempMessage",
+            ("Temp", target.group.id, target.id),
+            {"group": target.group.id, "qq": target.id},
+            message_result,
+            quote,
+            "Member({0}, in {1})".format(target.id, target.group.id),
+        )
+
+    @requireAuthenticated
+    @applicationContextManager
+    async def multicast(
+        self,
+        targets: Iterable[Union[Group, Friend, Member]],
+        message: MessageChain,
+        *,
+        quote: Optional[Union[Source, int]] = None,
+        concurrency: int = 8,
+    ) -> List[Tuple[Union[Group, Friend, Member], Union[BotMessage, Exception]]]:
+        """将同一条消息发送给多个对象: 群组, 好友, 或群组成员(临时会话).
+
+        消息链对于每种上传方式(`UploadMethods`)只会构建一次, 其中的图片, 语音等元素只会上传一次,
+        并被所有同类的发送对象共用; 发送时最多同时进行 `concurrency` 个请求, 若配置了发送调度器, 也同样受其限速.
+        单个对象发送失败不会影响其他对象.
+
+        Args:
+            targets (Iterable[Union[Group, Friend, Member]]): 发送对象; 为 Member 时发送临时会话.
+            message (MessageChain): 有效的, 可发送的(Sendable)消息链.
+            quote (Optional[Union[Source, int]], optional): 需要回复的消息, 默认为 None.
+            concurrency (int, optional): 同时进行的发送请求的最大数量, 至少为 1, 默认为 8.
+
+        Raises:
+            ValueError: `concurrency` 小于 1.
+            TypeError: 发送对象中存在 Group, Friend 与 Member 以外的类型.
+
+        Returns:
+            List[Tuple[Union[Group, Friend, Member], Union[BotMessage, Exception]]]: 与 `targets` 顺序一致的,
+                由发送对象与其结果组成的列表; 发送失败时结果为所引发的异常.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        targets = list(targets)
+        methods = {
+            Group: UploadMethods.Group,
+            Friend: UploadMethods.Friend,
+            Member: UploadMethods.Temp,
+        }
+        for target in targets:
+            if target.__class__ not in methods:
+                raise TypeError(
+                    "unsupported multicast target: {0!r}, " "expected Group, Friend or Member".format(target)
+                )
+
+        built = {}
+        for method in {methods[target.__class__] for target in targets}:
+            with enter_message_send_context(method):
+                try:
+                    built[method] = await message.build()
+                except Exception as e:
+                    built[method] = e
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(target):
+            message_result = built[methods[target.__class__]]
+            if isinstance(message_result, Exception):
+                return target, message_result
+            async with semaphore:
+                try:
+                    return target, await self._post_built_message(target, message_result, quote)
+                except Exception as e:
+                    return target, e
+
+        return list(await asyncio.gather(*[send(target) for target in targets]))
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def revokeMessage(self, target: Union[Source, BotMessage, int]) -> NoReturn:
+        """撤回特定的消息; 撤回自己的消息需要在发出后 2 分钟内才能成功撤回; 如果在群组内, 需要撤回他人的消息则需要管理员/群主权限.
+
+        Args:
+            target (Union[Source, BotMessage, int]): 特定信息的 `messageId`, 可以是 `Source` 实例, `BotMessage` 实例或者是单纯的 int 整数.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        if isinstance(target, BotMessage):
+            target = target.messageId
+        elif isinstance(target, Source):
+            target = target.id
+
+        async with self.session.post(
+            self.url_gen("recall"),
+            data=self.json_codec.payload({"verifyKey": self.connect_info.verifyKey, "target": target}),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @requireAuthenticated
+    @applicationContextManager
+    async def fetchMessage(self, count: int = 10) -> List[Union[GroupMessage, TempMessage, FriendMessage]]:
+        """从路由 `/fetchMessage` 处获取指定数量的消息; 当关闭 Websocket 时, 该方法被用于获取事件.
+
+        Args:
+            count (int, optional): 消息获取的数量. 默认为 10.
+
+        Returns:
+            List[Union[GroupMessage, TempMessage, FriendMessage]]: 获取到的消息
+        """
+        return self.decode_events(await self.fetchRawMessage(count))
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def fetchRawMessage(self, count: int = 10) -> List[dict]:
+        """从路由 `/fetchMessage` 处获取指定数量的消息, 但不进行解码; 可在之后通过 `decode_events` 解码.
+
+        Args:
+            count (int, optional): 消息获取的数量. 默认为 10.
+
+        Returns:
+            List[dict]: 获取到的, 序列化态的事件
+        """
+        async with self.session.get(
+            str(
+                URL(self.url_gen("fetchMessage")).with_query({"verifyKey": self.connect_info.verifyKey, "count": count})
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            return data["data"]
+
+    def decode_events(self, data: List[dict]) -> List[MiraiEvent]:
+        """解码通过 HTTP 轮询获取到的事件; 无法解码的事件会被记录并略过.
+
+        Args:
+            data (List[dict]): 序列化态的事件.
+
+        Returns:
+            List[MiraiEvent]: 解码得到的事件.
+        """
+        result = []
+        for event in data:
+            if self.debug:
+                self.logger.debug("http polling received: " + str(event))
+            try:
+                result.append(self.event_decoder.decode(event))
+            except ValueError:
+                self.logger.error(
+                    "".join(
+                        [
+                            "received a unknown event: ",
+                            event.get("type"),
+                            str(event),
+                        ]
+                    )
+                )
+                continue
+        return result
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def fetchLatestMessage(self, count: int = 10) -> List[Union[GroupMessage, TempMessage, FriendMessage]]:
+        async with self.session.get(
+            str(
+                URL(self.url_gen("fetchLatestMessage")).with_query(
+                    {"verifyKey": self.connect_info.verifyKey, "count": count}
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            result = []
+            for event in data["data"]:
+                if self.debug:
+                    self.logger.debug("http polling received: " + str(event))
+                try:
+                    result.append(self.event_decoder.decode(event))
+                except ValueError:
+                    self.logger.error(
+                        "".join(
+                            [
+                                "received a unknown event: ",
+                                event.get("type"),
+                                str(event),
+                            ]
+                        )
+                    )
+                    continue
+            return result
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def peekMessage(self, count: int = 10) -> List[Union[GroupMessage, TempMessage, FriendMessage]]:
+        async with self.session.get(
+            str(URL(self.url_gen("peekMessage")).with_query({"verifyKey": self.connect_info.verifyKey, "count": count}))
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            result = []
+            for event in data["data"]:
+                if self.debug:
+                    self.logger.debug("http polling received: " + str(event))
+                try:
+                    result.append(self.event_decoder.decode(event))
+                except ValueError:
+                    self.logger.error(
+                        "".join(
+                            [
+                                "received a unknown event: ",
+                                event.get("type"),
+                                str(event),
+                            ]
+                        )
+                    )
+                    continue
+            return result
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def peekLatestMessage(self, count: int = 10) -> List[Union[GroupMessage, TempMessage, FriendMessage]]:
+        async with self.session.get(
+            str(
+                URL(self.url_gen("peekLatestMessage")).with_query(
+                    {"verifyKey": self.connect_info.verifyKey, "count": count}
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            result = []
+            for event in data["data"]:
+                if self.debug:
+                    self.logger.debug("http polling received: " + str(event))
+                try:
+                    result.append(self.event_decoder.decode(event))
+                except ValueError:
+                    self.logger.error(
+                        "".join(
+                            [
+                                "received a unknown event: ",
+                                event.get("type"),
+                                str(event),
+                            ]
+                        )
+                    )
+                    continue
+            return result
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def messageFromId(self, source: Union[Source, int]) -> Union[GroupMessage, TempMessage, FriendMessage]:
+        """尝试从已知的 `messageId` 获取缓存中的消息; 若指定了消息存储, 则优先从中查询.
+
+        Args:
+            source (Union[Source, int]): 需要获取的消息的 `messageId`
+
+        Returns:
+            Union[GroupMessage, TempMessage, FriendMessage]: 获取到的消息
+        """
+        if self.message_store is not None:
+            event = await self.message_store.lookupEvent(source.id if isinstance(source, Source) else source)
+            if event is not None:
+                return event
+        async with self.session.get(
+            str(
+                URL(self.url_gen("messageFromId")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        "id": source.id if isinstance(source, Source) else source,
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            try:
+                return self.event_decoder.decode(data["data"])
+            except ValueError:
+                self.logger.error(
+                    "".join(
+                        [
+                            "received a unknown event: ",
+                            data["data"].get("type"),
+                            str(data),
+                        ]
+                    )
+                )
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def countMessage(self) -> int:
+        """获取 `mirai-api-http` 内部缓存中的消息的数量
+
+        Returns:
+            int: 缓存中的消息的数量
+        """
+        async with self.session.get(
+            str(
+                URL(self.url_gen("countMessage")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            return data["data"]
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def muteAll(self, group: Union[Group, int]) -> NoReturn:
+        """在指定群组开启全体禁言, 需要当前会话账号在指定群主有相应权限(管理员或者群主权限)
+
+        Args:
+            group (Union[Group, int]): 指定的群组.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        async with self.session.post(
+            self.url_gen("muteAll"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def unmuteAll(self, group: Union[Group, int]) -> NoReturn:
+        """在指定群组关闭全体禁言, 需要当前会话账号在指定群主有相应权限(管理员或者群主权限)
+
+        Args:
+            group (Union[Group, int]): 指定的群组.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        async with self.session.post(
+            self.url_gen("unmuteAll"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def mute(self, group: Union[Group, int], member: Union[Member, int], time: int) -> NoReturn:
+        """在指定群组禁言指定群成员; 需要具有相应权限(管理员/群主); `time` 不得大于 `30*24*60*60=2592000` 或小于 `0`, 否则会自动修正;
+        当 `time` 小于等于 `0` 时, 不会触发禁言操作; 禁言对象极有可能触发 `PermissionError`, 在这之前请对其进行判断!
+
+        Args:
+            group (Union[Group, int]): 指定的群组
+            member (Union[Member, int]): 指定的群成员(只能是普通群员或者是管理员, 后者则要求群主权限)
+            time (int): 禁言事件, 单位秒, 修正规则: `{time|0 < time <= 2592000}`
+
+        Raises:
+            PermissionError: 没有相应操作权限.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        time = max(0, min(time, 2592000))
+        if time == 0:
+            return
+        async with self.session.post(
+            self.url_gen("mute"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "memberId": member.id if isinstance(member, Member) else member,
+                    "time": time,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def unmute(self, group: Union[Group, int], member: Union[Member, int]) -> NoReturn:
+        """在指定群组解除对指定群成员的禁言; 需要具有相应权限(管理员/群主); 对象极有可能触发 `PermissionError`, 在这之前请对其进行判断!
+
+        Args:
+            group (Union[Group, int]): 指定的群组
+            member (Union[Member, int]): 指定的群成员(只能是普通群员或者是管理员, 后者则要求群主权限)
+
+        Raises:
+            PermissionError: 没有相应操作权限.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        async with self.session.post(
+            self.url_gen("unmute"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "memberId": member.id if isinstance(member, Member) else member,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def kick(
+        self,
+        group: Union[Group, int],
+        member: Union[Member, int],
+        message: Optional[str] = None,
+    ) -> NoReturn:
+        """将目标群组成员从指定群组删除; 需要具有相应权限(管理员/群主)
+
+        Args:
+            group (Union[Group, int]): 指定的群组
+            member (Union[Member, int]): 指定的群成员(只能是普通群员或者是管理员, 后者则要求群主权限)
+            message (Optional[str], optional): 如果给出, 则作为该操作的利益并向对象展示; 在当前版本中, 指定本参数无效. 默认为 None.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        async with self.session.post(
+            self.url_gen("kick"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "memberId": member.id if isinstance(member, Member) else member,
+                    **({"msg": message} if message else {}),
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def quit(self, group: Union[Group, int]) -> NoReturn:
+        """主动从指定群组退出
+
+        Args:
+            group (Union[Group, int]): 需要退出的指定群组
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        async with self.session.post(
+            self.url_gen("quit"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getGroupConfig(self, group: Union[Group, int]) -> GroupConfig:
+        """获取指定群组的群设置
+
+        Args:
+            group (Union[Group, int]): 需要获取群设置的指定群组
+
+        Returns:
+            GroupConfig: 指定群组的群设置
+        """
+        async with self.session.get(
+            str(
+                URL(self.url_gen("groupConfig")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        "target": group.id if isinstance(group, Group) else group,
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            return GroupConfig.parse_obj(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def modifyGroupConfig(self, group: Union[Group, int], config: GroupConfig) -> NoReturn:
+        """修改指定群组的群设置; 需要具有相应权限(管理员/群主).
+
+        Args:
+            group (Union[Group, int]): 需要修改群设置的指定群组
+            config (GroupConfig): 经过修改后的群设置
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        async with self.session.post(
+            self.url_gen("groupConfig"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "config": config.dict(exclude_none=True, exclude_unset=True, by_alias=True),
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getMemberInfo(self, member: Union[Member, int], group: Optional[Union[Group, int]] = None) -> MemberInfo:
+        """获取指定群组成员的可修改状态.
+
+        Args:
+            member (Union[Member, int]): 指定群成员, 可为 Member 实例, 若前设成立, 则不需要提供 group.
+            group (Optional[Union[Group, int]], optional): 如果 member 为 Member 实例, 则不需要提供本项, 否则需要. 默认为 None.
+
+        Raises:
+            TypeError: 提供了错误的参数, 阅读有关文档得到问题原因
+
+        Returns:
+            MemberInfo: 指定群组成员的可修改状态
+        """
+        if not group and not isinstance(member, Member):
+            raise TypeError("you should give a Member instance if you cannot give a Group instance to me.")
+        if isinstance(member, Member) and not group:
+            group: Group = member.group
+        async with self.session.get(
+            str(
+                URL(self.url_gen("memberInfo")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        "target": group.id if isinstance(group, Group) else group,
+                        "memberId": member.id if isinstance(member, Member) else member,
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            return MemberInfo.parse_obj(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def modifyMemberInfo(
+        self,
+        member: Union[Member, int],
+        info: MemberInfo,
+        group: Optional[Union[Group, int]] = None,
+    ) -> NoReturn:
+        """修改指定群组成员的可修改状态; 需要具有相应权限(管理员/群主).
+
+        Args:
+            member (Union[Member, int]): 指定的群组成员, 可为 Member 实例, 若前设成立, 则不需要提供 group.
+            info (MemberInfo): 已修改的指定群组成员的可修改状态
+            group (Optional[Union[Group, int]], optional): 如果 member 为 Member 实例, 则不需要提供本项, 否则需要. 默认为 None.
+
+        Raises:
+            TypeError: 提供了错误的参数, 阅读有关文档得到问题原因
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        if not group and not isinstance(member, Member):
+            raise TypeError("you should give a Member instance if you cannot give a Group instance to me.")
+        if isinstance(member, Member) and not group:
+            group: Group = member.group
+        async with self.session.post(
+            self.url_gen("memberInfo"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "memberId": member.id if isinstance(member, Member) else member,
+                    "info": info.dict(exclude_none=True, exclude_unset=True, by_alias=True),
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getConfig(self) -> MiraiConfig:
+        """获取 mirai-api-http 中维护的当前会话的配置.
+
+        Returns:
+            MiraiConfig: 当前会话的配置
+        """
+        async with self.session.get(
+            str(URL(self.url_gen("config")).with_query({"verifyKey": self.connect_info.verifyKey}))
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+            return MiraiConfig.parse_obj(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def modifyConfig(
+        self, *, cacheSize: Optional[int] = None, enableWebsocket: Optional[bool] = None
+    ) -> NoReturn:
+        """修改当前会话的配置
+
+        Args:
+            cacheSize (Optional[int], optional): 缓存消息的条数. Defaults to None.
+            enableWebsocket (Optional[bool], optional): 是否启用 Websocket 方式获取事件. Defaults to None.
+
+        Returns:
+            NoReturn: 没有有意义的返回, 或者说, 返回 `None` 就代表这个操作成功了.
+        """
+        if any([cacheSize is not None, enableWebsocket is not None]):
+            async with self.session.post(
+                self.url_gen("config"),
+                data=self.json_codec.payload(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        **({"cacheSize": cacheSize} if cacheSize is not None else {}),
+                        **({"enableWebsocket": enableWebsocket} if enableWebsocket is not None else {}),
+                    }
+                ),
+            ) as response:
+                response.raise_for_status()
+                data = self.json_codec.loads(await response.read())
+                raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def setEssence(self, target: Union[BotMessage, Source, int]):
+        """设置群精华消息, 需要机器人账号具有管理员及以上权限
+
+        Args:
+            target (Union[BotMessage, Source, int]): 将被设置为群精华消息的消息 Id (Message ID)
+        """
+        async with self.session.post(
+            self.url_gen("setEssence"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": target.id if isinstance(target, (BotMessage, Source)) else target,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def nudge(self, target: Union[Member, Friend]):
+        async with self.session.post(
+            self.url_gen("sendNudge"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": target.id,
+                    "subject": target.group.id if isinstance(target, Member) else target.id,
+                    "kind": {Member: "Group", Friend: "Friend"}[target.__class__],
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @staticmethod
+    async def auto_parse_by_type(original_dict: dict) -> MiraiEvent:
+        """从尚未明确指定事件类型的对象中获取事件的定义, 并进行解析
+
+        Args:
+            original_dict (dict): 用 dict 表示的序列化态事件, 应包含有字段 `type` 以供分析事件定义.
+
+        Raises:
+            InvaildArgument: 目标对象中不包含字段 `type`
+            ValueError: 没有找到对应的字段, 通常的, 这意味着应用获取到了一个尚未被定义的事件, 请报告问题.
+
+        Returns:
+            MiraiEvent: 已经被序列化的事件
+        """
+        return strict_decoder.decode(original_dict)
+
+    async def ws_ping(self, ws_connect: aiohttp.client_ws.ClientWebSocketResponse, delay: float = 30.0):
+        while True:
+            try:
+                await ws_connect.ping()
+                self.logger.debug("websocket ping: client ping")
+            except asyncio.CancelledError:
+                self.logger.debug("websocket ping: exiting....")
+                return
+            except:
+                self.logger.exception("websocket ping: ping failed")
+            self.logger.debug("websocket ping: delay {0}s.".format(delay))
+            await asyncio.sleep(delay)
+
+    @error_wrapper
+    @requireAuthenticated
+    async def ws_all_poster(self):
+        ping_task = None
+
+        async with self.session.ws_connect(
+            str(URL(self.url_gen("all")).with_query({"verifyKey": self.connect_info.verifyKey})),
+            autoping=False,
+        ) as connection:
+            self.logger.info("websocket: connected")
+
+            ping_task = self.broadcast.loop.create_task(self.ws_ping(connection))
+            self.logger.info("websocket: ping task created")
+
+            try:
+                policy = self.reconnect_policy
+                if policy is not None and policy.on_connected():
+                    # 推送的事件在补取期间暂存于连接的缓冲区中, 补取完成后再依次处理.
+                    await self.backfill_events()
+                while True:
+                    ws_message = await connection.receive()
+                    if ws_message.type in (WSMsgType.TEXT, WSMsgType.BINARY):
+                        received_data = self.json_codec.loads(ws_message.data)
+                        raise_for_return_code(received_data)
+                        if policy is not None and not policy.remember(received_data["data"]):
+                            continue
+
+                        try:
+                            event = self.event_decoder.decode(received_data["data"])
+                        except ValueError as e:
+                            traceback.print_exc()
+                            self.logger.error(
+                                "".join(
+                                    [
+                                        "received a unknown event: ",
+                                        received_data.get("type"),
+                                        str(received_data),
+                                    ]
+                                )
+                            )
+                            continue
+
+                        if self.debug:
+                            self.logger.debug(f"websocket received: {event}")
+
+                        await self.post_received_event(event)
+                    elif ws_message.type is WSMsgType.CLOSED:
+                        self.logger.info("websocket: connection has been closed.")
+                        return
+                    elif ws_message.type is WSMsgType.PONG:
+                        self.logger.debug("websocket: received pong from remote")
+                    else:
+                        self.logger.debug("detected a unknown message type: {}".format(ws_message.type))
+            finally:
+                if ping_task:
+                    ping_task.cancel()
+                    self.logger.debug("websocket: outer canceled ping task")
+
+    async def backfill_events(self) -> None:
+        """补取 `mirai-api-http` 缓存中积压的事件, 并略过最近已处理过的事件; 用于 websocket 重新连接后.
+
+        补取失败时只记录错误, 不影响之后对推送的处理.
+        """
+        policy = self.reconnect_policy
+        try:
+            remaining = await self.countMessage()
+            while remaining > 0:
+                data = await self.fetchRawMessage(min(remaining, policy.backfill_batch))
+                if not data:
+                    break
+                remaining -= len(data)
+                for event in self.decode_events([i for i in data if policy.remember(i)]):
+                    policy.backfilled += 1
+                    await self.post_received_event(event)
+        except Exception:
+            self.logger.exception("websocket daemon: failed to backfill missed events")
+            return
+        self.logger.info("websocket daemon: backfilled, {0} event(s) in total".format(policy.backfilled))
+
+    async def websocket_daemon(self):
+        policy = self.reconnect_policy
+        while True:
+            self.logger.info("websocket daemon: websocket connection starting...")
+            try:
+                await self.ws_all_poster()
+            except aiohttp.client_exceptions.ClientConnectorError:
+                delay = policy.next_delay() if policy is not None else 10
+                self.logger.info(
+                    "websocket daemon: it seems that remote down, waiting for {0:.2f} seconds...".format(delay)
+                )
+                await asyncio.sleep(delay)
+            except aiohttp.ClientError as e:
+                if policy is None:
+                    raise
+                delay = policy.next_delay()
+                self.logger.info(
+                    "websocket daemon: connection failed ({0!r}), retry after {1:.2f} seconds...".format(e, delay)
+                )
+                await asyncio.sleep(delay)
+            else:
+                if policy is not None:
+                    await asyncio.sleep(policy.next_delay())
+            self.logger.info("websocket daemon: detected closed, restarting...")
+
+    @requireAuthenticated
+    async def http_fetchmessage_poster(self, delay=0.5, fetch_num=10):
+        if self.http_poller is not None:
+            await self.http_poller.run(self)
+            return
+        while True:
+            await asyncio.sleep(delay)
+            while True:
+                data = await self.fetchMessage(fetch_num)
+                for i in data:
+                    await self.post_received_event(i)
+                if len(data) != fetch_num:
+                    break
+
+    def listeners_for(self, event: Dispatchable) -> List[Listener]:
+        """获取需要处理该事件的监听器; 若指定了命令路由器, 前缀不匹配的监听器会被略过.
+
+        Args:
+            event (Dispatchable): 需要分发的事件.
+
+        Returns:
+            List[Listener]: 需要执行的监听器.
+        """
+        listeners = self.broadcast.default_listener_generator(event.__class__)
+        if self.command_router is not None:
+            listeners = self.command_router.route(event, listeners)
+        return listeners
+
+    async def post_received_event(self, event: MiraiEvent) -> None:
+        """将从 `mirai-api-http` 接收到的事件交由 `Broadcast` 处理;
+        若配置了摄入队列, 则放入队列, 此时可能因背压而等待.
+
+        Args:
+            event (MiraiEvent): 接收到的事件.
+        """
+        if self.startup_pipeline is not None:
+            await self.startup_pipeline.wait_ready()
+        if self.ingestion is None:
+            with enter_context(app=self, event_i=event):
+                self.broadcast.loop.create_task(
+                    self.broadcast.layered_scheduler(listener_generator=self.listeners_for(event), event=event)
+                )
+            return
+        if not self.ingestion.started:
+            self.ingestion.start(self)
+        if not await self.ingestion.put(event) and self.debug:
+            self.logger.debug(f"ingestion queue is full, dropped: {event}")
+
+    async def switch_event_detect_method(self):
+        config = await self.getConfig()
+        if not self.connect_info.websocket:  # 不启用 websocket
+            self.logger.info("using http to receive event")
+            if config.enableWebsocket:  # 配置中已经启用
+                await self.modifyConfig(enableWebsocket=False)
+                self.logger.info("found websocket enabled, so it has been disabled.")
+        else:  # 启用ws
+            self.logger.info("using pure websocket to receive event")
+            if not config.enableWebsocket:  # 配置中没启用
+                self.logger.info("found websocket disabled, so it has been enabled.")
+                await self.modifyConfig(enableWebsocket=True)
+
+    async def detect_version(self):
+        "获取 `mirai-api-http` 的版本, 失败时仅输出错误日志."
+        self.logger.info("detecting remote's version...")
+        try:
+            await self.getVersion()
+        except:
+            self.logger.error("| failed to detect remote's version. |")
+            self.logger.error("| it seems that your version is less than 1.6.2, |")
+            self.logger.error("| this version of Graia Application may cause many issues, |")
+            self.logger.error("| so you had better to update your remote environment, |")
+            self.logger.error("| or you won't get our support!(maybe just python-mirai?) |")
+            traceback.print_exc()
+        else:
+            self.logger.info(
+                "detected remote's version: {0}".format(".".join(map(str, self.connect_info.current_version)))
+            )
+
+    async def initialize(self):
+        start_time = time.time()
+        self.logger.info("initializing app...")
+        if self.startup_pipeline is not None:
+            await self.startup_pipeline.run(self)
+        else:
+            await self.authenticate()
+            await self.activeSession()
+
+            if self.broadcast is not None:
+                self.broadcast.postEvent(ApplicationLaunched(self))
+                await self.broadcast.layered_scheduler(
+                    listener_generator=self.broadcast.default_listener_generator(ApplicationLaunchedBlocking),
+                    event=ApplicationLaunchedBlocking(self),
+                )
+
+            await self.detect_version()
+
+            # 自动变化fetch方式
+            await self.switch_event_detect_method()
+
+        self.logger.info("event receive method checked.")
+        self.logger.info("this application's initialization has been completed.")
+
+        self.logger.info("--- setting start ---")
+        self.logger.info("broadcast using: {0}".format(self.broadcast.__repr__()))
+        self.logger.info("enable log of chat: {0}".format(yes_or_no(self.chat_log_enabled)))
+        self.logger.info("debug: {0}".format(yes_or_no(self.debug)))
+        self.logger.info("json codec: {0}".format(self.json_codec.name))
+        self.logger.info(
+            "ingestion queue: {0}".format(
+                "maxsize={0.maxsize}, workers={0.workers}, policy={0.policy.value}".format(self.ingestion)
+                if self.ingestion
+                else "disabled"
+            )
+        )
+        self.logger.info("lazy message chain: {0}".format(yes_or_no(self.event_decoder.lazy)))
+        self.logger.info(
+            "message store: {0}".format(
+                "max_entries={0.max_entries}, path={0.path}".format(self.message_store)
+                if self.message_store is not None
+                else "disabled"
+            )
+        )
+        self.logger.info(
+            "reconnect policy: {0}".format(
+                "delay={0.base_delay}~{0.max_delay}s, backfill={1}".format(
+                    self.reconnect_policy, yes_or_no(self.reconnect_policy.backfill)
+                )
+                if self.reconnect_policy is not None
+                else "fixed"
+            )
+        )
+        self.logger.info(
+            "http poller: {0}".format(
+                "interval={0.min_interval}~{0.max_interval}s, batch={0.min_batch}~{0.max_batch}".format(
+                    self.http_poller
+                )
+                if self.http_poller is not None
+                else "fixed"
+            )
+        )
+        self.logger.info("command router: {0}".format(yes_or_no(self.command_router is not None)))
+        self.logger.info(
+            "startup pipeline: {0}".format(
+                "warmup={0}, prefetch_contacts={1}, early_connect={2}".format(
+                    yes_or_no(self.startup_pipeline.warmup),
+                    yes_or_no(self.startup_pipeline.prefetch_contacts),
+                    yes_or_no(self.startup_pipeline.early_connect),
+                )
+                if self.startup_pipeline is not None
+                else "sequential"
+            )
+        )
+        self.logger.info(
+            "version(remote): {0}".format(".".join(map(str, self.connect_info.current_version)))
+            if self.connect_info.current_version is not None
+            else "No Detect"
+        )
+        self.logger.info("--- setting end ---")
+
+        if not self.broadcast:
+            self.logger.warn("it seems you doesn't offer a Broadcast,")
+            self.logger.warn("so the event receiver and the shutdown function won't launch!")
+
+        self.logger.info("application has been initialized, used {0:.3}s".format((time.time() - start_time)))
+        if self.startup_pipeline is not None:
+            self.logger.info("startup timings: {0}".format(self.startup_pipeline.report()))
+
+    def getFetching(self):
+        return self.http_fetchmessage_poster if not self.connect_info.websocket else self.websocket_daemon
+
+    async def shutdown(self, cancel_tasks: bool = True):
+        """关闭应用实例: 分发 `ApplicationShutdowned`, 停止摄入队列与发送调度器, 注销会话并关闭连接.
+        注销失败时, 连接与其他资源依然会被关闭, 随后抛出注销时的异常.
+
+        Args:
+            cancel_tasks (bool, optional): 是否取消事件循环中的所有其他任务;
+                多个应用实例共用同一个事件循环时应为 False. 默认为 True.
+        """
+        if self.broadcast is not None:
+            loop = self.broadcast.loop
+            try:
+                await self.broadcast.layered_scheduler(
+                    listener_generator=self.broadcast.default_listener_generator(ApplicationShutdowned),
+                    event=ApplicationShutdowned(self),
+                )
+            except:
+                self.logger.error("it seems our shutdown operator has been failed...check the remote alive.")
+                traceback.print_exc()
+        else:
+            loop = asyncio.get_event_loop()
+
+        if self.ingestion is not None:
+            await self.ingestion.stop()
+        if self.send_scheduler is not None:
+            await self.send_scheduler.stop()
+
+        if cancel_tasks:
+            for t in asyncio.all_tasks(loop):
+                if t is not asyncio.current_task(loop):
+                    t.cancel()
+                    try:
+                        await t
+                    except asyncio.CancelledError:
+                        pass
+
+        try:
+            # 从未认证(或认证失败)的应用实例没有可以注销的会话.
+            if self.authenticated:
+                await self.signout()
+        finally:
+            # 无论注销是否成功, 都需要关闭连接与各项资源.
+            try:
+                await self.session.close()
+                if self._owns_media:
+                    await self.media.close()
+            finally:
+                if self.upload_cache is not None:
+                    await loop.run_in_executor(None, self.upload_cache.close)
+                if self.message_store is not None:
+                    # 写入内存中的所有消息可能需要一段时间, 因此不在事件循环中进行.
+                    await loop.run_in_executor(None, self.message_store.close)
+        self.logger.info("application shutdowned.")
+
+    def launch_blocking(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        if self.broadcast:
+            loop = self.broadcast.loop
+        else:
+            loop = loop or asyncio.get_event_loop()
+
+        if not self.connect_info.verifyKey:
+            loop.run_until_complete(self.initialize())
+
+        try:
+            if self.broadcast:
+                loop.run_until_complete(self.initializeFetchingTask())
+        finally:
+            if self.broadcast:
+                loop.run_until_complete(self.shutdown())
+
+    def initializeFetchingTask(self) -> asyncio.Task:
+        if not self.broadcast:
+            raise TypeError("if you want to use fetching, you must setup a Broadcast.")
+        if self.startup_pipeline is not None and self.startup_pipeline.fetching:
+            fetching, self.startup_pipeline.fetching = self.startup_pipeline.fetching, None
+            return fetching
+        loop = self.broadcast.loop
+        return loop.create_task(self.getFetching()())
+
+    async def __aenter__(self) -> "GraiaMiraiApplication":
+        await self.authenticate()
+        await self.activeSession()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self.signout()
+        except:
+            pass
+
+        if tb is not None:
+            raise exc
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getGroupFileList(self, group: Union[Group, int], path: Optional[str] = None) -> List[FileList]:
+        """获取指定群组中文件列表
+
+        Args:
+            group (Union[Group, int]): 需要获取的指定群组
+            path (str): 指定文件目录，如果寻找根目录则不需要提供本项，默认为 None
+
+        Returns:
+            List[FileList]: 获得的文件列表.
+        """
+        async with self.session.get(
+            str(
+                URL(self.url_gen("groupFileList")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        "target": group.id if isinstance(group, Group) else group,
+                        "dir": path or "",
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            return [FileList.parse_obj(i) for i in data]
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def getGroupFileInfo(self, group: Union[Group, int], file_id: str) -> FileInfo:
+        """获取指定群文件详细信息
+
+        Args:
+            group (Union[Group, int]): 需要获取的指定群组
+            file_id (str): 指定文件的唯一标识符，从 getGroupFileList 方法获得
+
+        Returns:
+            FileInfo: 获得的文件详情.
+        """
+        async with self.session.get(
+            str(
+                URL(self.url_gen("groupFileInfo")).with_query(
+                    {
+                        "verifyKey": self.connect_info.verifyKey,
+                        "target": group.id if isinstance(group, Group) else group,
+                        "id": file_id,
+                    }
+                )
+            )
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+            return FileInfo.parse_obj(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def renameGroupFile(self, group: Union[Group, int], file_id: str, rename: str) -> NoReturn:
+        """重命名群文件或目录
+
+        Args:
+            group (Union[Group, int]): 需要获取的指定群组
+            file_id (str): 指定文件的唯一标识符，从 getGroupFileList 方法获得
+            rename (str): 指定文件更名后的名称，需要加上文件后缀
+        """
+        async with self.session.post(
+            self.url_gen("groupFileRename"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "id": file_id,
+                    "rename": rename,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def moveGroupFile(self, group: Union[Group, int], file_id: str, move_to: str) -> NoReturn:
+        """移动群文件(目前疑似 Mirai-Api—Http 1.11.0 存在 bug，返回状态码 200 但文件未能移动)
+
+        Args:
+            group (Union[Group, int]): 需要获取的指定群组
+            file_id (str): 指定文件的唯一标识符，从 getGroupFileList 方法获得
+            move_to (str): 指定文件需要移动到的目录即 '/move_to', 目录不存在则自动创建
+        """
+        async with self.session.post(
+            self.url_gen("groupFileMove"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "id": file_id,
+                    "movePath": move_to,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
+
+    @error_wrapper
+    @requireAuthenticated
+    @applicationContextManager
+    async def removeGroupFile(self, group: Union[Group, int], file_id: str) -> NoReturn:
+        """删除群文件或目录
+
+        Args:
+            group (Union[Group, int]): 需要获取的指定群组
+            file_id (str): 指定文件的唯一标识符，从 getGroupFileList 方法获得
+        """
+        async with self.session.post(
+            self.url_gen("groupFileDelete"),
+            data=self.json_codec.payload(
+                {
+                    "verifyKey": self.connect_info.verifyKey,
+                    "target": group.id if isinstance(group, Group) else group,
+                    "id": file_id,
+                }
+            ),
+        ) as response:
+            response.raise_for_status()
+            data = self.json_codec.loads(await response.read())
+            raise_for_return_code(data)
@@ -0,0 +1,134 @@
+"""应用实例与 `mirai-api-http` 通讯时所使用的 JSON 编解码器.
+
+所有 HTTP 接口的响应, 请求体以及 websocket 推送的数据都经由同一个编解码器处理,
+编解码器直接在 bytes 上工作以避免额外的 str 编解码.
+若安装了 `orjson` 或 `ujson`, `default_codec` 会优先选用它们.
+"""
+import json
+from abc import ABCMeta, abstractmethod
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Optional, Union
+
+from aiohttp.payload import BytesPayload
+
+
+def json_default(obj: Any) -> Any:
+    "处理标准库无法直接序列化的对象: 枚举转换为其值, 时间转换为时间戳."
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return int(obj.timestamp())
+    raise TypeError("Object of type {} is not JSON serializable".format(obj.__class__.__name__))
+
+
+class JsonCodec(metaclass=ABCMeta):
+    """JSON 编解码器的抽象类.
+
+    Attributes:
+        name (str): 编解码器的名称, 用于日志输出.
+    """
+
+    name: str
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """解码 JSON 数据.
+
+        Args:
+            data (Union[bytes, str]): 需要解码的数据, 通常为响应体或 websocket 帧的原始内容.
+
+        Returns:
+            Any: 解码后的对象.
+        """
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """将对象编码为 UTF-8 的 JSON 数据.
+
+        Args:
+            obj (Any): 需要编码的对象.
+
+        Returns:
+            bytes: 编码后的数据.
+        """
+
+    def payload(self, obj: Any) -> BytesPayload:
+        """将对象编码为可直接作为 `aiohttp` 请求体(`data=`)的 Payload.
+
+        Args:
+            obj (Any): 需要编码的对象.
+
+        Returns:
+            BytesPayload: Content-Type 为 `application/json` 的请求体.
+        """
+        return BytesPayload(self.dumps(obj), content_type="application/json")
+
+
+class StdlibJsonCodec(JsonCodec):
+    "基于标准库 `json` 的编解码器, 在未安装其他实现时使用."
+
+    name = "json"
+
+    loader: Callable[[Union[bytes, str]], Any]
+
+    def __init__(self, loader: Optional[Callable[[Union[bytes, str]], Any]] = None) -> None:
+        self.loader = loader or json.loads
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self.loader(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+
+
+class UjsonCodec(JsonCodec):
+    "基于 `ujson` 的编解码器."
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+
+        self.ujson = ujson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self.ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self.ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+        except TypeError:  # 含有枚举或时间等 ujson 无法处理的对象
+            return StdlibJsonCodec.dumps(self, obj)
+
+
+class OrjsonCodec(JsonCodec):
+    "基于 `orjson` 的编解码器, 其直接输出 bytes."
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self.orjson = orjson
+        self.option = orjson.OPT_PASSTHROUGH_DATETIME
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self.orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.orjson.dumps(obj, default=json_default, option=self.option)
+
+
+def default_codec() -> JsonCodec:
+    """按 `orjson`, `ujson`, `json` 的顺序选用首个可用的编解码器.
+
+    Returns:
+        JsonCodec: 编解码器的实例.
+    """
+    for codec_class in (OrjsonCodec, UjsonCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            continue
+    return StdlibJsonCodec()
@@ -0,0 +1,324 @@
+"""应用实例所使用的联系人目录, 用于缓存群组, 群组成员与好友的信息.
+
+`getGroup`, `getMember` 与 `getFriend` 通过本模块查询, 缓存未命中或已过期时才会请求 `mirai-api-http`.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Union,
+)
+
+from graia.broadcast.interfaces.dispatcher import DispatcherInterface
+
+from .context import application
+from .utilles import install_once
+from .friend import Friend
+from .group import Group, Member, MemberPerm
+
+if TYPE_CHECKING:
+    from graia.application import GraiaMiraiApplication
+    from graia.broadcast import Broadcast
+
+
+class ContactEntry:
+    "一组以 ID 为键的联系人信息, 及其过期时间."
+
+    __slots__ = ("contacts", "expires")
+
+    contacts: Dict[int, Any]
+    expires: float
+
+    def __init__(self, contacts: Dict[int, Any], expires: float) -> None:
+        self.contacts = contacts
+        self.expires = expires
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+
+class ContactDirectory:
+    """联系人目录, 按群组分别以字典形式存储群组成员, 使得查询可以直接命中字典.
+
+    - 每份列表在 `ttl` 秒后过期, `ttl` 不大于 0 时不进行缓存;
+    - 群组成员列表按最近使用的顺序保存, 超过 `max_groups` 时淘汰最久未被使用的群组;
+    - 对同一份列表的并发刷新会被合并为一次请求;
+    - 通过 `install` 方法监听相关事件, 在群组/成员信息变化时就地更新或使缓存失效.
+
+    Attributes:
+        app (GraiaMiraiApplication): 所属的应用实例, 用于请求列表.
+        ttl (float): 缓存的有效时间, 单位为秒.
+        max_groups (int): 最多缓存多少个群组的成员列表.
+    """
+
+    app: "GraiaMiraiApplication"
+    ttl: float
+    max_groups: int
+
+    groups: Optional[ContactEntry]
+    friends: Optional[ContactEntry]
+    members: "OrderedDict[int, ContactEntry]"
+
+    _pending: Dict[Hashable, "asyncio.Future"]
+    _versions: Dict[Hashable, int]
+
+    def __init__(self, app: "GraiaMiraiApplication", ttl: float = 300.0, max_groups: int = 256) -> None:
+        self.app = app
+        self.ttl = ttl
+        self.max_groups = max_groups
+
+        self.groups = None
+        self.friends = None
+        self.members = OrderedDict()
+
+        self._pending = {}
+        self._versions = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _bump(self, key: Hashable) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Iterable[Any]]]) -> ContactEntry:
+        """以 single-flight 的方式刷新一份列表: 同时只会有一个请求在进行, 其余的调用者共享其结果.
+
+        若刷新期间缓存被判定失效(例如收到了相关事件), 则返回本次结果, 但不写入缓存.
+        """
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(key, loader))
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _fetch(self, key: Hashable, loader: Callable[[], Awaitable[Iterable[Any]]]) -> ContactEntry:
+        version = self._versions.get(key, 0)
+        entry = ContactEntry({i.id: i for i in await loader()}, time.monotonic() + self.ttl)
+        if self._versions.get(key, 0) == version:
+            self._store(key, entry)
+        return entry
+
+    def _store(self, key: Hashable, entry: ContactEntry) -> None:
+        if key == "groups":
+            self.groups = entry
+        elif key == "friends":
+            self.friends = entry
+        else:
+            self.members[key[1]] = entry
+            self.members.move_to_end(key[1])
+            while len(self.members) > self.max_groups:
+                self.members.popitem(last=False)
+
+    def _member_entry(self, group_id: int) -> Optional[ContactEntry]:
+        entry = self.members.get(group_id)
+        if entry is not None:
+            if entry.fresh:
+                self.members.move_to_end(group_id)
+                return entry
+            del self.members[group_id]
+
+    async def getGroup(self, group_id: int) -> Optional[Group]:
+        """从目录中获取群组信息, 缓存未命中时刷新群组列表.
+
+        Args:
+            group_id (int): 群组的唯一 ID.
+
+        Returns:
+            Optional[Group]: 群组的信息, 若当前会话账号不在该群组中则为 None.
+        """
+        if not self.enabled:
+            return next((i for i in await self.app.groupList() if i.id == group_id), None)
+        entry = self.groups
+        if entry is None or not entry.fresh:
+            entry = await self._load("groups", self.app.groupList)
+        return entry.contacts.get(group_id)
+
+    async def getMember(self, group_id: int, member_id: int) -> Optional[Member]:
+        """从目录中获取群组成员的信息, 缓存未命中时刷新该群组的成员列表.
+
+        Args:
+            group_id (int): 群组的唯一 ID.
+            member_id (int): 群组成员的 ID.
+
+        Returns:
+            Optional[Member]: 群组成员的信息, 若该成员不在群组中则为 None.
+        """
+        if not self.enabled:
+            return next(
+                (i for i in await self.app.memberList(group_id) if i.id == member_id),
+                None,
+            )
+        entry = self._member_entry(group_id)
+        if entry is None:
+            entry = await self._load(("members", group_id), lambda: self.app.memberList(group_id))
+        return entry.contacts.get(member_id)
+
+    async def getFriend(self, friend_id: int) -> Optional[Friend]:
+        """从目录中获取好友信息, 缓存未命中时刷新好友列表.
+
+        Args:
+            friend_id (int): 好友的 ID.
+
+        Returns:
+            Optional[Friend]: 好友的信息, 若不存在则为 None.
+        """
+        if not self.enabled:
+            return next((i for i in await self.app.friendList() if i.id == friend_id), None)
+        entry = self.friends
+        if entry is None or not entry.fresh:
+            entry = await self._load("friends", self.app.friendList)
+        return entry.contacts.get(friend_id)
+
+    async def prefetch(self) -> None:
+        "并发地载入群组列表与好友列表, 使之后的查询直接命中缓存; 目录未启用时不进行任何操作."
+        if not self.enabled:
+            return
+        await asyncio.gather(
+            self._load("groups", self.app.groupList),
+            self._load("friends", self.app.friendList),
+        )
+
+    def invalidateGroups(self) -> None:
+        "使群组列表失效."
+        self._bump("groups")
+        self.groups = None
+
+    def invalidateMembers(self, group_id: int) -> None:
+        "使特定群组的成员列表失效."
+        self._bump(("members", group_id))
+        self.members.pop(group_id, None)
+
+    def invalidateFriends(self) -> None:
+        "使好友列表失效."
+        self._bump("friends")
+        self.friends = None
+
+    def clear(self) -> None:
+        "清空整个目录."
+        self.invalidateGroups()
+        self.invalidateFriends()
+        for group_id in list(self.members):
+            self.invalidateMembers(group_id)
+
+    def updateGroup(self, group: Group) -> None:
+        "在已缓存的群组列表中写入(或覆盖)一个群组的信息; 正在进行的刷新的结果不会覆盖它."
+        self._bump("groups")
+        if self.groups is not None:
+            self.groups.contacts[group.id] = group
+
+    def removeGroup(self, group_id: int) -> None:
+        "从目录中移除一个群组及其成员列表."
+        self._bump("groups")
+        if self.groups is not None:
+            self.groups.contacts.pop(group_id, None)
+        self.invalidateMembers(group_id)
+
+    def updateMember(self, member: Member) -> None:
+        "在已缓存的成员列表中写入(或覆盖)一个群组成员的信息; 正在进行的刷新的结果不会覆盖它."
+        self._bump(("members", member.group.id))
+        entry = self.members.get(member.group.id)
+        if entry is not None:
+            entry.contacts[member.id] = member
+
+    def removeMember(self, group_id: int, member_id: int) -> None:
+        "从已缓存的成员列表中移除一个群组成员."
+        self._bump(("members", group_id))
+        entry = self.members.get(group_id)
+        if entry is not None:
+            entry.contacts.pop(member_id, None)
+
+    def install(self, broadcast: "Broadcast") -> None:
+        """在 `broadcast` 上注册用于维护目录的监听器.
+
+        多个应用实例共用同一个 `Broadcast` 时, 监听器只注册一次, 并更新接收到该事件的应用实例的目录.
+
+        Args:
+            broadcast (Broadcast): 应用实例所使用的事件系统.
+        """
+        from .event.messages import GroupMessage, TempMessage
+        from .event.mirai import (
+            BotGroupPermissionChangeEvent,
+            BotJoinGroupEvent,
+            BotLeaveEventActive,
+            BotLeaveEventKick,
+            GroupNameChangeEvent,
+            MemberCardChangeEvent,
+            MemberJoinEvent,
+            MemberLeaveEventKick,
+            MemberLeaveEventQuit,
+            MemberPermissionChangeEvent,
+        )
+
+        if not install_once(broadcast, "contacts"):
+            return
+
+        def on_member_update(
+            directory: ContactDirectory,
+            event: Union[MemberJoinEvent, GroupMessage, TempMessage],
+        ):
+            directory.updateMember(event.member if isinstance(event, MemberJoinEvent) else event.sender)
+
+        def on_member_leave(
+            directory: ContactDirectory,
+            event: Union[MemberLeaveEventKick, MemberLeaveEventQuit],
+        ):
+            directory.removeMember(event.member.group.id, event.member.id)
+
+        def on_card_change(directory: ContactDirectory, event: MemberCardChangeEvent):
+            directory.updateMember(event.member.copy(update={"name": event.current}))
+
+        def on_permission_change(directory: ContactDirectory, event: MemberPermissionChangeEvent):
+            directory.updateMember(event.member.copy(update={"permission": MemberPerm(event.current)}))
+
+        def on_group_name_change(directory: ContactDirectory, event: GroupNameChangeEvent):
+            # 成员实例中也携带着群组的信息, 故一并使其失效.
+            directory.invalidateMembers(event.group.id)
+            directory.updateGroup(event.group.copy(update={"name": event.current}))
+
+        def on_bot_permission_change(directory: ContactDirectory, event: BotGroupPermissionChangeEvent):
+            directory.invalidateMembers(event.group.id)
+            directory.updateGroup(event.group.copy(update={"accountPerm": event.current}))
+
+        def on_bot_join(directory: ContactDirectory, event: BotJoinGroupEvent):
+            directory.updateGroup(event.group)
+
+        def on_bot_leave(
+            directory: ContactDirectory,
+            event: Union[BotLeaveEventActive, BotLeaveEventKick],
+        ):
+            directory.removeGroup(event.group.id)
+
+        handlers = {
+            MemberJoinEvent: on_member_update,
+            GroupMessage: on_member_update,
+            TempMessage: on_member_update,
+            MemberLeaveEventKick: on_member_leave,
+            MemberLeaveEventQuit: on_member_leave,
+            MemberCardChangeEvent: on_card_change,
+            MemberPermissionChangeEvent: on_permission_change,
+            GroupNameChangeEvent: on_group_name_change,
+            BotGroupPermissionChangeEvent: on_bot_permission_change,
+            BotJoinGroupEvent: on_bot_join,
+            BotLeaveEventActive: on_bot_leave,
+            BotLeaveEventKick: on_bot_leave,
+        }
+
+        def directory_maintainer(interface: DispatcherInterface):
+            # 更新接收到该事件的应用实例的目录; 在应用实例的上下文之外时, 更新本目录.
+            directory = application.get(self.app).contacts
+            if directory.enabled:
+                handlers[interface.event.__class__](directory, interface.event)
+
+        for event_type in handlers:
+            broadcast.receiver(event_type, priority=0)(directory_maintainer)
@@ -1,71 +1,178 @@
-"""这个模块用于为开发者提供一站式的导入体验."""
+"""这个模块用于为开发者提供一站式的导入体验.
 
-from . import GraiaMiraiApplication
-from .logger import AbstractLogger, LoggingLogger
-from .event.dispatcher import MessageChainCatcher
-from .event.lifecycle import ApplicationLaunched, ApplicationShutdowned
-from .event.messages import FriendMessage, GroupMessage, TempMessage
-from .event.mirai import (
-    BotOnlineEvent,
-    BotOfflineEventActive,
-    BotOfflineEventForce,
-    BotOfflineEventDropped,
-    BotReloginEvent,
-    BotGroupPermissionChangeEvent,
-    BotMuteEvent,
-    BotUnmuteEvent,
-    BotJoinGroupEvent,
-    GroupRecallEvent,
-    FriendRecallEvent,
-    GroupNameChangeEvent,
-    GroupEntranceAnnouncementChangeEvent,
-    GroupMuteAllEvent,
-    GroupAllowAnonymousChatEvent,
-    GroupAllowConfessTalkEvent,
-    GroupAllowMemberInviteEvent,
-    MemberJoinEvent,
-    MemberLeaveEventKick,
-    MemberLeaveEventQuit,
-    MemberCardChangeEvent,
-    MemberSpecialTitleChangeEvent,
-    MemberPermissionChangeEvent,
-    MemberMuteEvent,
-    MemberUnmuteEvent,
-    NewFriendRequestEvent,
-    MemberJoinRequestEvent,
-    BotInvitedJoinGroupRequestEvent,
-)
-from .message.elements.internal import (
-    Plain,
-    Source,
-    Quote,
-    At,
-    AtAll,
-    Face,
-    Image,
-    FlashImage,
-    Xml,
-    Json,
-    App,
-    Poke,
-    PokeMethods,
-)
-from .message.chain import MessageChain
-from .friend import Friend
-from .group import MemberPerm, Group, Member, MemberInfo, GroupConfig
-from .session import Session
-from .exceptions import (
-    InvalidEventTypeDefinition,
-    InvaildVerifyKey,
-    AccountNotFound,
-    InvaildSession,
-    UnauthorizedSession,
-    UnknownTarget,
-    AccountMuted,
-    TooLongMessage,
-    InvaildArgument,
-    NotSupportedVersion,
-    DeprecatedImpl,
-    EntangledSuperposition,
-    MissingNecessaryOne,
-)
+其中的名称在第一次被访问时才会导入其所在的模块, 因此导入本模块本身几乎没有开销;
+`from graia.application.entry import *` 会导入全部名称.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+EXPORTS: Dict[str, Tuple[str, ...]] = {
+    ".": ("GraiaMiraiApplication",),
+    ".logger": ("AbstractLogger", "LoggingLogger"),
+    ".event.dispatcher": ("MessageChainCatcher",),
+    ".event.lifecycle": ("ApplicationLaunched", "ApplicationShutdowned"),
+    ".event.messages": (
+        "FriendMessage",
+        "GroupMessage",
+        "TempMessage",
+    ),
+    ".event.mirai": (
+        "BotOnlineEvent",
+        "BotOfflineEventActive",
+        "BotOfflineEventForce",
+        "BotOfflineEventDropped",
+        "BotReloginEvent",
+        "BotGroupPermissionChangeEvent",
+        "BotMuteEvent",
+        "BotUnmuteEvent",
+        "BotJoinGroupEvent",
+        "GroupRecallEvent",
+        "FriendRecallEvent",
+        "GroupNameChangeEvent",
+        "GroupEntranceAnnouncementChangeEvent",
+        "GroupMuteAllEvent",
+        "GroupAllowAnonymousChatEvent",
+        "GroupAllowConfessTalkEvent",
+        "GroupAllowMemberInviteEvent",
+        "MemberJoinEvent",
+        "MemberLeaveEventKick",
+        "MemberLeaveEventQuit",
+        "MemberCardChangeEvent",
+        "MemberSpecialTitleChangeEvent",
+        "MemberPermissionChangeEvent",
+        "MemberMuteEvent",
+        "MemberUnmuteEvent",
+        "NewFriendRequestEvent",
+        "MemberJoinRequestEvent",
+        "BotInvitedJoinGroupRequestEvent",
+    ),
+    ".message.elements.internal": (
+        "Plain",
+        "Source",
+        "Quote",
+        "At",
+        "AtAll",
+        "Face",
+        "Image",
+        "FlashImage",
+        "Xml",
+        "Json",
+        "App",
+        "Poke",
+        "PokeMethods",
+    ),
+    ".message.chain": ("MessageChain",),
+    ".friend": ("Friend",),
+    ".group": (
+        "MemberPerm",
+        "Group",
+        "Member",
+        "MemberInfo",
+        "GroupConfig",
+    ),
+    ".session": ("Session",),
+    ".exceptions": (
+        "InvalidEventTypeDefinition",
+        "InvaildVerifyKey",
+        "AccountNotFound",
+        "InvaildSession",
+        "UnauthorizedSession",
+        "UnknownTarget",
+        "AccountMuted",
+        "TooLongMessage",
+        "InvaildArgument",
+        "NotSupportedVersion",
+        "DeprecatedImpl",
+        "EntangledSuperposition",
+        "MissingNecessaryOne",
+    ),
+}
+"以模块(相对于 `graia.application`)为键的, 本模块提供的名称."
+
+_origins: Dict[str, str] = {name: module for module, names in EXPORTS.items() for name in names}
+
+__all__ = list(_origins)
+
+if TYPE_CHECKING:
+    from . import GraiaMiraiApplication
+    from .logger import AbstractLogger, LoggingLogger
+    from .event.dispatcher import MessageChainCatcher
+    from .event.lifecycle import ApplicationLaunched, ApplicationShutdowned
+    from .event.messages import FriendMessage, GroupMessage, TempMessage
+    from .event.mirai import (
+        BotOnlineEvent,
+        BotOfflineEventActive,
+        BotOfflineEventForce,
+        BotOfflineEventDropped,
+        BotReloginEvent,
+        BotGroupPermissionChangeEvent,
+        BotMuteEvent,
+        BotUnmuteEvent,
+        BotJoinGroupEvent,
+        GroupRecallEvent,
+        FriendRecallEvent,
+        GroupNameChangeEvent,
+        GroupEntranceAnnouncementChangeEvent,
+        GroupMuteAllEvent,
+        GroupAllowAnonymousChatEvent,
+        GroupAllowConfessTalkEvent,
+        GroupAllowMemberInviteEvent,
+        MemberJoinEvent,
+        MemberLeaveEventKick,
+        MemberLeaveEventQuit,
+        MemberCardChangeEvent,
+        MemberSpecialTitleChangeEvent,
+        MemberPermissionChangeEvent,
+        MemberMuteEvent,
+        MemberUnmuteEvent,
+        NewFriendRequestEvent,
+        MemberJoinRequestEvent,
+        BotInvitedJoinGroupRequestEvent,
+    )
+    from .message.elements.internal import (
+        Plain,
+        Source,
+        Quote,
+        At,
+        AtAll,
+        Face,
+        Image,
+        FlashImage,
+        Xml,
+        Json,
+        App,
+        Poke,
+        PokeMethods,
+    )
+    from .message.chain import MessageChain
+    from .friend import Friend
+    from .group import MemberPerm, Group, Member, MemberInfo, GroupConfig
+    from .session import Session
+    from .exceptions import (
+        InvalidEventTypeDefinition,
+        InvaildVerifyKey,
+        AccountNotFound,
+        InvaildSession,
+        UnauthorizedSession,
+        UnknownTarget,
+        AccountMuted,
+        TooLongMessage,
+        InvaildArgument,
+        NotSupportedVersion,
+        DeprecatedImpl,
+        EntangledSuperposition,
+        MissingNecessaryOne,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    module = _origins.get(name)
+    if module is None:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module, "graia.application"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -11,9 +11,7 @@ class MiraiEvent(Dispatchable, BaseModel):
     @validator("type", allow_reuse=True)
     def type_limit(cls, v):
         if cls.type != v:
-            raise InvalidEventTypeDefinition(
-                "{0}'s type must be '{1}', not '{2}'".format(cls.__name__, cls.type, v)
-            )
+            raise InvalidEventTypeDefinition("{0}'s type must be '{1}', not '{2}'".format(cls.__name__, cls.type, v))
         return v
 
     class Config:
@@ -36,3 +34,12 @@ class EmptyDispatcher(BaseDispatcher):
     @staticmethod
     async def catch(interface):
         pass
+
+
+def load_events() -> None:
+    """导入所有内置的事件类.
+
+    `Broadcast.findEvent` 只能找到已经被导入的事件类. 导入 `graia.application.app`(包括第一次访问
+    `graia.application.GraiaMiraiApplication`)时会调用本函数; 事件解码器在以类型名找不到事件时也会调用.
+    """
+    from . import lifecycle, messages, mirai, network  # noqa: F401
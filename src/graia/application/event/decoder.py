@@ -0,0 +1,211 @@
+"""从 `mirai-api-http` 推送的原始数据中解码事件.
+
+默认使用 pydantic 的完整校验(严格模式); 当上游被信任时, 可以改为使用为每个事件类预先编译的构造器,
+直接按字段转换数据并构造实例, 以跳过逐字段的校验.
+
+开启懒解码时, 事件中的消息链(包括转发消息中每个节点的消息链)会被解码为 `LazyMessageChain`,
+直到第一次被访问时才解码其中的元素.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from graia.broadcast import Broadcast
+from graia.broadcast.entities.event import Dispatchable
+from pydantic import BaseModel
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import SHAPE_LIST, SHAPE_SEQUENCE, SHAPE_SINGLETON, ModelField
+
+from graia.application.exceptions import InvaildArgument
+from graia.application.message.chain import MessageChain
+from graia.application.message.lazy import LazyMessageChain
+
+from . import MiraiEvent, load_events
+
+Constructor = Callable[[dict], BaseModel]
+
+event_types: Dict[str, Type[Dispatchable]] = {}
+"以事件的类型名为键的事件类缓存, 未命中时通过 `Broadcast.findEvent` 查找."
+
+constructors: Dict[Tuple[Type[BaseModel], bool], Optional[Constructor]] = {}
+"以 (模型类, 是否懒解码) 为键的已编译的构造器, 值为 None 的类无法被编译, 只能通过严格模式解码."
+
+IDENTITY_TYPES = (int, str, bool, float, bytes, Any)
+
+
+class Uncompilable(Exception):
+    "该字段无法被编译为构造器, 所在的类将回退到严格模式."
+
+
+def find_event_type(type_name: str) -> Optional[Type[Dispatchable]]:
+    """从类型名获取事件类, 结果将被缓存; 未找到时先导入所有内置的事件类再查找一次.
+
+    Args:
+        type_name (str): 事件的类型名, 即序列化态中的 `type` 字段.
+
+    Returns:
+        Optional[Type[Dispatchable]]: 对应的事件类, 若未找到则为 None.
+    """
+    event_type = event_types.get(type_name)
+    if event_type is None:
+        event_type = Broadcast.findEvent(type_name)
+        if event_type is None:  # 可能是尚未被导入的内置事件
+            load_events()
+            event_type = Broadcast.findEvent(type_name)
+        if event_type is not None:
+            event_types[type_name] = event_type
+    return event_type
+
+
+def compile_type(type_: Any, lazy: bool = False) -> Optional[Callable[[Any], Any]]:
+    if type_ in IDENTITY_TYPES:
+        return None
+    if getattr(type_, "__origin__", None) is not None or not isinstance(type_, type):
+        raise Uncompilable(type_)
+    if issubclass(type_, MessageChain):
+        return LazyMessageChain.from_raw if lazy else type_.parse_obj
+    if issubclass(type_, BaseModel):
+        return compile_constructor(type_, lazy) or type_.parse_obj
+    if issubclass(type_, Enum):
+        return type_
+    if issubclass(type_, datetime):
+        return parse_datetime
+    raise Uncompilable(type_)
+
+
+def compile_field(field: ModelField, lazy: bool = False) -> Optional[Callable[[Any], Any]]:
+    if field.shape == SHAPE_SINGLETON:
+        return compile_type(field.type_, lazy)
+    elif field.shape in (SHAPE_LIST, SHAPE_SEQUENCE):
+        converter = compile_type(field.type_, lazy)
+        if converter is None:
+            return list
+        return lambda value: [converter(i) for i in value]
+    raise Uncompilable(field)
+
+
+def compile_constructor(model: Type[BaseModel], lazy: bool = False) -> Optional[Constructor]:
+    """为一个模型类编译构造器: 按字段预先确定转换方式, 构造时不再进行校验.
+
+    含有自定义校验器, 根校验器或自定义根类型的模型无法被编译.
+
+    Args:
+        model (Type[BaseModel]): 需要编译的模型类.
+        lazy (bool, optional): 是否将消息链字段解码为 `LazyMessageChain`. 默认为 False.
+
+    Returns:
+        Optional[Constructor]: 接受原始 dict 并返回模型实例的构造器, 无法编译时为 None.
+    """
+    key = (model, lazy)
+    if key in constructors:
+        return constructors[key]
+    constructors[key] = None  # 防止自引用的模型无限递归
+
+    if model.__custom_root_type__ or model.__pre_root_validators__ or model.__post_root_validators__:
+        return None
+
+    fields: List[Tuple[str, str, Optional[Callable[[Any], Any]], ModelField]] = []
+    for field in model.__fields__.values():
+        if field.name == "type" and issubclass(model, MiraiEvent):
+            continue  # 类型名已用于查找事件类, 直接使用默认值
+        if field.class_validators:
+            return None
+        try:
+            fields.append((field.alias, field.name, compile_field(field, lazy), field))
+        except Uncompilable:
+            return None
+
+    private_attributes = bool(getattr(model, "__private_attributes__", None))
+
+    def constructor(obj: dict) -> BaseModel:
+        values = {}
+        fields_set = set()
+        for alias, name, converter, field in fields:
+            if alias in obj:
+                value = obj[alias]
+                values[name] = converter(value) if converter is not None and value is not None else value
+                fields_set.add(name)
+            elif not field.required:
+                values[name] = field.get_default()
+        instance = model.construct(fields_set, **values)
+        if private_attributes:
+            instance._init_private_attributes()
+        return instance
+
+    constructors[key] = constructor
+    return constructor
+
+
+def lazify(model: Type[BaseModel], obj: dict) -> dict:
+    """在严格模式下开启懒解码时使用: 将原始数据中对应消息链字段的列表替换为 `LazyMessageChain`,
+    使其在随后的校验中不被解码.
+
+    Args:
+        model (Type[BaseModel]): 原始数据对应的模型类.
+        obj (dict): 原始数据, 不会被修改.
+
+    Returns:
+        dict: 替换后的数据.
+    """
+    result = dict(obj)
+    for field in model.__fields__.values():
+        value = obj.get(field.alias)
+        type_ = field.type_
+        if value is None or not isinstance(type_, type):
+            continue
+        if issubclass(type_, MessageChain):
+            if field.shape == SHAPE_SINGLETON and isinstance(value, list):
+                result[field.alias] = LazyMessageChain.from_raw(value)
+        elif issubclass(type_, BaseModel) and not type_.__custom_root_type__:
+            if field.shape == SHAPE_SINGLETON and isinstance(value, dict):
+                result[field.alias] = lazify(type_, value)
+            elif field.shape in (SHAPE_LIST, SHAPE_SEQUENCE) and isinstance(value, list):
+                result[field.alias] = [lazify(type_, i) if isinstance(i, dict) else i for i in value]
+    return result
+
+
+class EventDecoder:
+    """事件解码器.
+
+    Attributes:
+        trusted (bool): 是否信任上游; 为 True 时使用预先编译的构造器解码事件(无法编译的事件类仍使用严格模式),
+            为 False 时使用 pydantic 进行完整的校验.
+        lazy (bool): 是否将事件中的消息链解码为 `LazyMessageChain`, 在第一次访问时才进行解码.
+    """
+
+    trusted: bool
+    lazy: bool
+
+    def __init__(self, trusted: bool = False, lazy: bool = False) -> None:
+        self.trusted = trusted
+        self.lazy = lazy
+
+    def decode(self, original_dict: dict) -> MiraiEvent:
+        """从尚未明确指定事件类型的对象中获取事件的定义, 并进行解析
+
+        Args:
+            original_dict (dict): 用 dict 表示的序列化态事件, 应包含有字段 `type` 以供分析事件定义.
+
+        Raises:
+            InvaildArgument: 目标对象中不包含字段 `type`
+            ValueError: 没有找到对应的字段, 通常的, 这意味着应用获取到了一个尚未被定义的事件, 请报告问题.
+
+        Returns:
+            MiraiEvent: 已经被序列化的事件
+        """
+        type_name = original_dict.get("type")
+        if not type_name and not isinstance(type_name, str):
+            raise InvaildArgument("you need to provide a 'type' field for automatic parsing")
+        event_type = find_event_type(type_name)
+        if not event_type:
+            raise ValueError("we cannot find a such event: {}".format(type_name))
+        if self.trusted:
+            constructor = compile_constructor(event_type, self.lazy)
+            if constructor is not None:
+                return constructor(original_dict)
+        if self.lazy:
+            original_dict = lazify(event_type, original_dict)
+        return event_type.parse_obj({k: v for k, v in original_dict.items() if k != "type"})
+
+
+strict_decoder = EventDecoder(trusted=False)
@@ -714,17 +714,19 @@ class NewFriendRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/newFriendRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.sourceGroup,
-                "operate": 0,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.sourceGroup,
+                    "operate": 0,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def reject(self, message: str = "") -> NoReturn:
@@ -745,17 +747,19 @@ class NewFriendRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/newFriendRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.sourceGroup,
-                "operate": 1,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.sourceGroup,
+                    "operate": 1,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def rejectAndBlock(self, message: str = "") -> NoReturn:
@@ -776,17 +780,19 @@ class NewFriendRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/newFriendRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.sourceGroup,
-                "operate": 2,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.sourceGroup,
+                    "operate": 2,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
 
@@ -844,17 +850,19 @@ class MemberJoinRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/memberJoinRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 0,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 0,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def reject(self, message: str = "") -> NoReturn:
@@ -875,17 +883,19 @@ class MemberJoinRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/memberJoinRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 1,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 1,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def ignore(self, message: str = "") -> NoReturn:
@@ -906,17 +916,19 @@ class MemberJoinRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/memberJoinRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 2,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 2,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def rejectAndBlock(self, message: str = "") -> NoReturn:
@@ -937,17 +949,19 @@ class MemberJoinRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/memberJoinRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 3,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 3,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def ignoreAndBlock(self, message: str = "") -> NoReturn:
@@ -968,17 +982,19 @@ class MemberJoinRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/memberJoinRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 4,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 4,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
 
@@ -1033,17 +1049,19 @@ class BotInvitedJoinGroupRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/botInvitedJoinGroupRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 0,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 0,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
     async def reject(self, message: str = "") -> NoReturn:
@@ -1064,17 +1082,19 @@ class BotInvitedJoinGroupRequestEvent(MiraiEvent):
             raise InvaildSession("you must authenticate before this.")
         async with app.session.post(
             app.url_gen("resp/botInvitedJoinGroupRequestEvent"),
-            json={
-                "sessionKey": app.connect_info.sessionKey,
-                "eventId": self.requestId,
-                "fromId": self.supplicant,
-                "groupId": self.groupId,
-                "operate": 1,
-                "message": message,
-            },
+            data=app.json_codec.payload(
+                {
+                    "sessionKey": app.connect_info.sessionKey,
+                    "eventId": self.requestId,
+                    "fromId": self.supplicant,
+                    "groupId": self.groupId,
+                    "operate": 1,
+                    "message": message,
+                }
+            ),
         ) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = app.json_codec.loads(await response.read())
             raise_for_return_code(data)
 
 
@@ -71,3 +71,18 @@ class MissingNecessaryOne(Exception):
 class ConflictItem(Exception):
     "项冲突/其中一项被重复定义"
     pass
+
+
+class SendQueueFull(Exception):
+    "等待发送的消息过多, 发送调度器拒绝了这条消息."
+    pass
+
+
+class UploadTooLarge(Exception):
+    "上传的数据超过了大小限制."
+    pass
+
+
+class UploadStreamConsumed(Exception):
+    "一次性的数据流已在失败的上传中被读取, 无法重新上传; 需要重试时应传入可重新打开数据源的函数."
+    pass
@@ -0,0 +1,203 @@
+"""在同一个进程, 同一个事件循环中托管多个账号的应用实例.
+
+原先每个账号需要一个独立的进程: 每个进程各自加载整个框架, 并拥有各自的连接池与 JSON 编解码器.
+`ApplicationHost` 为每个账号创建一个应用实例, 这些应用实例:
+
+ - 共用同一个 `Broadcast`: 监听器只需注册一次, 通过 `GraiaMiraiApplication` 类型的参数即可获取
+   接收到该事件的应用实例(由 `enter_context` 设置);
+ - 共用同一个 `TCPConnector` 连接池, JSON 编解码器与媒体下载客户端;
+ - 各自拥有自己的 `Session`, `ClientSession`, 联系人目录, websocket 连接或轮询.
+
+`start` 并发地初始化所有应用实例(某个账号初始化失败不会影响其余账号), 并为每个应用实例开始接收事件;
+`stop` 依次停止接收事件, 关闭所有应用实例, 最后关闭共用的连接池.
+"""
+import asyncio
+import traceback
+from typing import Any, Awaitable, Dict, Iterator, Optional
+
+from aiohttp import ClientSession, TCPConnector
+from graia.broadcast import Broadcast
+
+from .app import GraiaMiraiApplication
+from .codec import JsonCodec, default_codec
+from .context import enter_context
+from .logger import AbstractLogger, LoggingLogger
+from .media import MediaClient
+from .session import Session
+
+PER_ACCOUNT = (
+    "ingestion",
+    "send_scheduler",
+    "message_store",
+    "startup_pipeline",
+    "reconnect_policy",
+    "http_poller",
+)
+"""绑定到单个应用实例的组件: 摄入队列绑定到启动它的应用实例, 发送调度器的队列以发送对象为键,
+消息存储以 `messageId` 为键, 启动流水线记录单次启动的状态, 重连策略记录单个连接的状态与已分发的事件,
+轮询器记录单个账号的轮询间隔与批量大小; 因此不能在多个账号之间共用."""
+
+
+class ApplicationHost:
+    """多账号的应用实例托管器.
+
+    Attributes:
+        broadcast (Broadcast): 所有应用实例共用的事件系统.
+        connector (TCPConnector): 所有应用实例共用的连接池.
+        json_codec (JsonCodec): 所有应用实例共用的 JSON 编解码器.
+        media (MediaClient): 所有应用实例共用的媒体下载客户端.
+        logger (AbstractLogger): 托管器自身的日志, 同时是未指定 `logger` 的应用实例的日志.
+        concurrency (int): 启动时同时进行初始化的应用实例数的上限.
+        apps (Dict[int, GraiaMiraiApplication]): 以账号为键的应用实例.
+        failed (Dict[int, BaseException]): 初始化失败的账号及其异常.
+        fetching (Dict[int, asyncio.Task]): 以账号为键的, 接收事件的任务.
+    """
+
+    broadcast: Broadcast
+    connector: TCPConnector
+    json_codec: JsonCodec
+    media: MediaClient
+    logger: AbstractLogger
+    concurrency: int
+
+    apps: Dict[int, GraiaMiraiApplication]
+    failed: Dict[int, BaseException]
+    fetching: Dict[int, asyncio.Task]
+
+    def __init__(
+        self,
+        broadcast: Broadcast,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        json_codec: Optional[JsonCodec] = None,
+        media_client: Optional[MediaClient] = None,
+        logger: Optional[AbstractLogger] = None,
+        concurrency: int = 8,
+    ) -> None:
+        self.broadcast = broadcast
+        self.connector = TCPConnector(limit=limit, limit_per_host=limit_per_host, loop=broadcast.loop)
+        self.json_codec = json_codec or default_codec()
+        self.media = media_client or MediaClient()
+        self.logger = logger or LoggingLogger()
+        self.concurrency = concurrency
+
+        self.apps = {}
+        self.failed = {}
+        self.fetching = {}
+
+    def __len__(self) -> int:
+        return len(self.apps)
+
+    def __iter__(self) -> Iterator[GraiaMiraiApplication]:
+        return iter(self.apps.values())
+
+    def add(self, connect_info: Session, **options: Any) -> GraiaMiraiApplication:
+        """为一个账号创建应用实例.
+
+        Args:
+            connect_info (Session): 该账号的会话信息, 其中的 `account` 必须唯一.
+            **options: 传递给 `GraiaMiraiApplication` 的其他参数;
+                `broadcast`, `session`, `json_codec` 与 `media_client` 由托管器提供.
+                `ingestion`, `send_scheduler`, `message_store`, `startup_pipeline`, `reconnect_policy`
+                与 `http_poller` 属于单个账号, 每个账号需要各自的实例.
+
+        Raises:
+            ValueError: 该账号已被托管, 或传入的某个组件已被其他账号使用.
+
+        Returns:
+            GraiaMiraiApplication: 所创建的应用实例.
+        """
+        if connect_info.account in self.apps:
+            raise ValueError("account {0} is already hosted".format(connect_info.account))
+        for name in PER_ACCOUNT:
+            component = options.get(name)
+            if component is None:
+                continue
+            for account, other in self.apps.items():
+                if getattr(other, name) is component:
+                    raise ValueError(
+                        "{0} is already used by account {1}; "
+                        "each account needs its own instance".format(name, account)
+                    )
+        options.setdefault("logger", self.logger)
+        app = GraiaMiraiApplication(
+            broadcast=self.broadcast,
+            connect_info=connect_info,
+            session=ClientSession(
+                connector=self.connector,
+                connector_owner=False,
+                loop=self.broadcast.loop,
+            ),
+            json_codec=self.json_codec,
+            media_client=self.media,
+            **options,
+        )
+        self.apps[connect_info.account] = app
+        return app
+
+    def get(self, account: int) -> Optional[GraiaMiraiApplication]:
+        "获取一个账号的应用实例, 未被托管时为 None."
+        return self.apps.get(account)
+
+    def spawn(self, app: GraiaMiraiApplication, coro: Awaitable) -> asyncio.Task:
+        "在应用实例的上下文中创建任务, 使其中分发的事件与 `application` 上下文指向该应用实例."
+        with enter_context(app=app):
+            return self.broadcast.loop.create_task(coro)
+
+    async def _initialize(self, account: int, app: GraiaMiraiApplication, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                await self.spawn(app, app.initialize())
+            except Exception as e:
+                self.failed[account] = e
+                self.logger.error("failed to initialize account {0}:".format(account))
+                traceback.print_exc()
+                return
+        with enter_context(app=app):
+            self.fetching[account] = app.initializeFetchingTask()
+
+    async def start(self) -> None:
+        "并发地初始化所有尚未启动的应用实例, 并开始接收事件."
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(
+            *(
+                self._initialize(account, app, semaphore)
+                for account, app in self.apps.items()
+                if account not in self.fetching
+            )
+        )
+        self.logger.info("host: {0} of {1} accounts started".format(len(self.fetching), len(self)))
+
+    async def wait(self) -> None:
+        "等待所有接收事件的任务结束; 单个任务的异常只会被记录."
+        results = await asyncio.gather(*self.fetching.values(), return_exceptions=True)
+        for account, result in zip(list(self.fetching), results):
+            if isinstance(result, Exception):
+                self.logger.error("account {0} stopped receiving events: {1!r}".format(account, result))
+
+    async def stop(self) -> None:
+        "停止接收事件, 关闭所有应用实例, 并关闭共用的连接池与媒体下载客户端."
+        for task in self.fetching.values():
+            task.cancel()
+        await asyncio.gather(*self.fetching.values(), return_exceptions=True)
+        self.fetching.clear()
+
+        results = await asyncio.gather(
+            *(self.spawn(app, app.shutdown(cancel_tasks=False)) for app in self.apps.values()),
+            return_exceptions=True,
+        )
+        for account, result in zip(self.apps, results):
+            if isinstance(result, Exception):
+                self.logger.error("failed to shutdown account {0}: {1!r}".format(account, result))
+        await self.media.close()
+        await self.connector.close()
+
+    def launch_blocking(self) -> None:
+        "启动所有应用实例并持续接收事件, 直到被中断, 然后关闭所有应用实例."
+        loop = self.broadcast.loop
+        try:
+            loop.run_until_complete(self.start())
+            loop.run_until_complete(self.wait())
+        finally:
+            loop.run_until_complete(self.stop())
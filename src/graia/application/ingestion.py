@@ -0,0 +1,329 @@
+"""接收事件与 `Broadcast` 之间的摄入队列.
+
+默认情况下, 每个接收到的事件都会通过 `broadcast.postEvent` 立即创建一个任务; 在消息洪泛时,
+任务的数量不受限制, 且好友申请等需要及时处理的事件会排在大量的消息之后.
+摄入队列为此提供了:
+
+- 有界的队列, 以及固定数量的工作者(worker), 由工作者将事件交由 `Broadcast` 处理;
+- 按事件类型划分的优先级, 数值越小越先被处理;
+- 队列已满时的溢出策略(`OverflowPolicy`);
+- 队列深度, 各类型的丢弃数量与事件的等待时间等指标(`IngestionMetrics`).
+"""
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from graia.broadcast.entities.event import Dispatchable
+
+from .context import enter_context
+
+if TYPE_CHECKING:
+    from graia.application import GraiaMiraiApplication
+
+DEFAULT_PRIORITIES: Dict[str, int] = {
+    # 请求与账号状态相关的事件
+    "NewFriendRequestEvent": 0,
+    "MemberJoinRequestEvent": 0,
+    "BotInvitedJoinGroupRequestEvent": 0,
+    "BotOnlineEvent": 0,
+    "BotOfflineEventActive": 0,
+    "BotOfflineEventForce": 0,
+    "BotOfflineEventDropped": 0,
+    "BotReloginEvent": 0,
+    # 消息
+    "GroupMessage": 2,
+    "FriendMessage": 2,
+    "TempMessage": 2,
+}
+"默认的事件优先级, 以事件类名为键; 未列出的事件优先级为 1."
+
+DEFAULT_DROPPABLE: Set[str] = {"GroupMessage", "FriendMessage", "TempMessage"}
+"默认在 `OverflowPolicy.DropByType` 策略下允许被丢弃的事件类型."
+
+
+class OverflowPolicy(Enum):
+    """队列已满时的处理策略.
+
+    - `DropOldest`: 丢弃队列中优先级最低的, 最早进入队列的事件; 若队列中的事件优先级都高于新事件, 则丢弃新事件.
+    - `DropByType`: 丢弃队列中最早的可丢弃类型(`droppable`)的事件; 若没有, 则在新事件可丢弃时丢弃新事件, 否则等待.
+    - `Block`: 阻塞接收事件的一方(websocket 读取或 HTTP 轮询), 直到队列中有空位.
+    """
+
+    DropOldest = "drop_oldest"
+    DropByType = "drop_by_type"
+    Block = "block"
+
+
+class IngestionMetrics:
+    """摄入队列的运行指标.
+
+    Attributes:
+        depth (int): 当前队列中的事件数量.
+        max_depth (int): 队列深度的历史最大值.
+        enqueued (int): 进入队列的事件总数.
+        dispatched (int): 已交由 `Broadcast` 处理的事件总数.
+        detached (int): 因处理超时而被分离, 转为在后台继续运行的事件数.
+        dropped (Dict[str, int]): 以事件类名为键的丢弃数量.
+        wait_time_total (float): 事件在队列中等待的总时长, 单位为秒.
+        wait_time_max (float): 单个事件在队列中等待的最长时长, 单位为秒.
+    """
+
+    depth: int
+    max_depth: int
+    enqueued: int
+    dispatched: int
+    detached: int
+    dropped: Dict[str, int]
+    wait_time_total: float
+    wait_time_max: float
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.max_depth = 0
+        self.enqueued = 0
+        self.dispatched = 0
+        self.detached = 0
+        self.dropped = {}
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @property
+    def wait_time_mean(self) -> float:
+        return self.wait_time_total / self.dispatched if self.dispatched else 0.0
+
+    def snapshot(self) -> dict:
+        "以 dict 的形式导出当前的指标, 便于记录日志或上报."
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dispatched": self.dispatched,
+            "detached": self.detached,
+            "dropped": dict(self.dropped),
+            "wait_time_mean": self.wait_time_mean,
+            "wait_time_max": self.wait_time_max,
+        }
+
+
+class IngestionQueue:
+    """有界的, 带有优先级与背压的事件摄入队列.
+
+    工作者在将事件交由 `Broadcast` 后, 最多等待 `dispatch_timeout` 秒;
+    超时后该事件的处理会在后台继续, 工作者转而处理下一个事件,
+    以避免等待中断(Interrupt)的监听器占满所有工作者, 导致其等待的后续事件无法被处理.
+    在后台继续的处理至多有 `max_detached` 个; 达到上限后, 工作者会等待其中之一完成再处理下一个事件,
+    使得背压(以及溢出策略)依然对处理缓慢的监听器生效.
+
+    Attributes:
+        maxsize (int): 队列的容量.
+        workers (int): 工作者的数量.
+        policy (OverflowPolicy): 队列已满时的处理策略.
+        priorities (Dict[str, int]): 以事件类名为键的优先级, 数值越小越先被处理.
+        default_priority (int): 未在 `priorities` 中列出的事件的优先级.
+        droppable (Set[str]): `OverflowPolicy.DropByType` 策略下允许被丢弃的事件类名.
+        dispatch_timeout (Optional[float]): 工作者等待单个事件处理完成的最长时间, 为 None 时一直等待.
+        max_detached (int): 同时在后台继续的处理的上限.
+        metrics (IngestionMetrics): 运行指标.
+    """
+
+    maxsize: int
+    workers: int
+    policy: OverflowPolicy
+    priorities: Dict[str, int]
+    default_priority: int
+    droppable: Set[str]
+    dispatch_timeout: Optional[float]
+    max_detached: int
+    metrics: IngestionMetrics
+
+    app: Optional["GraiaMiraiApplication"]
+    levels: List[Deque[Tuple[float, Dispatchable]]]
+
+    _tasks: List[asyncio.Task]
+    _dispatching: Set[asyncio.Task]
+    _detached: Set[asyncio.Task]
+    _lock: Optional[asyncio.Lock]
+    _not_empty: Optional[asyncio.Condition]
+    _not_full: Optional[asyncio.Condition]
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        workers: int = 4,
+        policy: OverflowPolicy = OverflowPolicy.DropOldest,
+        priorities: Optional[Dict[str, int]] = None,
+        default_priority: int = 1,
+        droppable: Optional[Iterable[str]] = None,
+        dispatch_timeout: Optional[float] = 5.0,
+        max_detached: int = 256,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        if max_detached <= 0:
+            raise ValueError("max_detached must be positive")
+        self.maxsize = maxsize
+        self.workers = workers
+        self.policy = policy
+        self.priorities = dict(DEFAULT_PRIORITIES if priorities is None else priorities)
+        self.default_priority = default_priority
+        self.droppable = set(DEFAULT_DROPPABLE if droppable is None else droppable)
+        self.dispatch_timeout = dispatch_timeout
+        self.max_detached = max_detached
+        self.metrics = IngestionMetrics()
+
+        self.app = None
+        self.levels = [deque() for _ in range(max([default_priority, *self.priorities.values()]) + 1)]
+
+        self._tasks = []
+        self._dispatching = set()
+        self._detached = set()
+        self._lock = None
+        self._not_empty = None
+        self._not_full = None
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def priority_of(self, event: Dispatchable) -> int:
+        return self.priorities.get(event.__class__.__name__, self.default_priority)
+
+    def start(self, app: "GraiaMiraiApplication") -> None:
+        """创建工作者; 需要在事件循环中调用.
+
+        Args:
+            app (GraiaMiraiApplication): 事件所属的应用实例, 工作者将在其上下文中分发事件.
+        """
+        if self.started:
+            return
+        self.app = app
+        self._lock = asyncio.Lock()
+        self._not_empty = asyncio.Condition(self._lock)
+        self._not_full = asyncio.Condition(self._lock)
+        self._tasks = [app.broadcast.loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """取消所有工作者, 并等待仍在进行(包括在后台继续)的处理至多 `dispatch_timeout` 秒,
+        之后取消其中尚未完成的; 队列中尚未处理的事件会被保留.
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        dispatching = set(self._dispatching)
+        if dispatching:
+            _, pending = await asyncio.wait(dispatching, timeout=self.dispatch_timeout)
+            for task in pending:
+                task.cancel()
+            # 监听器的异常已由 `Broadcast` 处理, 此处只需等待其结束.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _record_drop(self, event: Dispatchable) -> None:
+        name = event.__class__.__name__
+        self.metrics.dropped[name] = self.metrics.dropped.get(name, 0) + 1
+
+    def _evict(self, level: int, index: int = 0) -> None:
+        queue = self.levels[level]
+        if index == 0:
+            _, evicted = queue.popleft()
+        else:
+            _, evicted = queue[index]
+            del queue[index]
+        self.metrics.depth -= 1
+        self._record_drop(evicted)
+
+    def _make_room(self, event: Dispatchable, priority: int) -> Optional[bool]:
+        """按溢出策略为新事件腾出空位.
+
+        Returns:
+            Optional[bool]: True 表示已腾出空位, False 表示应丢弃新事件, None 表示需要等待.
+        """
+        if self.policy is OverflowPolicy.DropOldest:
+            for level in range(len(self.levels) - 1, priority - 1, -1):
+                if self.levels[level]:
+                    self._evict(level)
+                    return True
+            return False
+        elif self.policy is OverflowPolicy.DropByType:
+            for level in range(len(self.levels) - 1, -1, -1):
+                for index, (_, queued) in enumerate(self.levels[level]):
+                    if queued.__class__.__name__ in self.droppable:
+                        self._evict(level, index)
+                        return True
+            if event.__class__.__name__ in self.droppable:
+                return False
+        return None
+
+    async def put(self, event: Dispatchable) -> bool:
+        """将事件放入队列; 在 `OverflowPolicy.Block` 策略下, 队列已满时会等待空位.
+
+        Args:
+            event (Dispatchable): 需要分发的事件.
+
+        Returns:
+            bool: 事件是否进入了队列, 为 False 时表示事件因队列已满被丢弃.
+        """
+        if not self.started:
+            raise RuntimeError("the ingestion queue has not been started")
+        priority = min(self.priority_of(event), len(self.levels) - 1)
+        async with self._lock:
+            while self.metrics.depth >= self.maxsize:
+                room = self._make_room(event, priority)
+                if room is False:
+                    self._record_drop(event)
+                    return False
+                elif room is None:
+                    await self._not_full.wait()
+            self.levels[priority].append((time.monotonic(), event))
+            self.metrics.depth += 1
+            self.metrics.enqueued += 1
+            if self.metrics.depth > self.metrics.max_depth:
+                self.metrics.max_depth = self.metrics.depth
+            self._not_empty.notify()
+        return True
+
+    async def get(self) -> Tuple[float, Dispatchable]:
+        "取出优先级最高的, 最早进入队列的事件及其入队时间."
+        async with self._lock:
+            while not self.metrics.depth:
+                await self._not_empty.wait()
+            for queue in self.levels:
+                if queue:
+                    item = queue.popleft()
+                    break
+            self.metrics.depth -= 1
+            self._not_full.notify()
+            return item
+
+    async def _worker(self) -> None:
+        broadcast = self.app.broadcast
+        while True:
+            enqueued_at, event = await self.get()
+            wait_time = time.monotonic() - enqueued_at
+            self.metrics.wait_time_total += wait_time
+            if wait_time > self.metrics.wait_time_max:
+                self.metrics.wait_time_max = wait_time
+
+            with enter_context(app=self.app, event_i=event):
+                task = broadcast.loop.create_task(
+                    broadcast.layered_scheduler(listener_generator=self.app.listeners_for(event), event=event)
+                )
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+            self.metrics.dispatched += 1
+            done, _ = await asyncio.wait({task}, timeout=self.dispatch_timeout)
+            if not done:
+                self.metrics.detached += 1
+                self._detached.add(task)
+                task.add_done_callback(self._detached.discard)
+                while len(self._detached) > self.max_detached:
+                    await asyncio.wait(set(self._detached), return_when=asyncio.FIRST_COMPLETED)
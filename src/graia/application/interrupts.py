@@ -1,5 +1,10 @@
-from typing import Callable, Optional, Union
-from graia.broadcast.exceptions import ExecutionStop
+import asyncio
+import heapq
+import itertools
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
+from graia.broadcast import Broadcast
+from graia.broadcast.exceptions import ExecutionStop, PropagationCancelled
 from graia.broadcast.interrupt.waiter import Waiter
 from graia.application.group import Group, Member
 from graia.application.message.elements.internal import Quote, Source
@@ -18,16 +23,10 @@ def GroupMessageInterrupt(
     @Waiter.create_using_function([GroupMessage], block_propagation=block_propagation)
     def GroupMessageInterruptWaiter(event: GroupMessage):
         if special_group:
-            if event.sender.group.id != (
-                special_group.id if isinstance(special_group, Group) else special_group
-            ):
+            if event.sender.group.id != (special_group.id if isinstance(special_group, Group) else special_group):
                 raise ExecutionStop()
         if special_member:
-            if event.sender.id != (
-                special_member.id
-                if isinstance(special_member, Member)
-                else special_member
-            ):
+            if event.sender.id != (special_member.id if isinstance(special_member, Member) else special_member):
                 raise ExecutionStop()
         if quote_access:
             quotes = event.messageChain.get(Quote)
@@ -57,11 +56,7 @@ def FriendMessageInterrupt(
     @Waiter.create_using_function([FriendMessage], block_propagation=block_propagation)
     def FriendMessageInterruptWaiter(event: FriendMessage):
         if special_friend:
-            if event.sender.id != (
-                special_friend.id
-                if isinstance(special_friend, Friend)
-                else special_friend
-            ):
+            if event.sender.id != (special_friend.id if isinstance(special_friend, Friend) else special_friend):
                 raise ExecutionStop()
         if quote_access:
             quotes = event.messageChain.get(Quote)
@@ -92,16 +87,10 @@ def TempMessageInterrupt(
     @Waiter.create_using_function([TempMessage], block_propagation=block_propagation)
     def TempMessageInterruptWaiter(event: TempMessage):
         if special_group:
-            if event.sender.group.id != (
-                special_group.id if isinstance(special_group, Group) else special_group
-            ):
+            if event.sender.group.id != (special_group.id if isinstance(special_group, Group) else special_group):
                 raise ExecutionStop()
         if special_member:
-            if event.sender.id != (
-                special_member.id
-                if isinstance(special_member, Member)
-                else special_member
-            ):
+            if event.sender.id != (special_member.id if isinstance(special_member, Member) else special_member):
                 raise ExecutionStop()
         if quote_access:
             quotes = event.messageChain.get(Quote)
@@ -120,3 +109,299 @@ def TempMessageInterrupt(
         return event
 
     return TempMessageInterruptWaiter
+
+
+MessageEvent = Union[GroupMessage, FriendMessage, TempMessage]
+WaiterKey = Tuple[Type[MessageEvent], Optional[int], Optional[int], Optional[int]]
+
+
+class PendingWaiter:
+    "一个在 `InterruptRegistry` 中等待的中断."
+
+    __slots__ = (
+        "key",
+        "seq",
+        "future",
+        "custom_judgement",
+        "block_propagation",
+        "deadline",
+    )
+
+    key: WaiterKey
+    seq: int
+    future: "asyncio.Future"
+    custom_judgement: Optional[Callable[[MessageEvent], bool]]
+    block_propagation: bool
+    deadline: Optional[float]
+
+    def __init__(
+        self,
+        key: WaiterKey,
+        seq: int,
+        future: "asyncio.Future",
+        custom_judgement: Optional[Callable[[MessageEvent], bool]],
+        block_propagation: bool,
+        deadline: Optional[float],
+    ) -> None:
+        self.key = key
+        self.seq = seq
+        self.future = future
+        self.custom_judgement = custom_judgement
+        self.block_propagation = block_propagation
+        self.deadline = deadline
+
+
+class InterruptRegistry:
+    """以 (事件类型, 群号, 发送者, 被回复的消息 ID) 为索引的消息中断注册表.
+
+    `GroupMessageInterrupt` 等中断会为每个等待者挂载一个监听器, 每条消息都需要经过所有等待者的过滤;
+    注册表则只为每种消息事件挂载一个监听器, 收到消息时只需按其群号, 发送者与被回复的消息 ID 查找至多 8 个索引项,
+    便能找出所有可能符合条件的等待者. 所有等待者的超时共用同一个定时器.
+
+    Example:
+
+        ``` python
+        registry = InterruptRegistry(bcc)
+
+        @bcc.receiver(GroupMessage)
+        async def ask(app: GraiaMiraiApplication, group: Group, member: Member):
+            await app.sendGroupMessage(group, MessageChain.create([Plain("你叫什么名字?")]))
+            try:
+                answer = await registry.waitGroupMessage(group, member, timeout=60)
+            except asyncio.TimeoutError:
+                return
+        ```
+
+    Attributes:
+        broadcast (Broadcast): 监听器所挂载的事件系统.
+        priority (int): 所挂载的监听器的优先级.
+        size (int): 正在等待的等待者的数量.
+    """
+
+    broadcast: Broadcast
+    priority: int
+    size: int
+
+    index: Dict[WaiterKey, Dict[int, PendingWaiter]]
+    deadlines: List[Tuple[float, int, PendingWaiter]]
+
+    _counter: "itertools.count"
+    _timer: Optional[asyncio.TimerHandle]
+    _timer_deadline: Optional[float]
+
+    def __init__(self, broadcast: Broadcast, priority: int = 15) -> None:
+        self.broadcast = broadcast
+        self.priority = priority
+        self.size = 0
+        self.index = {}
+        self.deadlines = []
+        self._counter = itertools.count()
+        self._timer = None
+        self._timer_deadline = None
+        for event_type in (GroupMessage, FriendMessage, TempMessage):
+            broadcast.receiver(event_type, priority=priority)(self.listener_generator(event_type))
+
+    def listener_generator(self, event_type: Type[MessageEvent]):
+        async def registry_listener(event: event_type):
+            self.dispatch(event)
+
+        return registry_listener
+
+    @staticmethod
+    def keys_of(event: MessageEvent) -> List[WaiterKey]:
+        "获取可能与事件相符的所有索引项."
+        if isinstance(event, FriendMessage):
+            groups = (None,)
+        else:
+            groups = (event.sender.group.id, None)
+        quotes = event.messageChain.get(Quote)
+        return [
+            (event.__class__, group, sender, quote)
+            for group in groups
+            for sender in (event.sender.id, None)
+            for quote in ((quotes[0].id, None) if quotes else (None,))
+        ]
+
+    def dispatch(self, event: MessageEvent) -> None:
+        """将事件交给所有符合条件的等待者.
+
+        Raises:
+            PropagationCancelled: 接收了该事件的等待者中有要求阻止事件传播的.
+        """
+        candidates: List[PendingWaiter] = []
+        for key in self.keys_of(event):
+            bucket = self.index.get(key)
+            if bucket:
+                candidates.extend(bucket.values())
+        if not candidates:
+            return
+        candidates.sort(key=lambda x: x.seq)
+
+        block_propagation = False
+        for pending in candidates:
+            if pending.future.done():
+                continue
+            if pending.custom_judgement:
+                # 与原先每个等待者各自作为监听器时一致: 判断条件抛出的异常只影响该等待者.
+                try:
+                    if not pending.custom_judgement(event):
+                        continue
+                except Exception:
+                    traceback.print_exc()
+                    continue
+            pending.future.set_result(event)
+            self.discard(pending)
+            block_propagation = block_propagation or pending.block_propagation
+        if block_propagation:
+            raise PropagationCancelled()
+
+    async def wait(
+        self,
+        event_type: Type[MessageEvent],
+        group: Optional[int] = None,
+        sender: Optional[int] = None,
+        quote: Optional[int] = None,
+        custom_judgement: Optional[Callable[[MessageEvent], bool]] = None,
+        timeout: Optional[float] = None,
+        block_propagation: bool = False,
+    ) -> MessageEvent:
+        """等待一条符合条件的消息.
+
+        Args:
+            event_type (Type[MessageEvent]): 消息事件的类型.
+            group (Optional[int]): 消息所在群组的群号, 为 None 时不作限制; 对好友消息无效.
+            sender (Optional[int]): 发送者的 QQ 号, 为 None 时不作限制.
+            quote (Optional[int]): 消息所回复的消息的 ID, 为 None 时不作限制.
+            custom_judgement (Optional[Callable[[MessageEvent], bool]]): 额外的判断条件.
+            timeout (Optional[float]): 超时时间, 单位为秒, 为 None 时一直等待.
+            block_propagation (bool): 是否在接收到消息后阻止该事件继续传播.
+
+        Raises:
+            asyncio.TimeoutError: 超时.
+
+        Returns:
+            MessageEvent: 符合条件的消息事件.
+        """
+        loop = self.broadcast.loop
+        if event_type is FriendMessage:
+            group = None
+        key = (event_type, group, sender, quote)
+        pending = PendingWaiter(
+            key,
+            next(self._counter),
+            loop.create_future(),
+            custom_judgement,
+            block_propagation,
+            loop.time() + timeout if timeout is not None else None,
+        )
+        self.index.setdefault(key, {})[pending.seq] = pending
+        self.size += 1
+        if pending.deadline is not None:
+            heapq.heappush(self.deadlines, (pending.deadline, pending.seq, pending))
+            self._schedule()
+        try:
+            return await pending.future
+        finally:
+            self.discard(pending)
+
+    def discard(self, pending: PendingWaiter) -> None:
+        "移除一个等待者; 其在超时队列中的条目会在之后被惰性地清除."
+        bucket = self.index.get(pending.key)
+        if bucket is not None and bucket.pop(pending.seq, None) is not None:
+            self.size -= 1
+            if not bucket:
+                del self.index[pending.key]
+            if pending.deadline is not None and len(self.deadlines) > 2 * self.size + 64:
+                self.deadlines = [i for i in self.deadlines if not i[2].future.done()]
+                heapq.heapify(self.deadlines)
+
+    def _schedule(self) -> None:
+        "令共用的定时器在最早的超时时刻触发."
+        while self.deadlines and self.deadlines[0][2].future.done():
+            heapq.heappop(self.deadlines)
+        deadline = self.deadlines[0][0] if self.deadlines else None
+        if deadline == self._timer_deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._timer_deadline = deadline
+        if deadline is not None:
+            self._timer = self.broadcast.loop.call_at(deadline, self._expire)
+
+    def _expire(self) -> None:
+        self._timer = None
+        self._timer_deadline = None
+        now = self.broadcast.loop.time()
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, _, pending = heapq.heappop(self.deadlines)
+            if not pending.future.done():
+                pending.future.set_exception(asyncio.TimeoutError())
+            self.discard(pending)
+        self._schedule()
+
+    @staticmethod
+    def quote_id(quote_access: Optional[Union[BotMessage, Source]]) -> Optional[int]:
+        if isinstance(quote_access, BotMessage):
+            return quote_access.messageId
+        elif isinstance(quote_access, Source):
+            return quote_access.id
+
+    async def waitGroupMessage(
+        self,
+        special_group: Optional[Union[Group, int]] = None,
+        special_member: Optional[Union[Member, int]] = None,
+        quote_access: Optional[Union[BotMessage, Source]] = None,
+        custom_judgement: Optional[Callable[[GroupMessage], bool]] = None,
+        timeout: Optional[float] = None,
+        block_propagation: bool = False,
+    ) -> GroupMessage:
+        "等待一条群消息, 参数的含义与 `GroupMessageInterrupt` 相同."
+        return await self.wait(
+            GroupMessage,
+            special_group.id if isinstance(special_group, Group) else special_group,
+            (special_member.id if isinstance(special_member, Member) else special_member),
+            self.quote_id(quote_access),
+            custom_judgement,
+            timeout,
+            block_propagation,
+        )
+
+    async def waitFriendMessage(
+        self,
+        special_friend: Optional[Union[Friend, int]] = None,
+        quote_access: Optional[Union[BotMessage, Source]] = None,
+        custom_judgement: Optional[Callable[[FriendMessage], bool]] = None,
+        timeout: Optional[float] = None,
+        block_propagation: bool = False,
+    ) -> FriendMessage:
+        "等待一条好友消息, 参数的含义与 `FriendMessageInterrupt` 相同."
+        return await self.wait(
+            FriendMessage,
+            None,
+            (special_friend.id if isinstance(special_friend, Friend) else special_friend),
+            self.quote_id(quote_access),
+            custom_judgement,
+            timeout,
+            block_propagation,
+        )
+
+    async def waitTempMessage(
+        self,
+        special_group: Optional[Union[Group, int]] = None,
+        special_member: Optional[Union[Member, int]] = None,
+        quote_access: Optional[Union[BotMessage, Source]] = None,
+        custom_judgement: Optional[Callable[[TempMessage], bool]] = None,
+        timeout: Optional[float] = None,
+        block_propagation: bool = False,
+    ) -> TempMessage:
+        "等待一条临时会话消息, 参数的含义与 `TempMessageInterrupt` 相同."
+        return await self.wait(
+            TempMessage,
+            special_group.id if isinstance(special_group, Group) else special_group,
+            (special_member.id if isinstance(special_member, Member) else special_member),
+            self.quote_id(quote_access),
+            custom_judgement,
+            timeout,
+            block_propagation,
+        )
@@ -0,0 +1,95 @@
+"""用于下载媒体资源(例如消息中图片)的 HTTP 客户端.
+
+与用于和 `mirai-api-http` 通讯的 `session` 相互独立, 由应用实例持有,
+使得消息元素的下载可以复用连接池, 保持连接(keep-alive)与 DNS 缓存, 并受到并发数与超时的限制.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
+
+from .context import application
+
+
+class MediaClient:
+    """媒体资源的下载客户端; 其 `ClientSession` 在第一次使用时才会被创建.
+
+    Attributes:
+        limit (int): 连接池中连接的总数上限.
+        limit_per_host (int): 对同一主机的并发连接数上限.
+        ttl_dns_cache (Optional[int]): DNS 缓存的有效时间, 单位为秒, 为 None 时永久缓存.
+        keepalive_timeout (float): 空闲连接的保持时间, 单位为秒.
+        timeout (ClientTimeout): 请求的超时设置.
+        headers (Dict[str, str]): 每个请求都会附带的请求头.
+    """
+
+    limit: int
+    limit_per_host: int
+    ttl_dns_cache: Optional[int]
+    keepalive_timeout: float
+    timeout: ClientTimeout
+    headers: Dict[str, str]
+
+    _session: Optional[ClientSession]
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        ttl_dns_cache: Optional[int] = 300,
+        keepalive_timeout: float = 30.0,
+        timeout: Optional[ClientTimeout] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout or ClientTimeout(total=60, connect=10)
+        self.headers = headers or {}
+        self._session = None
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=self.ttl_dns_cache,
+                    keepalive_timeout=self.keepalive_timeout,
+                ),
+                timeout=self.timeout,
+                headers=self.headers,
+            )
+        return self._session
+
+    def get(self, url: str, **kwargs):
+        "以 GET 方法请求资源, 用法与 `ClientSession.get` 相同."
+        return self.session.get(url, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+@asynccontextmanager
+async def media_get(url: str, **kwargs) -> AsyncIterator[ClientResponse]:
+    """通过当前上下文中应用实例的 `media` 客户端请求资源;
+    在应用实例的上下文之外时, 退而使用一个临时的 `ClientSession`.
+
+    Args:
+        url (str): 资源的地址.
+
+    Yields:
+        ClientResponse: 响应.
+    """
+    app = application.get(None)
+    if app is not None and getattr(app, "media", None) is not None:
+        async with app.media.get(url, **kwargs) as response:
+            yield response
+    else:
+        async with ClientSession() as session:
+            async with session.get(url, **kwargs) as response:
+                yield response
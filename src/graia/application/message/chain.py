@@ -17,8 +17,7 @@ from graia.application.exceptions import EntangledSuperposition
 from graia.broadcast.utilles import run_always_await
 from pydantic import BaseModel
 
-from .elements import ExternalElement, InternalElement, Element
-import regex
+from .elements import ExternalElement, InternalElement, Element, element_types
 import copy
 
 MessageIndex = Tuple[int, Optional[int]]
@@ -43,6 +42,7 @@ class MessageChain(BaseModel):
             ```
 
         3. 你可以使用 `MessageChain.asMutable` 和 `MessageChain.asImmutable` 方法分别获得可变与不可变的消息链.
+           二者之间转换时元素会被复制; 需要原地修改消息元素时, 应在可变的消息链上进行.
 
         4. 你可以使用 `MessageChain.isSendable` 方法检查消息链是否可以被 **完整无误** 的发送.
 
@@ -85,7 +85,7 @@ class MessageChain(BaseModel):
 
         12. `MessageChain.asSerializationString` 方法可将消息链对象转为以 "Mirai 码" 表示特殊对象的字符串
 
-        13. `MessageChain.fromSerializationString` 方法可以从以 "Mirai 码" 表示特殊对象的字符串解析为消息链, 不过可能不完整.
+        13. `MessageChain.fromSerializationString` 方法可以从以 "Mirai 码" 表示特殊对象的字符串解析为消息链.
 
         14. `MessageChain.asMerged` 方法可以将消息链中相邻的 Plain 元素合并为一个 Plain 元素.
 
@@ -101,6 +101,47 @@ class MessageChain(BaseModel):
 
     __root__: Sequence[Element]
 
+    __slots__ = ("_memo",)
+
+    def _get_memo(self) -> Optional[Dict[str, Any]]:
+        """内部接口, 获取不可变消息链上用于缓存派生结果(例如 `asDisplay`, `asMerged` 的结果,
+        参数解析器的预处理结果)的字典.
+
+        缓存与当前的 `__root__` 绑定, `__root__` 被替换后缓存随之失效; 可变的消息链不进行缓存.
+        缓存假定不可变消息链中的元素不会被原地修改; 为此, 不可变的消息链不与可变的消息链共用元素实例,
+        二者之间转换(例如 `asMutable` 与 `asImmutable`)时元素均被复制, 需要修改元素时应先转为可变的消息链.
+
+        Returns:
+            Optional[Dict[str, Any]]: 缓存所使用的字典, 消息链可变时为 None.
+        """
+        if not isinstance(self.__root__, tuple):
+            return None
+        try:
+            root, memo = self._memo
+        except AttributeError:
+            root = None
+        if root is not self.__root__:
+            memo = {}
+            object.__setattr__(self, "_memo", (self.__root__, memo))
+        return memo
+
+    def _get_index(self) -> Optional[Dict[Type[Element], Tuple[Element, ...]]]:
+        """内部接口, 获取不可变消息链中以元素类型为键的元素索引, 供 `has` 与 `get` 使用.
+
+        Returns:
+            Optional[Dict[Type[Element], Tuple[Element, ...]]]: 元素索引, 消息链可变时为 None.
+        """
+        memo = self._get_memo()
+        if memo is None:
+            return None
+        index = memo.get("index")
+        if index is None:
+            grouped: Dict[Type[Element], List[Element]] = {}
+            for i in self.__root__:
+                grouped.setdefault(type(i), []).append(i)
+            index = memo["index"] = {k: tuple(v) for k, v in grouped.items()}
+        return index
+
     @classmethod
     def create(cls, elements: Sequence[Element]) -> "MessageChain":
         """从传入的序列(可以是元组 tuple, 也可以是列表 list) 创建消息链.
@@ -113,6 +154,24 @@ class MessageChain(BaseModel):
         """
         return cls(__root__=elements)
 
+    @classmethod
+    def unchecked(cls, elements: Sequence[Element]) -> "MessageChain":
+        """内部接口, 不经过 pydantic 的校验, 直接以传入的序列创建消息链.
+
+        经过校验的 `create` 会复制每个元素; 本方法则直接使用传入的序列与其中的元素,
+        仅适用于元素均已是合法的消息元素的场合, 例如由已有的消息链派生出新的, 可变性相同的消息链.
+
+        Args:
+            elements (Sequence[Element]): 包含且仅包含消息元素的序列, 其类型(tuple 或 list)决定消息链是否可变
+
+        Returns:
+            MessageChain: 以传入的序列作为所承载消息的消息链
+        """
+        chain = cls.__new__(cls)
+        object.__setattr__(chain, "__dict__", {"__root__": elements})
+        object.__setattr__(chain, "__fields_set__", {"__root__"})
+        return chain
+
     @classmethod
     def parse_obj(cls: Type["MessageChain"], obj: List[Element]) -> "MessageChain":
         """内部接口, 会自动将作为外部态的消息元素转为内部态.
@@ -128,17 +187,13 @@ class MessageChain(BaseModel):
             if isinstance(i, InternalElement):
                 handled_elements.append(i)
             elif isinstance(i, ExternalElement):
-                for ii in InternalElement.__subclasses__():
-                    if ii.__name__ == i.__class__.__name__:
-                        handled_elements.append(ii.fromExternal(i))
+                internal_type = element_types.get(i.__class__.__name__, (None, None))[1]
+                if internal_type is not None:
+                    handled_elements.append(internal_type.fromExternal(i))
             elif isinstance(i, dict) and "type" in i:
-                for ii in ExternalElement.__subclasses__():
-                    if ii.__name__ == i["type"]:
-                        for iii in InternalElement.__subclasses__():
-                            if iii.__name__ == i["type"]:
-                                handled_elements.append(
-                                    iii.fromExternal(ii.parse_obj(i))
-                                )
+                external_type, internal_type = element_types.get(i["type"], (None, None))
+                if external_type is not None and internal_type is not None:
+                    handled_elements.append(internal_type.fromExternal(external_type.parse_obj(i)))
         return cls(__root__=tuple(handled_elements))  # 默认是不可变型
 
     @property
@@ -151,20 +206,29 @@ class MessageChain(BaseModel):
         return isinstance(self.__root__, tuple)
 
     def asMutable(self) -> "MessageChain":
-        """将消息链转换为可变形态的消息链
+        """将消息链转换为可变形态的消息链, 其中的元素均为原有元素的副本, 可以被原地修改.
 
         Returns:
             MessageChain: 内部消息结构可变的消息链
         """
-        return MessageChain(__root__=list(self.__root__))
+        return MessageChain.unchecked([i.copy() for i in self.__root__])
 
     def asImmutable(self) -> "MessageChain":
-        """将消息链转换为不可变形态的消息链
+        """将消息链转换为不可变形态的消息链; 原有的消息链可变时, 其中的元素被复制.
 
         Returns:
             MessageChain: 内部消息结构不可变的消息链
         """
-        return MessageChain(__root__=tuple(self.__root__))
+        return MessageChain.unchecked(tuple(self._owned_elements(mutable=False)))
+
+    def _owned_elements(self, mutable: bool) -> Sequence[Element]:
+        """内部接口, 返回可以被另一可变性为 `mutable` 的消息链持有的元素.
+
+        可变性相同时直接返回本消息链的元素, 不同时则返回其副本, 使得不可变的消息链不与可变的消息链共用元素实例.
+        """
+        if self.isImmutable is not mutable:
+            return self.__root__
+        return [i.copy() for i in self.__root__]
 
     @property
     def isSendable(self) -> bool:
@@ -190,34 +254,29 @@ class MessageChain(BaseModel):
         Returns:
             MessageChain: 返回的可能可以正确发送的消息链.
         """
-        return MessageChain(
-            __root__=tuple(
+        return MessageChain.unchecked(
+            tuple(
                 [
                     i
-                    for i in self.__root__
+                    for i in self._owned_elements(mutable=False)
                     if all(
                         [
                             isinstance(i, InternalElement),
                             hasattr(i, "toExternal"),
-                            getattr(i.__class__, "toExternal")
-                            != InternalElement.toExternal,
+                            getattr(i.__class__, "toExternal") != InternalElement.toExternal,
                         ]
                     )
                 ]
             )
         )
 
-    async def build(
-        self, **extra: Dict[InternalElement, Tuple[list, dict]]
-    ) -> "MessageChain":
+    async def build(self, **extra: Dict[InternalElement, Tuple[list, dict]]) -> "MessageChain":
         result = []
         for i in self.__root__:
             if isinstance(i, InternalElement):
                 if getattr(i.__class__, "toExternal") == InternalElement.toExternal:
                     raise EntangledSuperposition(
-                        "You define an object that cannot be sent: {0}".format(
-                            i.__class__.__name__
-                        )
+                        "You define an object that cannot be sent: {0}".format(i.__class__.__name__)
                     )
                 result.append(
                     await run_always_await(
@@ -240,7 +299,10 @@ class MessageChain(BaseModel):
         Returns:
             bool: 判断结果
         """
-        return element_class in [type(i) for i in self.__root__]
+        index = self._get_index()
+        if index is not None:
+            return element_class in index
+        return any(type(i) is element_class for i in self.__root__)
 
     def get(self, element_class: Element) -> List[Element]:
         """获取消息链中所有特定类型的消息元素
@@ -251,6 +313,9 @@ class MessageChain(BaseModel):
         Returns:
             List[T]: 获取到的符合要求的所有消息元素; 另: 可能是空列表([]).
         """
+        index = self._get_index()
+        if index is not None:
+            return list(index.get(element_class, ()))
         return [i for i in self.__root__ if type(i) is element_class]
 
     def getOne(self, element_class: Element, index: int) -> Element:
@@ -282,7 +347,13 @@ class MessageChain(BaseModel):
         Returns:
             str: 以字符串形式表示的消息链
         """
-        return "".join(i.asDisplay() for i in self.__root__)
+        memo = self._get_memo()
+        if memo is not None and "display" in memo:
+            return memo["display"]
+        result = "".join(i.asDisplay() for i in self.__root__)
+        if memo is not None:
+            memo["display"] = result
+        return result
 
     @classmethod
     def join(cls, *chains: "MessageChain") -> "MessageChain":
@@ -291,7 +362,7 @@ class MessageChain(BaseModel):
         Returns:
             MessageChain: 拼接结果
         """
-        return cls.create(sum([list(i.__root__) for i in chains], []))
+        return cls.unchecked(sum([list(i._owned_elements(mutable=True)) for i in chains], []))
 
     def plusWith(self, *chains: "MessageChain") -> "MessageChain":
         """在现有的基础上将另一消息链拼接到原来实例的尾部, 并生成, 返回新的实例.
@@ -299,7 +370,10 @@ class MessageChain(BaseModel):
         Returns:
             MessageChain: 拼接结果
         """
-        return self.create(sum([list(i.__root__) for i in chains], self.__root__))
+        mutable = not self.isImmutable
+        return self.unchecked(
+            type(self.__root__)(sum([list(i._owned_elements(mutable)) for i in chains], list(self.__root__)))
+        )
 
     def plus(self, *chains: "MessageChain") -> NoReturn:
         """在现有的基础上将另一消息链拼接到原来实例的尾部
@@ -323,9 +397,7 @@ class MessageChain(BaseModel):
         elif issubclass(item, Element):
             return self.get(item)
         else:
-            raise NotImplementedError(
-                "{0} is not allowed for item getting".format(type(item))
-            )
+            raise NotImplementedError("{0} is not allowed for item getting".format(type(item)))
 
     def subchain(self, item: slice, ignore_text_index: bool = False) -> "MessageChain":
         """对消息链执行分片操作
@@ -347,17 +419,13 @@ class MessageChain(BaseModel):
             if item.start[1] is not None and first_slice:  # text slice
                 if not isinstance(first_slice[0], Plain):
                     if not ignore_text_index:
-                        raise TypeError(
-                            "the sliced chain does not starts with a Plain: {}".format(
-                                first_slice[0]
-                            )
-                        )
+                        raise TypeError("the sliced chain does not starts with a Plain: {}".format(first_slice[0]))
                     else:
                         result = first_slice
                 else:
                     final_text = first_slice[0].text[item.start[1] :]
                     result = [
-                        *([Plain(final_text)] if final_text else []),
+                        *([Plain.unchecked(text=final_text)] if final_text else []),
                         *first_slice[1:],
                     ]
             else:
@@ -366,88 +434,80 @@ class MessageChain(BaseModel):
             first_slice = result[: item.stop[0]]
             if item.stop[1] is not None and first_slice:  # text slice
                 if not isinstance(first_slice[-1], Plain):
-                    raise TypeError(
-                        "the sliced chain does not ends with a Plain: {}".format(
-                            first_slice[-1]
-                        )
-                    )
+                    raise TypeError("the sliced chain does not ends with a Plain: {}".format(first_slice[-1]))
                 final_text = first_slice[-1].text[: item.stop[1]]
                 result = [
                     *first_slice[:-1],
-                    *([Plain(final_text)] if final_text else []),
+                    *([Plain.unchecked(text=final_text)] if final_text else []),
                 ]
             else:
                 result = first_slice
-        return MessageChain.create(result)
+        return MessageChain.unchecked(type(self.__root__)(result))  # 维持 Mutable
 
     def asSerializationString(self) -> str:
         """将消息链对象转为以 "Mirai 码" 表示特殊对象的字符串. 为了保证可逆，纯文本中的'['用'[_'替代
 
+        编码方式见 `graia.application.message.mirai_code`.
+
         Returns:
             str: 以 "Mirai 码" 表示特殊对象的字符串
         """
-        from .elements.internal import Plain
-
-        result = []
-        for e in self.__root__:
-            if isinstance(e, Plain):
-                result.append(e.asSerializationString().replace("[", "[_"))
-            else:
-                result.append(e.asSerializationString())
-        return "".join(result)
+        from .mirai_code import dumps
+
+        memo = self._get_memo()
+        if memo is not None and "serialization" in memo:
+            return memo["serialization"]
+        result = dumps(self.__root__)
+        if memo is not None:
+            memo["serialization"] = result
+        return result
 
     @classmethod
     def fromSerializationString(cls, string: str) -> "MessageChain":
         """将以 "Mirai 码" 表示特殊对象的字符串转为消息链对象
 
+        Raises:
+            ValueError: 存在未知类型的 Mirai 码, 或其参数无法转换为对应的元素.
+
         Returns:
-            MessageChain: 转换后得到的消息链, 所包含的信息可能不完整.
+            MessageChain: 转换后得到的(可变的)消息链, 其中相邻的文本被合并为一个 Plain;
+                不需要修改消息链时, `graia.application.message.mirai_code.loads` 返回不可变的消息链.
         """
-        from .elements.internal import Plain, At, AtAll, Source, FlashImage, Image, Face
-
-        PARSE_FUNCTIONS = {
-            "atall": lambda args: AtAll(),
-            "source": lambda args: Source(id=args[0], time=args[1]),
-            "at": lambda args: At(target=args[0], display=args[1]),
-            "face": lambda args: Face(faceId=args[0]),
-            "image": lambda args: Image(imageId=args[0]),
-            "flash": lambda args: FlashImage(imageId=args[0]),
-        }
-        result = []
-        for match in regex.split(r"(\[mirai:.+?\])", string):
-            mirai = regex.fullmatch(r"\[mirai:(.+?)(:(.+?))\]", match)
-            if mirai:
-                # 容错：参数数量太少不行，太多可以
-                args = mirai.group(3).split(",")
-                result.append(PARSE_FUNCTIONS[mirai.group(1)](args))
-            elif match:
-                result.append(Plain(match.replace("[_", "[")))
-        return MessageChain.create(result)
+        from .mirai_code import decode
+
+        return cls.unchecked(list(decode(string)))
 
     def asMerged(self) -> "MessageChain":
         """合并相邻的 Plain 项, 并返回一个新的消息链实例
 
         Returns:
             MessageChain: 得到的新的消息链实例, 里面不应存在有任何的相邻的 Plain 元素.
+                对于不可变的消息链, 多次调用将返回同一个实例.
         """
         from .elements.internal import Plain
 
+        memo = self._get_memo()
+        if memo is not None and "merged" in memo:
+            return memo["merged"]
         result = []
 
         plain = []
         for i in self.__root__:
             if not isinstance(i, Plain):
                 if plain:
-                    result.append(Plain("".join(plain)))
+                    result.append(Plain.unchecked(text="".join(plain)))
                     plain.clear()  # 清空缓存
                 result.append(i)
             else:
                 plain.append(i.text)
         else:
             if plain:
-                result.append(Plain("".join(plain)))
+                result.append(Plain.unchecked(text="".join(plain)))
                 plain.clear()  # 清空缓存
-        return MessageChain.create(type(self.__root__)(result))  # 维持 Mutable
+        merged = MessageChain.unchecked(type(self.__root__)(result))  # 维持 Mutable
+        if memo is not None:
+            memo["merged"] = merged
+        return merged
 
     def exclude(self, *types: Type[Element]) -> MessageChain:
         """将除了在给出的消息元素类型中符合的消息元素重新包装为一个新的消息链
@@ -458,9 +518,7 @@ class MessageChain(BaseModel):
         Returns:
             MessageChain: 返回的消息链中不包含参数中给出的消息元素类型
         """
-        return self.create(
-            type(self.__root__)([i for i in self.__root__ if type(i) not in types])
-        )
+        return self.unchecked(type(self.__root__)([i for i in self.__root__ if type(i) not in types]))
 
     def include(self, *types: Type[Element]) -> MessageChain:
         """将只在给出的消息元素类型中符合的消息元素重新包装为一个新的消息链
@@ -471,9 +529,7 @@ class MessageChain(BaseModel):
         Returns:
             MessageChain: 返回的消息链中只包含参数中给出的消息元素类型
         """
-        return self.create(
-            type(self.__root__)([i for i in self.__root__ if type(i) in types])
-        )
+        return self.unchecked(type(self.__root__)([i for i in self.__root__ if type(i) in types]))
 
     def split(self, pattern: str, raw_string: bool = False) -> List["MessageChain"]:
         """和 `str.split` 差不多, 提供一个字符串, 然后返回分割结果.
@@ -485,20 +541,21 @@ class MessageChain(BaseModel):
 
         result: List["MessageChain"] = []
         tmp = []
+        immutable = self.isImmutable
         for element in self.__root__:
             if isinstance(element, Plain):
                 split_result = element.text.split(pattern)
                 for index, split_str in enumerate(split_result):
                     if tmp and index > 0:
-                        result.append(MessageChain.create(tmp))
+                        result.append(MessageChain.unchecked(tmp))
                         tmp = []
                     if split_str or raw_string:
-                        tmp.append(Plain(split_str))
+                        tmp.append(Plain.unchecked(text=split_str))
             else:
-                tmp.append(element)
+                tmp.append(element.copy() if immutable else element)  # 得到的消息链是可变的
         else:
             if tmp:
-                result.append(MessageChain.create(tmp))
+                result.append(MessageChain.unchecked(tmp))
                 tmp = []
         return result
 
@@ -558,7 +615,11 @@ class MessageChain(BaseModel):
 
         from .elements.internal import Plain
 
-        for i in self.get(Plain):
-            if string in i.text:
-                return True
-        return False
+        memo = self._get_memo()
+        if memo is None:
+            return any(string in i.text for i in self.get(Plain))
+        cache = memo.setdefault("text", {})
+        result = cache.get(string)
+        if result is None:
+            result = cache[string] = any(string in i.text for i in self.get(Plain))
+        return result
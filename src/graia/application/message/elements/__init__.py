@@ -1,14 +1,76 @@
 import abc
-from typing import Any
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
 from pydantic import BaseModel
+from pydantic.fields import ModelField
+
+T_Element = TypeVar("T_Element", bound="Element")
+
+unchecked_fields: Dict[Type["Element"], Tuple[Tuple[str, bool, ModelField], ...]] = {}
+"`Element.unchecked` 所使用的, 以元素类为键的字段表, 每项为 (字段名, 是否必需, 字段)."
 
 
 class Element(BaseModel):
     def __hash__(self):
         return hash((type(self),) + tuple(self.__dict__.values()))
 
+    @classmethod
+    def unchecked(cls: Type[T_Element], **values: Any) -> T_Element:
+        """内部接口, 不经过 pydantic 的校验与类型转换, 直接以给出的字段值创建实例.
+
+        仅适用于字段值已知合法的场合, 例如由已有的消息元素派生出新的元素; 未给出的字段与校验时一样使用默认值的副本.
+        所得到的实例与经过校验创建的实例相等, 且哈希值相同. 本方法只省去了校验的开销,
+        实例的存储方式(`__dict__` 与 `__fields_set__`)与经过校验创建的实例相同, 占用的内存也相同.
+
+        Raises:
+            TypeError: 缺少必需的字段, 或给出了未知的字段.
+        """
+        fields = unchecked_fields.get(cls)
+        if fields is None:
+            fields = unchecked_fields[cls] = tuple(
+                (name, field.required, field) for name, field in cls.__fields__.items()
+            )
+        data = {}
+        given = 0
+        for name, required, field in fields:
+            if name in values:
+                data[name] = values[name]
+                given += 1
+            elif required:
+                raise TypeError("missing field: {0}".format(name))
+            else:
+                data[name] = field.get_default()
+        if given != len(values):
+            raise TypeError("unknown field: {0}".format(", ".join(sorted(values.keys() - data.keys()))))
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "__dict__", data)
+        object.__setattr__(instance, "__fields_set__", set(values))
+        return instance
+
+
+ElementTypePair = Tuple[Optional[Type["ExternalElement"]], Optional[Type["InternalElement"]]]
+
+element_types: Dict[str, ElementTypePair] = {}
+"""消息元素的类型表, 以消息元素的类型名(即序列化态中的 `type` 字段)为键, 值为对应的外部态与内部态的类.
+
+只有直接继承了 `ExternalElement` 或 `InternalElement` 的类会被登记; 在类被定义时自动更新, 同名的类以后定义者为准.
+"""
+
+
+def register_element_type(element_class: Type[Element], internal: bool) -> None:
+    external_type, internal_type = element_types.get(element_class.__name__, (None, None))
+    if internal:
+        internal_type = element_class
+    else:
+        external_type = element_class
+    element_types[element_class.__name__] = (external_type, internal_type)
+
 
 class InternalElement(Element, abc.ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if InternalElement in cls.__bases__:
+            register_element_type(cls, internal=True)
+
     def toExternal(self) -> "ExternalElement":
         """可以为异步方法"""
         pass
@@ -22,11 +84,19 @@ class InternalElement(Element, abc.ABC):
         return ""
 
     def asSerializationString(self) -> str:
-        return ""
+        """获取以 "Mirai 码" 表示的消息元素, 编码方式见 `graia.application.message.mirai_code`;
+        无法以 Mirai 码表示的元素为空字符串.
+        """
+        from ..mirai_code import dumps
+
+        return dumps((self,))
 
 
 class ExternalElement(Element):
-    pass
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if ExternalElement in cls.__bases__:
+            register_element_type(cls, internal=False)
 
 
 class ShadowElement(Element):
@@ -1,9 +1,9 @@
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import NoReturn, Optional, Union
-import aiohttp
+from typing import AsyncIterable, AsyncIterator, NoReturn, Optional, Union
 
 from pydantic.fields import Field
 from graia.application.entities import UploadMethods
@@ -14,7 +14,6 @@ from pydantic import validator
 from ...context import application, image_method
 from . import ExternalElement, InternalElement, ShadowElement
 from graia.application.message.elements import external as External
-from aiohttp import ClientSession
 import json as MJson
 
 
@@ -53,9 +52,6 @@ class Source(InternalElement, ExternalElement):
     def fromExternal(_, external_element) -> "Source":
         return external_element
 
-    def asSerializationString(self) -> str:
-        return f"[mirai:source:{self.id},{int(self.time.timestamp())}]"
-
     class Config:
         json_encoders = {
             datetime: lambda v: int(v.timestamp()),
@@ -73,16 +69,16 @@ class Quote(InternalElement, ExternalElement):
     @validator("origin", pre=True, allow_reuse=True)
     def _(cls, v):
         from ..chain import MessageChain
+        from ..lazy import LazyMessageChain
 
+        if isinstance(v, LazyMessageChain):
+            return v
         return MessageChain.parse_obj(v)
 
     @classmethod
     def fromExternal(_, external_element) -> "Quote":
         return external_element
 
-    def asSerializationString(self) -> str:
-        return f" [mirai:quote:{self.id}]"
-
 
 class At(InternalElement, ExternalElement):
     """该消息元素用于承载消息中用于提醒/呼唤特定用户的部分."""
@@ -106,17 +102,12 @@ class At(InternalElement, ExternalElement):
         try:
             if image_method.get() != UploadMethods.Group:
                 raise InvaildArgument(
-                    "you cannot use this element in this method: {0}".format(
-                        image_method.get().value
-                    )
+                    "you cannot use this element in this method: {0}".format(image_method.get().value)
                 )
         except LookupError:
             pass
         return self
 
-    def asSerializationString(self) -> str:
-        return f"[mirai:at:{self.target},{self.display}]"
-
     @classmethod
     def fromExternal(cls, external_element) -> "At":
         return external_element
@@ -133,9 +124,7 @@ class AtAll(InternalElement, ExternalElement):
         try:
             if image_method.get() != UploadMethods.Group:
                 raise InvaildArgument(
-                    "you cannot use this element in this method: {0}".format(
-                        image_method.get().value
-                    )
+                    "you cannot use this element in this method: {0}".format(image_method.get().value)
                 )
         except LookupError:
             pass
@@ -145,9 +134,6 @@ class AtAll(InternalElement, ExternalElement):
     def fromExternal(cls, external_element) -> "AtAll":
         return external_element
 
-    def asSerializationString(self) -> str:
-        return "[mirai:atall]"
-
 
 class Face(InternalElement, ExternalElement):
     "表示消息中所附带的表情, 这些表情大多都是聊天工具内置的."
@@ -165,9 +151,6 @@ class Face(InternalElement, ExternalElement):
     def asDisplay(self) -> str:
         return "[表情]"
 
-    def asSerializationString(self) -> str:
-        return f"[mirai:face:{self.faceId}]"
-
 
 class ImageType(Enum):
     Friend = "Friend"
@@ -209,18 +192,12 @@ class Image_LocalFile(ShadowImage):
         try:
             methodd = self.method or image_method.get()
         except LookupError:
-            raise ValueError(
-                "you should give the 'method' for upload when you are out of the event receiver."
-            )
+            raise ValueError("you should give the 'method' for upload when you are out of the event receiver.")
         if not self.is_flash:
-            return await app.uploadImage(
-                self.filepath.read_bytes(), methodd, return_external=True
-            )
+            return await app.uploadImage(self.filepath, methodd, return_external=True)
         else:
             return FlashImage.fromExternal(
-                await app.uploadImage(
-                    self.filepath.read_bytes(), methodd, return_external=True
-                )
+                await app.uploadImage(self.filepath, methodd, return_external=True)
             ).toExternal()
 
     async def getReal(self, method: UploadMethods) -> "Image":
@@ -233,17 +210,13 @@ class Image_LocalFile(ShadowImage):
             Image: 所生成的, 真正的 Image 对象.
         """
         app = application.get()
-        return await app.uploadImage(
-            self.filepath.read_bytes(), method, return_external=True
-        )
+        return await app.uploadImage(self.filepath, method, return_external=True)
 
 
 class Image_UnsafeBytes(ShadowImage):
     image_bytes: bytes
 
-    def __init__(
-        self, image_bytes: bytes, method: Optional[UploadMethods] = None
-    ) -> None:
+    def __init__(self, image_bytes: bytes, method: Optional[UploadMethods] = None) -> None:
         super().__init__(image_bytes=image_bytes, method=method)
 
     async def toExternal(self):
@@ -251,13 +224,9 @@ class Image_UnsafeBytes(ShadowImage):
         try:
             methodd = self.method or image_method.get()
         except LookupError:
-            raise ValueError(
-                "you should give the 'method' for upload when you are out of the event receiver."
-            )
+            raise ValueError("you should give the 'method' for upload when you are out of the event receiver.")
         if not self.is_flash:
-            return await app.uploadImage(
-                self.image_bytes, methodd, return_external=True
-            )
+            return await app.uploadImage(self.image_bytes, methodd, return_external=True)
         else:
             return FlashImage.fromExternal(
                 await app.uploadImage(self.image_bytes, methodd, return_external=True)
@@ -287,22 +256,12 @@ class Image_NetworkAddress(ShadowImage):
         try:
             methodd = self.method or image_method.get()
         except LookupError:
-            raise ValueError(
-                "you should give the 'method' for upload when you are out of the event receiver."
-            )
+            raise ValueError("you should give the 'method' for upload when you are out of the event receiver.")
 
-        async with app.session.get(self.url) as response:
-            response.raise_for_status()
-            if not self.is_flash:
-                return await app.uploadImage(
-                    await response.read(), methodd, return_external=True
-                )
-            else:
-                return FlashImage.fromExternal(
-                    await app.uploadImage(
-                        await response.read(), methodd, return_external=True
-                    )
-                ).toExternal()
+        if not self.is_flash:
+            return await app.uploadImage(self.open, methodd, return_external=True)
+        else:
+            return FlashImage.fromExternal(await app.uploadImage(self.open, methodd, return_external=True)).toExternal()
 
     async def getReal(self, method: UploadMethods) -> "Image":
         """从本 Shadow Element 中生成一真正的 Image 对象.
@@ -313,11 +272,22 @@ class Image_NetworkAddress(ShadowImage):
         Returns:
             Image: 所生成的, 真正的 Image 对象.
         """
-        app = application.get()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.url) as response:
-                response.raise_for_status()
-                return await app.uploadImage(await response.read(), method)
+        return await application.get().uploadImage(self.open, method)
+
+    @asynccontextmanager
+    async def open(self) -> AsyncIterator[AsyncIterable[bytes]]:
+        """下载图片, 并产出其内容的数据流; 作为上传的数据源, 使下载的数据直接以流的方式上传, 不在内存中缓冲整张图片.
+        每次尝试上传时都会重新下载, 因此失败的上传可以被重试.
+        Raises:
+            ClientResponseError: HTTP 网络请求错误
+            UploadTooLarge: 图片的大小超过了 `max_upload_size`.
+        """
+        from ...media import media_get  # 按需导入 aiohttp
+
+        async with media_get(self.url) as response:
+            response.raise_for_status()
+            application.get().check_upload_size(response.content_length)
+            yield response.content.iter_chunked(65536)
 
 
 class Image(InternalElement):
@@ -339,9 +309,7 @@ class Image(InternalElement):
                 return ImageType.Friend
             else:
                 return ImageType.Temp
-        elif values["imageId"].startswith("{") and values["imageId"].endswith(
-            "}.mirai"
-        ):
+        elif values["imageId"].startswith("{") and values["imageId"].endswith("}.mirai"):
             return ImageType.Group
         else:
             return ImageType.Unknown
@@ -352,9 +320,7 @@ class Image(InternalElement):
             if self.type != want_type and self.url:
                 app = application.get()
                 image_byte = await self.http_to_bytes()
-                return await app.uploadImage(
-                    image_byte, image_method.get(), return_external=True
-                )
+                return await app.uploadImage(image_byte, image_method.get(), return_external=True)
         except LookupError:
             pass
         return External.Image(imageId=self.imageId, url=self.url)
@@ -367,9 +333,7 @@ class Image(InternalElement):
         )
 
     @classmethod
-    def fromLocalFile(
-        cls, filepath: Union[Path, str], method: Optional[UploadMethods] = None
-    ) -> "Image":
+    def fromLocalFile(cls, filepath: Union[Path, str], method: Optional[UploadMethods] = None) -> "Image":
         """从本地文件中创建一个 Shadow Element, 以此在发送时自动上传图片至服务器, 并借此使包含的图片成功发送.
 
         Args:
@@ -399,9 +363,7 @@ class Image(InternalElement):
         return Image_LocalFile(filepath, method)
 
     @classmethod
-    def fromUnsafeBytes(
-        cls, image_bytes: bytes, method: Optional[UploadMethods] = None
-    ) -> "Image":
+    def fromUnsafeBytes(cls, image_bytes: bytes, method: Optional[UploadMethods] = None) -> "Image":
         """从不保证有效性的 bytes 中创建一个 Shadow Element, 以此在发送时自动作为图片上传至服务器, 并借此使其可能包含的图片成功发送.
 
         Args:
@@ -415,9 +377,7 @@ class Image(InternalElement):
         return Image_UnsafeBytes(image_bytes, method)
 
     @classmethod
-    def fromNetworkAddress(
-        cls, url: str, method: Optional[UploadMethods] = None
-    ) -> "Image":
+    def fromNetworkAddress(cls, url: str, method: Optional[UploadMethods] = None) -> "Image":
         """从不保证有效性的网络位置中创建一个 Shadow Element, 以此在发送时自动从该指定位置获取并作为图片上传至服务器,
         并借此使其可能包含的图片成功发送.
 
@@ -455,17 +415,15 @@ class Image(InternalElement):
         """
         if not (self.url or url):
             raise ValueError("you should offer a url.")
-        async with ClientSession() as session:
-            async with session.get(self.url or url) as response:
-                response.raise_for_status()
-                return await response.read()
+        from ...media import media_get  # 按需导入 aiohttp
+
+        async with media_get(self.url or url) as response:
+            response.raise_for_status()
+            return await response.read()
 
     def asFlash(self) -> "FlashImage":
         return FlashImage.fromOriginalImage(self)
 
-    def asSerializationString(self) -> str:
-        return f"[mirai:image:{self.imageId}]"
-
 
 class FlashImage(Image, InternalElement):
     """用于承载 QQ 中的特殊消息: 闪照的消息组件.
@@ -496,9 +454,6 @@ class FlashImage(Image, InternalElement):
     def asNormal(self) -> "Image":
         return Image.fromExternal(self)
 
-    def asSerializationString(self) -> str:
-        return f"[mirai:flash:{self.imageId}]"
-
 
 class VoiceUploadType(Enum):
     Group = "group"
@@ -520,13 +475,9 @@ class Voice_LocalFile(ShadowElement, InternalElement, ExternalElement):
         try:
             methodd = self.method or image_method.get()
         except LookupError:
-            raise ValueError(
-                "you should give the 'method' for upload when you are out of the event receiver."
-            )
+            raise ValueError("you should give the 'method' for upload when you are out of the event receiver.")
 
-        return await app.uploadVoice(
-            self.filepath.read_bytes(), methodd, return_external=True
-        )
+        return await app.uploadVoice(self.filepath, methodd, return_external=True)
 
     async def getReal(self, method: UploadMethods) -> "Image":
         """从本 Shadow Element 中生成一真正的 Voice 对象.
@@ -538,9 +489,7 @@ class Voice_LocalFile(ShadowElement, InternalElement, ExternalElement):
             Voice: 所生成的, 真正的 Voice 对象.
         """
         app = application.get()
-        return await app.uploadVoice(
-            self.filepath.read_bytes(), method, return_external=True
-        )
+        return await app.uploadVoice(self.filepath, method, return_external=True)
 
 
 class Voice(InternalElement):
@@ -558,9 +507,6 @@ class Voice(InternalElement):
             url=external_element.url,
         )
 
-    def asSerializationString(self) -> str:
-        return f"[mirai:voice:{self.voiceId}]"
-
     def asDisplay(self) -> str:
         return "[语音]"
 
@@ -575,9 +521,7 @@ class Voice(InternalElement):
         if values["voiceId"]:
             return VoiceUploadType.Group  # mirai 当前版本只支持群语音.
 
-    def fromLocalFile(
-        self, filepath: Union[str, Path], method: Optional[UploadMethods] = None
-    ) -> "Voice":
+    def fromLocalFile(self, filepath: Union[str, Path], method: Optional[UploadMethods] = None) -> "Voice":
         """从本地文件中创建一个 Shadow Element, 以此在发送时自动上传语音至服务器, 并借此使包含的语音成功发送.
 
         Args:
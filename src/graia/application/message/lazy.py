@@ -0,0 +1,129 @@
+"""延迟解码的消息链.
+
+在懒解码模式下, 接收到的消息事件只保留消息链的原始数据, 直到第一次访问其内容(`__root__`)时才进行解码;
+被回复的消息(`Quote.origin`)与转发消息中每个节点的消息链同样是延迟解码的.
+`has` 与 `get` 在消息链尚未被完整解码时直接作用于原始数据: 前者只检查元素的类型名,
+后者只解码符合类型的元素, 例如获取 `Source` 时不需要解码整条消息链.
+"""
+from typing import Any, Dict, FrozenSet, List, Optional, Type
+
+from .chain import MessageChain
+from .elements import Element, ExternalElement, InternalElement, element_types
+from .elements.internal import Quote
+
+
+class LazyMessageChain(MessageChain):
+    """在第一次访问 `__root__` 时才从原始数据解码的消息链, 解码后与 `MessageChain.parse_obj` 的结果相同.
+
+    使用 `LazyMessageChain.from_raw` 创建.
+    """
+
+    __slots__ = ("_raw", "_decoded", "_types")
+
+    @classmethod
+    def from_raw(cls, raw: List[Any]) -> "LazyMessageChain":
+        """以 `mirai-api-http` 推送的原始数据创建消息链, 此时不进行任何解码.
+
+        Args:
+            raw (List[Any]): 序列化态的消息链, 即元素的列表.
+
+        Returns:
+            LazyMessageChain: 延迟解码的消息链.
+        """
+        if not isinstance(raw, (list, tuple)):
+            raise TypeError("a message chain must be a list, not {0}".format(type(raw)))
+        chain = cls.__new__(cls)
+        object.__setattr__(chain, "__dict__", {})
+        object.__setattr__(chain, "__fields_set__", {"__root__"})
+        object.__setattr__(chain, "_raw", raw)
+        object.__setattr__(chain, "_decoded", {})
+        object.__setattr__(chain, "_types", None)
+        return chain
+
+    @property
+    def materialized(self) -> bool:
+        "消息链是否已被完整解码."
+        return "__root__" in self.__dict__
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "__root__":
+            return self.materialize()
+        raise AttributeError("'{0}' object has no attribute '{1}'".format(self.__class__.__name__, name))
+
+    def element_at(self, index: int) -> Optional[Element]:
+        "解码原始数据中的第 index 个元素; 结果会被缓存, 无法识别的元素为 None."
+        if index in self._decoded:
+            return self._decoded[index]
+        item = self._raw[index]
+        element = None
+        if isinstance(item, InternalElement):
+            element = item
+        elif isinstance(item, ExternalElement):
+            internal_type = element_types.get(item.__class__.__name__, (None, None))[1]
+            if internal_type is not None:
+                element = internal_type.fromExternal(item)
+        elif isinstance(item, dict) and "type" in item:
+            external_type, internal_type = element_types.get(item["type"], (None, None))
+            if external_type is not None and internal_type is not None:
+                if external_type is Quote and isinstance(item.get("origin"), list):
+                    item = {**item, "origin": LazyMessageChain.from_raw(item["origin"])}
+                element = internal_type.fromExternal(external_type.parse_obj(item))
+        self._decoded[index] = element
+        return element
+
+    def materialize(self) -> tuple:
+        "完整地解码消息链, 并返回其内容."
+        root = self.__dict__.get("__root__")
+        if root is None:
+            root = self.__dict__["__root__"] = tuple(
+                element for element in map(self.element_at, range(len(self._raw))) if element is not None
+            )
+        return root
+
+    @property
+    def element_types(self) -> FrozenSet[Type[Element]]:
+        "消息链中出现的元素类型, 由原始数据中的类型名得到."
+        if self._types is None:
+            types = set()
+            for item in self._raw:
+                if isinstance(item, Element):
+                    types.add(item.__class__)
+                elif isinstance(item, dict):
+                    external_type, internal_type = element_types.get(item.get("type"), (None, None))
+                    if external_type is not None and internal_type is not None:
+                        types.add(internal_type)
+            object.__setattr__(self, "_types", frozenset(types))
+        return self._types
+
+    def has(self, element_class: Type[Element]) -> bool:
+        if self.materialized:
+            return super().has(element_class)
+        return element_class in self.element_types
+
+    __contains__ = has
+
+    def get(self, element_class: Type[Element]) -> List[Element]:
+        if self.materialized:
+            return super().get(element_class)
+        if element_class not in self.element_types:
+            return []
+        result = []
+        for index in range(len(self._raw)):
+            element = self.element_at(index)
+            if type(element) is element_class:
+                result.append(element)
+        return result
+
+    def copy(self, **kwargs) -> MessageChain:
+        if not kwargs and not self.materialized:
+            return self.from_raw(self._raw)  # pydantic 在校验字段时会复制实例
+        self.materialize()
+        return super().copy(**kwargs)
+
+    def _iter(self, *args, **kwargs):
+        self.materialize()
+        return super()._iter(*args, **kwargs)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        self.materialize()
+        return super().__getstate__()
@@ -0,0 +1,224 @@
+"""消息链与 "Mirai 码" 字符串之间的编解码.
+
+编码的格式为:
+
+ - Plain 中的文本原样写出, 其中的 `[` 被写为 `[_`;
+ - 其他元素写为 `[mirai:类型名:参数1,参数2,...]`, 无参数时为 `[mirai:类型名]`;
+   参数中的 `\\`, `,`, `[`, `]` 以反斜杠转义, 值为 None 的可选参数被写为空字符串, 位于末尾时省略.
+
+| 元素         | Mirai 码                                                 |
+| ------------ | -------------------------------------------------------- |
+| `Source`     | `[mirai:source:id,时间戳]`                               |
+| `Quote`      | `[mirai:quote:id,groupId,senderId,targetId,origin]`      |
+| `At`         | `[mirai:at:target,display]`                              |
+| `AtAll`      | `[mirai:atall]`                                          |
+| `Face`       | `[mirai:face:faceId,name]`                               |
+| `Image`      | `[mirai:image:imageId,url]`                              |
+| `FlashImage` | `[mirai:flash:imageId,url]`                              |
+| `Voice`      | `[mirai:voice:voiceId,url]`                              |
+| `Xml`        | `[mirai:xml:xml]`                                        |
+| `Json`       | `[mirai:json:json]`                                      |
+| `App`        | `[mirai:app:content]`                                    |
+| `Poke`       | `[mirai:poke:name]`                                      |
+
+`Quote` 的 `origin` 为被回复的消息链的 Mirai 码. 除相邻的 Plain 会被合并, 空的 Plain 会被略去外,
+解码的结果与编码前的消息链相同; 尚未上传的图片与语音(Shadow Element)无法以 Mirai 码表示, 编码时被略去.
+解码时, 未经转义的, 不构成 Mirai 码的 `[` 被视为普通的文本.
+"""
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Type
+
+from .chain import MessageChain
+from .elements import Element
+from .elements.internal import (
+    App,
+    At,
+    AtAll,
+    Face,
+    FlashImage,
+    Image,
+    Json,
+    Plain,
+    Poke,
+    Quote,
+    Source,
+    Voice,
+    Xml,
+)
+
+Writer = Callable[[str], object]
+
+CODE = re.compile(r"\[mirai:([a-z]+)(?::((?:[^\\\]]|\\.)*))?\]", re.S)
+ARGUMENT = re.compile(r"((?:[^\\,]|\\.)*)(,|\Z)", re.S)
+UNESCAPE = re.compile(r"\\(.)", re.S)
+ESCAPE_TABLE = str.maketrans({"\\": "\\\\", ",": "\\,", "[": "\\[", "]": "\\]"})
+
+
+def escape(argument: Optional[object]) -> str:
+    return "" if argument is None else str(argument).translate(ESCAPE_TABLE)
+
+
+def write_code(write: Writer, kind: str, *arguments: Optional[object]) -> None:
+    while arguments and arguments[-1] is None:
+        arguments = arguments[:-1]
+    if arguments:
+        write("[mirai:{0}:{1}]".format(kind, ",".join(map(escape, arguments))))
+    else:
+        write("[mirai:{0}]".format(kind))
+
+
+ENCODERS: Dict[Type[Element], Callable[[Element, Writer], None]] = {
+    Plain: lambda e, write: write(e.text.replace("[", "[_")),
+    Source: lambda e, write: write_code(write, "source", e.id, int(e.time.timestamp())),
+    Quote: lambda e, write: write_code(write, "quote", e.id, e.groupId, e.senderId, e.targetId, dumps(e.origin)),
+    At: lambda e, write: write_code(write, "at", e.target, e.display),
+    AtAll: lambda e, write: write("[mirai:atall]"),
+    Face: lambda e, write: write_code(write, "face", e.faceId, e.name),
+    Image: lambda e, write: write_code(write, "image", e.imageId, e.url),
+    FlashImage: lambda e, write: write_code(write, "flash", e.imageId, e.url),
+    Voice: lambda e, write: write_code(write, "voice", e.voiceId, e.url),
+    Xml: lambda e, write: write_code(write, "xml", e.xml),
+    Json: lambda e, write: write_code(write, "json", e.Json),
+    App: lambda e, write: write_code(write, "app", e.content),
+    Poke: lambda e, write: write_code(write, "poke", e.name.value),
+}
+"以元素类为键的编码函数; 不在其中的元素(例如 Shadow Element)不会被写出."
+
+
+def optional(argument: str) -> Optional[str]:
+    return argument or None
+
+
+DECODERS: Dict[str, Callable[[List[str]], Element]] = {
+    "source": lambda args: Source(id=args[0], time=args[1]),
+    "quote": lambda args: Quote(
+        id=args[0],
+        groupId=args[1],
+        senderId=args[2],
+        targetId=args[3],
+        origin=loads(args[4]),
+    ),
+    "at": lambda args: At(target=args[0], display=optional(args[1])),
+    "atall": lambda args: AtAll(),
+    "face": lambda args: Face(faceId=args[0], name=optional(args[1])),
+    "image": lambda args: Image(imageId=optional(args[0]), url=optional(args[1])),
+    "flash": lambda args: FlashImage(imageId=optional(args[0]), url=optional(args[1])),
+    "voice": lambda args: Voice(voiceId=optional(args[0]), url=optional(args[1])),
+    "xml": lambda args: Xml(args[0]),
+    "json": lambda args: Json(args[0]),
+    "app": lambda args: App(content=args[0]),
+    "poke": lambda args: Poke(name=args[0]),
+}
+"以 Mirai 码中的类型名为键的解码函数."
+
+ARITY: Dict[str, int] = {
+    "source": 2,
+    "quote": 5,
+    "at": 2,
+    "atall": 0,
+    "face": 2,
+    "image": 2,
+    "flash": 2,
+    "voice": 2,
+    "xml": 1,
+    "json": 1,
+    "app": 1,
+    "poke": 1,
+}
+"各类型的参数数量; 省略的参数以空字符串补足, 多余的参数被忽略."
+
+
+def encode(elements: Sequence[Element], write: Writer) -> None:
+    """将消息元素逐个编码, 并依次写入输出.
+
+    Args:
+        elements (Sequence[Element]): 需要编码的消息元素, 也可以是消息链.
+        write (Callable[[str], object]): 用于写出编码结果的函数, 例如 `list.append` 或 `io.StringIO.write`.
+    """
+    encoders = ENCODERS
+    for element in elements:
+        encoder = encoders.get(element.__class__)
+        if encoder is not None:
+            encoder(element, write)
+
+
+def dumps(elements: Sequence[Element]) -> str:
+    "将消息元素编码为 Mirai 码字符串."
+    result: List[str] = []
+    encode(elements, result.append)
+    return "".join(result)
+
+
+def dump(elements: Sequence[Element], fp: TextIO) -> None:
+    "将消息元素编码为 Mirai 码, 并写入文本文件."
+    encode(elements, fp.write)
+
+
+def split_arguments(arguments: str) -> List[str]:
+    if "\\" not in arguments:
+        return arguments.split(",")
+    result = []
+    position = 0
+    while True:
+        match = ARGUMENT.match(arguments, position)
+        result.append(UNESCAPE.sub(r"\1", match.group(1)))
+        if not match.group(2):
+            return result
+        position = match.end()
+
+
+def decode(string: str) -> Iterator[Element]:
+    """从 Mirai 码字符串中依次解码出消息元素.
+
+    Args:
+        string (str): Mirai 码字符串.
+
+    Raises:
+        ValueError: 存在未知类型的 Mirai 码, 或其参数无法转换为对应的元素.
+
+    Yields:
+        Element: 解码得到的消息元素; 相邻的文本总是被合并为一个 Plain.
+    """
+    text: List[str] = []
+    position = 0
+    length = len(string)
+    while position < length:
+        bracket = string.find("[", position)
+        if bracket == -1:
+            text.append(string[position:])
+            break
+        if bracket > position:
+            text.append(string[position:bracket])
+        if string.startswith("_", bracket + 1):
+            text.append("[")
+            position = bracket + 2
+            continue
+        match = CODE.match(string, bracket)
+        if match is None:
+            text.append("[")
+            position = bracket + 1
+            continue
+        kind, arguments = match.groups()
+        decoder = DECODERS.get(kind)
+        if decoder is None:
+            raise ValueError("unknown mirai code: {0}".format(match.group()))
+        args = split_arguments(arguments) if arguments is not None else []
+        arity = ARITY[kind]
+        if len(args) < arity:
+            args.extend([""] * (arity - len(args)))
+        try:
+            element = decoder(args)
+        except ValueError as e:  # pydantic 的 ValidationError 也是 ValueError
+            raise ValueError("invaild mirai code: {0}".format(match.group())) from e
+        if text:
+            yield Plain.unchecked(text="".join(text))
+            text = []
+        yield element
+        position = match.end()
+    if text:
+        yield Plain.unchecked(text="".join(text))
+
+
+def loads(string: str) -> MessageChain:
+    "将 Mirai 码字符串解码为(不可变的)消息链."
+    return MessageChain.unchecked(tuple(decode(string)))
@@ -1,7 +1,7 @@
 from functools import lru_cache
 import functools
 from types import TracebackType
-from typing import Dict, List, Optional, Tuple, TypeVar, Union
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple, TypeVar, Union
 from graia.broadcast.entities.dispatcher import BaseDispatcher
 from graia.broadcast.entities.signatures import Force
 from graia.broadcast.exceptions import ExecutionStop
@@ -15,27 +15,12 @@ from graia.broadcast.builtin.factory import (
 from graia.application.exceptions import ConflictItem
 
 from graia.application.message.chain import MessageChain
-from graia.application.message.elements.internal import (
-    At,
-    FlashImage,
-    Plain,
-    Source,
-    Quote,
-    Voice,
-    Xml,
-    Json,
-    App,
-    Poke,
-)
+from .preprocess import BLOCKING_ELEMENTS, chain_texts, prepare_chain
 from .signature import FullMatch, NormalMatch, PatternReceiver
 from .pack import Arguments, merge_signature_chain
-from graia.application.utilles import InsertGenerator
 from .signature import RequireParam, OptionalParam
 import re
 import random
-import copy
-
-BLOCKING_ELEMENTS = (Xml, Json, App, Poke, Voice, FlashImage)
 
 T = Union[NormalMatch, PatternReceiver]
 MessageIndex = Tuple[int, Optional[int]]
@@ -48,54 +33,71 @@ def origin_or_zero(origin: Optional[_T]) -> Union[_T, int]:
     return origin
 
 
-class Kanata(AsyncDispatcherContextManager):
-    "彼方."
-    signature_list: List[Union[NormalMatch, PatternReceiver]]
-    stop_exec_if_fail: bool = True
-
-    parsed_items: Dict[str, MessageChain]
-
-    allow_quote: bool
-    skip_one_at_in_quote: bool
-
-    args = ()
-    kwargs = {}
-
-    def __init__(
-        self,
-        signature_list: List[Union[NormalMatch, PatternReceiver]],
-        stop_exec_if_fail: bool = True,
-        allow_quote: bool = True,
-        skip_one_at_in_quote: bool = False,
-    ) -> None:
-        """该魔法方法用于实例化该参数解析器.
-
-        Args:
-            signature_list (List[Union[NormalMatch, PatternReceiver]]): 匹配标识链
-            stop_exec_if_fail (bool, optional): 是否在无可用匹配时停止监听器执行. Defaults to True.
-            allow_quote (bool, optional): 是否允许 Kanata 处理回复消息中的用户输入部分. Defaults to True.
-            skip_one_at_in_quote (bool, optional): 是否允许 Kanata 在处理回复消息中的用户输入部分时自动删除可能\
-                由 QQ 客户端添加的 At 和一个包含在单独 Plain 元素中的空格. Defaults to False.
-        """
-        self.signature_list = signature_list
-        self.stop_exec_if_fail = stop_exec_if_fail
-        self.parsed_items = None
-        self.allow_quote = allow_quote
-        self.skip_one_at_in_quote = skip_one_at_in_quote
+def texts_from(texts: List[Optional[str]], index: MessageIndex) -> List[Optional[str]]:
+    "等价于 `MessageChain.subchain(slice(index, None, None))`, 但只作用于 `chain_texts` 的结果."
+    result = texts[index[0] :]
+    if index[1] is not None and result:
+        if result[0] is None:
+            raise TypeError("the sliced chain does not starts with a Plain")
+        final_text = result[0][index[1] :]
+        if final_text:
+            result[0] = final_text
+        else:
+            del result[0]
+    return result
+
+
+class KanataPlan:
+    """由匹配标识链编译得到的, 不可变的匹配计划.
+
+    相邻的 FullMatch 与相邻的参数在编译时即被合并(`merge_signature_chain`), 正则表达式也被预先编译;
+    对于 FullMatch, 直接以字面量的前缀判断代替正则匹配.
+    若匹配标识链以 FullMatch 开头, 在进行任何其他工作之前, 先以该字面量检查消息的开头.
+
+    Attributes:
+        signature_list (Tuple[Union[NormalMatch, PatternReceiver]]): 原始的匹配标识链.
+        steps (Tuple[Tuple[Optional[Arguments], Optional[Pattern], Optional[str]]]): 匹配的步骤,
+            每一步为 (参数, 编译后的正则表达式, FullMatch 的字面量) 之一.
+        prefix (Optional[str]): 消息必须以之开头的字面量.
+    """
+
+    __slots__ = ("signature_list", "steps", "prefix")
+
+    signature_list: Tuple[Union[NormalMatch, PatternReceiver], ...]
+    steps: Tuple[Tuple[Optional[Arguments], Optional[Pattern], Optional[str]], ...]
+    prefix: Optional[str]
+
+    def __init__(self, signature_list: Sequence[Union[NormalMatch, PatternReceiver]]) -> None:
+        self.signature_list = tuple(signature_list)
+        steps = []
+        for signature in merge_signature_chain(list(signature_list)):
+            if isinstance(signature, Arguments):
+                steps.append((signature, None, None))
+            else:
+                steps.append(
+                    (
+                        None,
+                        re.compile(signature.operator()),
+                        signature.pattern if isinstance(signature, FullMatch) else None,
+                    )
+                )
+        self.steps = tuple(steps)
+        self.prefix = steps[0][2] if steps else None
 
-    @staticmethod
     def detect_index(
-        signature_chain: Tuple[Union[NormalMatch, PatternReceiver]],
+        self,
         message_chain: MessageChain,
-    ) -> Optional[Dict[str, Tuple[MessageIndex, MessageIndex]]]:
-        merged_chain = merge_signature_chain(signature_chain)
-        message_chain = message_chain.asMerged()
-        element_num = len(message_chain.__root__)
+        texts: Optional[List[Optional[str]]] = None,
+    ) -> Optional[Dict[Arguments, Tuple[MessageIndex, MessageIndex]]]:
+        if texts is None:
+            texts = chain_texts(message_chain.__root__)
+        if self.prefix is not None and (not texts or texts[0] is None or not texts[0].startswith(self.prefix)):
+            return
+
+        element_num = len(texts)
         end_index: MessageIndex = (
             element_num - 1,
-            len(message_chain.__root__[-1].text)
-            if element_num != 0 and message_chain.__root__[-1].__class__ is Plain
-            else None,
+            len(texts[-1]) if element_num != 0 and texts[-1] is not None else None,
         )
 
         reached_message_index: MessageIndex = (0, None)
@@ -109,160 +111,111 @@ class Kanata(AsyncDispatcherContextManager):
             Tuple[MessageIndex, MessageIndex],  # start(include)  # stop(exclude)
         ] = {}
 
-        signature_iterable = InsertGenerator(enumerate(merged_chain))
-        latest_index = None
         matching_recevier: Optional[Arguments] = None
 
-        for signature_index, signature in signature_iterable:
-            if isinstance(signature, (Arguments, PatternReceiver)):
-                if matching_recevier:  # 已经选中了一个...
-                    if isinstance(signature, Arguments):
-                        if latest_index == signature_index:
-                            matching_recevier.content.extend(signature.content)
-                            continue
-                        else:
-                            raise TypeError("a unexpected case: match conflict")
-                    if isinstance(signature, PatternReceiver):
-                        matching_recevier.content.append(signature)
-                        continue
-                else:
-                    if isinstance(signature, PatternReceiver):
-                        signature = Arguments([signature])
-                matching_recevier = signature
+        for arguments, pattern, literal in self.steps:
+            if arguments is not None:
+                matching_recevier = arguments
                 start_index = reached_message_index
-            elif isinstance(signature, NormalMatch):
-                if not matching_recevier:
-                    # 如果不要求匹配参数, 从当前位置(reached_message_index)开始匹配FullMatch.
-                    current_chain = message_chain.subchain(
-                        slice(reached_message_index, None, None)
-                    )
-                    if not current_chain.__root__:  # index 越界
-                        return
-                    if not isinstance(current_chain.__root__[0], Plain):
-                        # 切片后第一个 **不是** Plain.
+                continue
+
+            current_texts = texts_from(texts, reached_message_index)
+            if not matching_recevier:
+                # 如果不要求匹配参数, 从当前位置(reached_message_index)开始匹配.
+                if not current_texts:  # index 越界
+                    return
+                current_text = current_texts[0]
+                if current_text is None:
+                    # 切片后第一个 **不是** Plain.
+                    return
+                if literal is not None:
+                    if not current_text.startswith(literal):
                         return
-                    re_match_result = re.match(
-                        signature.operator(), current_chain.__root__[0].text
-                    )
+                    match_start, match_end = 0, len(literal)
+                else:
+                    re_match_result = pattern.match(current_text)
                     if not re_match_result:
-                        # 不匹配的
                         return
-                    # 推进当前进度.
-                    plain_text_length = len(current_chain.__root__[0].text)
-                    pattern_length = re_match_result.end() - re_match_result.start()
-                    if (pattern_length + 1) > plain_text_length:  # 推进后可能造成错误
-                        # 不推进 text_index 进度, 转而推进 element_index 进度
-                        reached_message_index = (reached_message_index[0] + 1, None)
+                    match_start, match_end = re_match_result.span()
+                # 推进当前进度.
+                pattern_length = match_end - match_start
+                if (pattern_length + 1) > len(current_text):  # 推进后可能造成错误
+                    # 不推进 text_index 进度, 转而推进 element_index 进度
+                    reached_message_index = (reached_message_index[0] + 1, None)
+                else:
+                    # 推进 element_index 进度至已匹配到的地方后.
+                    reached_message_index = (
+                        reached_message_index[0],
+                        origin_or_zero(reached_message_index[1]) + match_start + pattern_length,
+                    )
+            else:
+                # 需要匹配参数(是否贪婪模式查找, 即是否从后向前)
+                greed = matching_recevier.isGreed
+                for element_index, current_text in enumerate(current_texts):
+                    if current_text is None:
+                        continue
+                    if greed:
+                        text_find_result = None
+                        for text_find_result in pattern.finditer(current_text):
+                            pass
                     else:
-                        # 推进 element_index 进度至已匹配到的地方后.
+                        text_find_result = pattern.search(current_text)
+                    if text_find_result is None:
+                        continue
+                    text_find_index = text_find_result.start()
+
+                    # 找到了! 这里不仅要推进进度, 还要把当前匹配的参数记录结束位置并清理.
+                    stop_index = (
+                        reached_message_index[0] + element_index + int(element_index == 0),
+                        origin_or_zero(reached_message_index[1]) + text_find_index,
+                    )
+                    match_result[matching_recevier] = (start_index, stop_index)
+
+                    start_index = (0, None)
+                    matching_recevier = None
+
+                    pattern_length = text_find_result.end() - text_find_index
+                    if current_text == text_find_result.group():
+                        # 推进 element_index 而不是 text_index
                         reached_message_index = (
-                            reached_message_index[0],
-                            origin_or_zero(reached_message_index[1])
-                            + re_match_result.start()
-                            + pattern_length,
+                            reached_message_index[0] + element_index + int(element_index != 0),
+                            None,
                         )
-                else:
-                    # 需要匹配参数(是否贪婪模式查找, 即是否从后向前)
-                    greed = matching_recevier.isGreed
-                    for element_index, element in enumerate(
-                        message_chain.subchain(
-                            slice(reached_message_index, None, None)
-                        ).__root__
-                    ):
-                        if isinstance(element, Plain):
-                            current_text: str = element.text
-                            # 完成贪婪判断
-                            text_find_result_list = list(
-                                re.finditer(signature.operator(), current_text)
-                            )
-                            if not text_find_result_list:
-                                continue
-                            text_find_result = text_find_result_list[-int(greed)]
-                            if not text_find_result:
-                                continue
-                            text_find_index = text_find_result.start()
-
-                            # 找到了! 这里不仅要推进进度, 还要把当前匹配的参数记录结束位置并清理.
-                            stop_index = (
-                                reached_message_index[0]
-                                + element_index
-                                + int(element_index == 0),
-                                origin_or_zero(reached_message_index[1])
-                                + text_find_index,
-                            )
-                            match_result[matching_recevier] = (
-                                copy.copy(start_index),
-                                stop_index,
-                            )
-
-                            start_index = (0, None)
-                            matching_recevier = None
-
-                            pattern_length = (
-                                text_find_result.end() - text_find_result.start()
-                            )
-                            if (
-                                current_text
-                                == text_find_result.string[
-                                    slice(*text_find_result.span())
-                                ]
-                            ):
-                                # 此处是如果推进 text_index 就会被爆破....
-                                # 推进 element_index 而不是 text_index
-                                reached_message_index = (
-                                    reached_message_index[0]
-                                    + element_index
-                                    + int(element_index != 0),
-                                    None,
-                                )
-                            else:
-                                reached_message_index = (
-                                    reached_message_index[0] + element_index,
-                                    origin_or_zero(reached_message_index[1])
-                                    + text_find_index
-                                    + pattern_length,
-                                )
-                            break
                     else:
-                        # 找遍了都没匹配到.
-                        return
-            latest_index = signature_index
-        else:
-            if matching_recevier:  # 到达了终点, 却仍然还要做点事的.
-                # 计算终点坐标.
-                text_index = None
-
-                latest_element = message_chain.__root__[-1]
-                if isinstance(latest_element, Plain):
-                    text_index = len(latest_element.text)
-
-                stop_index = (len(message_chain.__root__), text_index)
-                match_result[matching_recevier] = (start_index, stop_index)
-            else:  # 如果不需要继续捕获消息作为参数, 但 Signature 已经无法指示 Message 的样式时, 判定本次匹配非法.
-                if reached_message_index < end_index:
+                        reached_message_index = (
+                            reached_message_index[0] + element_index,
+                            origin_or_zero(reached_message_index[1]) + text_find_index + pattern_length,
+                        )
+                    break
+                else:
+                    # 找遍了都没匹配到.
                     return
 
+        if matching_recevier:  # 到达了终点, 却仍然还要做点事的.
+            latest_text = texts[-1]
+            stop_index = (
+                element_num,
+                len(latest_text) if latest_text is not None else None,
+            )
+            match_result[matching_recevier] = (start_index, stop_index)
+        elif reached_message_index < end_index:
+            # 不需要继续捕获消息作为参数, 但 Signature 已经无法指示 Message 的样式时, 判定本次匹配非法.
+            return
+
         return match_result
 
-    @staticmethod
     def detect_and_mapping(
-        signature_chain: Tuple[Union[NormalMatch, PatternReceiver]],
+        self,
         message_chain: MessageChain,
+        texts: Optional[List[Optional[str]]] = None,
     ) -> Optional[Dict[Arguments, MessageChain]]:
-        match_result = Kanata.detect_index(signature_chain, message_chain)
+        match_result = self.detect_index(message_chain, texts)
         if match_result is not None:
             return {
                 k: message_chain[
                     v[0] : (
                         v[1][0],
-                        (
-                            v[1][1]
-                            - (
-                                origin_or_zero(v[0][1])
-                                if (v[1][0] <= v[0][0] <= v[1][0])
-                                else 0
-                            )
-                        )
+                        (v[1][1] - (origin_or_zero(v[0][1]) if (v[1][0] <= v[0][0] <= v[1][0]) else 0))
                         if v[1][1] is not None
                         else None,
                     )
@@ -270,10 +223,60 @@ class Kanata(AsyncDispatcherContextManager):
                 for k, v in match_result.items()
             }
 
+
+class Kanata(AsyncDispatcherContextManager):
+    "彼方."
+    signature_list: List[Union[NormalMatch, PatternReceiver]]
+    plan: KanataPlan
+    stop_exec_if_fail: bool = True
+
+    parsed_items: Dict[str, MessageChain]
+
+    allow_quote: bool
+    skip_one_at_in_quote: bool
+
+    args = ()
+    kwargs = {}
+
+    def __init__(
+        self,
+        signature_list: List[Union[NormalMatch, PatternReceiver]],
+        stop_exec_if_fail: bool = True,
+        allow_quote: bool = True,
+        skip_one_at_in_quote: bool = False,
+    ) -> None:
+        """该魔法方法用于实例化该参数解析器.
+
+        Args:
+            signature_list (List[Union[NormalMatch, PatternReceiver]]): 匹配标识链
+            stop_exec_if_fail (bool, optional): 是否在无可用匹配时停止监听器执行. Defaults to True.
+            allow_quote (bool, optional): 是否允许 Kanata 处理回复消息中的用户输入部分. Defaults to True.
+            skip_one_at_in_quote (bool, optional): 是否允许 Kanata 在处理回复消息中的用户输入部分时自动删除可能\
+                由 QQ 客户端添加的 At 和一个包含在单独 Plain 元素中的空格. Defaults to False.
+        """
+        self.signature_list = signature_list
+        self.plan = KanataPlan(signature_list)
+        self.stop_exec_if_fail = stop_exec_if_fail
+        self.parsed_items = None
+        self.allow_quote = allow_quote
+        self.skip_one_at_in_quote = skip_one_at_in_quote
+
+    @staticmethod
+    def detect_index(
+        signature_chain: Tuple[Union[NormalMatch, PatternReceiver]],
+        message_chain: MessageChain,
+    ) -> Optional[Dict[Arguments, Tuple[MessageIndex, MessageIndex]]]:
+        return KanataPlan(signature_chain).detect_index(message_chain)
+
+    @staticmethod
+    def detect_and_mapping(
+        signature_chain: Tuple[Union[NormalMatch, PatternReceiver]],
+        message_chain: MessageChain,
+    ) -> Optional[Dict[Arguments, MessageChain]]:
+        return KanataPlan(signature_chain).detect_and_mapping(message_chain)
+
     @staticmethod
-    def allocation(
-        mapping: Dict[Arguments, MessageChain]
-    ) -> Optional[Dict[str, MessageChain]]:
+    def allocation(mapping: Dict[Arguments, MessageChain]) -> Optional[Dict[str, MessageChain]]:
         if mapping is None:
             return None
         result = {}
@@ -302,21 +305,15 @@ class Kanata(AsyncDispatcherContextManager):
         interface: DispatcherInterface = (yield)
         current_status: StatusCodeEnum = StatusCodeEnum.DISPATCHING  # init stat
 
-        message_chain: MessageChain = (
-            await interface.lookup_param("__kanata_messagechain__", MessageChain, None)
-        ).exclude(Source)
-        if set([i.__class__ for i in message_chain.__root__]).intersection(
-            BLOCKING_ELEMENTS
-        ):
+        prepared = prepare_chain(
+            await interface.lookup_param("__kanata_messagechain__", MessageChain, None),
+            self.allow_quote,
+            self.skip_one_at_in_quote,
+        )
+        if prepared is None:
             raise ExecutionStop()
-        if self.allow_quote and message_chain.has(Quote):
-            # 0: Quote
-            message_chain = message_chain[(1, None):]
-            if self.skip_one_at_in_quote and message_chain.__root__:
-                if message_chain.__root__[0].__class__ is At:
-                    message_chain = message_chain[(1, 1):]
-
-        mapping_result = self.detect_and_mapping(self.signature_list, message_chain)
+
+        mapping_result = self.plan.detect_and_mapping(prepared.chain, prepared.texts)
         if mapping_result is not None:
             parsed_items = self.allocation(mapping_result)
         else:
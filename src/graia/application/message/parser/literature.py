@@ -1,8 +1,7 @@
 import re
-import shlex
 import getopt
 import itertools
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from graia.broadcast.entities.dispatcher import BaseDispatcher
 from graia.broadcast.entities.signatures import Force
 from graia.broadcast.exceptions import ExecutionStop
@@ -11,26 +10,23 @@ from graia.broadcast.interfaces.dispatcher import DispatcherInterface
 from graia.broadcast.utilles import printer
 from graia.application.message.chain import MessageChain, MessageIndex
 from graia.application.message.elements import Element
-from graia.application.message.elements.internal import (
-    At,
-    App,
-    Json,
-    Plain,
-    Quote,
-    Source,
-    Xml,
-    Voice,
-    Poke,
-    FlashImage,
-)
+from graia.application.message.elements.internal import Plain
 
 from graia.application.message.parser.pattern import (
     BoxParameter,
     ParamPattern,
     SwitchParameter,
 )
-
-BLOCKING_ELEMENTS = (Xml, Json, App, Poke, Voice, FlashImage)
+from graia.application.message.parser.preprocess import (
+    BLOCKING_ELEMENTS,
+    PreparedChain,
+    prepare_chain,
+)
+from graia.application.message.parser.tokenizer import (
+    Token,
+    token_to_chain,
+    tokenize,
+)
 
 
 class Literature(BaseDispatcher):
@@ -43,6 +39,12 @@ class Literature(BaseDispatcher):
     allow_quote: bool
     skip_one_at_in_quote: bool
 
+    shortopts: str
+    longopts: List[str]
+    short_args: Dict[str, bool]
+    long_args: Dict[str, bool]
+    map_with_bar: Dict[str, str]
+
     def __init__(
         self,
         *prefixs,
@@ -54,6 +56,35 @@ class Literature(BaseDispatcher):
         self.arguments = arguments or {}
         self.allow_quote = allow_quote
         self.skip_one_at_in_quote = skip_one_at_in_quote
+        self.compile_options()
+
+    def compile_options(self) -> None:
+        """根据 `arguments` 预先生成选项表; 在创建实例后修改了 `arguments` 时需要重新调用.
+
+        Raises:
+            ValueError: 存在重复的长选项或短选项.
+        """
+        self.shortopts = "".join(
+            [
+                arg.short if isinstance(arg, SwitchParameter) else (arg.short + ":")
+                for arg in self.arguments.values()
+                if arg.short
+            ]
+        )
+        self.longopts = [
+            long if isinstance(arg, SwitchParameter) else long + "="
+            for arg in self.arguments.values()
+            for long in arg.longs
+        ]
+        self.short_args = {}
+        for index, opt in enumerate(self.shortopts):  # 与 getopt.short_has_arg 相同
+            if opt != ":" and opt not in self.short_args:
+                self.short_args[opt] = self.shortopts.startswith(":", index + 1)
+        self.long_args = {long.rstrip("="): long.endswith("=") for long in self.longopts}
+        self.map_with_bar = {
+            **self.gen_long_map_with_bar(),
+            **self.gen_short_map_with_bar(),
+        }
 
     def trans_to_map(self, message_chain: MessageChain):
         string_result: List[str] = []
@@ -87,6 +118,8 @@ class Literature(BaseDispatcher):
     def gen_short_map(self):
         result = {}
         for param_name, arg in self.arguments.items():
+            if arg.short is None:
+                continue
             if arg.short in result:
                 raise ValueError("conflict item")
             result[arg.short] = param_name
@@ -99,55 +132,94 @@ class Literature(BaseDispatcher):
         return {("-" + k): v for k, v in self.gen_short_map().items() if k is not None}
 
     def parse_message(self, message_chain: MessageChain):
-        string_result, id_elem_map = self.trans_to_map(message_chain)
-
-        parsed_args, variables = getopt.getopt(
-            shlex.split(string_result),
-            "".join(
-                [
-                    arg.short if isinstance(arg, SwitchParameter) else (arg.short + ":")
-                    for arg in self.arguments.values()
-                    if arg.short
-                ]
-            ),
-            [
-                long if isinstance(arg, SwitchParameter) else long + "="
-                for arg in self.arguments.values()
-                for long in arg.longs
-            ],
-        )
-        map_with_bar = {**self.gen_long_map_with_bar(), **self.gen_short_map_with_bar()}
-        parsed_args = {
-            map_with_bar[k]: (
-                MessageChain.create(
-                    [
-                        Plain(i)
-                        if not re.match("^\$\d+$", i)
-                        else id_elem_map[int(i[1:])]
-                        for i in re.split(r"((?<!\\)\$[0-9]+)", v)
-                        if i
-                    ]
-                ).asMerged()
-                if isinstance(self.arguments[map_with_bar[k]], BoxParameter)
-                else (
-                    self.arguments[map_with_bar[k]].auto_reverse
-                    and not self.arguments[map_with_bar[k]].default
-                    or True
-                ),
-                self.arguments[map_with_bar[k]],
+        return self.parse_tokens(tokenize(message_chain.__root__))
+
+    def long_has_arg(self, opt: str) -> Tuple[bool, str]:
+        has_arg = self.long_args.get(opt)
+        if has_arg is not None:
+            return has_arg, opt
+        return getopt.long_has_args(opt, self.longopts)  # 缩写的长选项, 或抛出错误
+
+    def getopt(self, tokens: List[Token]) -> Tuple[List[Tuple[str, Token]], List[Token]]:
+        """与 `getopt.getopt` 规则相同的选项解析, 但作用于分词的结果.
+
+        Raises:
+            getopt.GetoptError: 选项不存在, 缺少参数等, 与 `getopt.getopt` 一致.
+
+        Returns:
+            Tuple[List[Tuple[str, Token]], List[Token]]: 带有 `-` 或 `--` 的选项名与其参数, 以及剩余的词.
+        """
+        opts: List[Tuple[str, Token]] = []
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            head = token[0] if token and token[0].__class__ is str else ""
+            if not head.startswith("-") or (head == "-" and len(token) == 1):
+                break
+            index += 1
+            if head == "--" and len(token) == 1:
+                break
+
+            if head.startswith("--"):
+                value: Optional[Token] = None
+                if "=" in head:
+                    opt, rest = head[2:].split("=", 1)
+                    value = ([rest] if rest else []) + token[1:]
+                elif len(token) > 1:
+                    raise getopt.GetoptError("option --%s not recognized" % head[2:], head[2:])
+                else:
+                    opt = head[2:]
+                has_arg, opt = self.long_has_arg(opt)
+                if has_arg:
+                    if value is None:
+                        if index >= len(tokens):
+                            raise getopt.GetoptError("option --%s requires argument" % opt, opt)
+                        value = tokens[index]
+                        index += 1
+                elif value is not None:
+                    raise getopt.GetoptError("option --%s must not have an argument" % opt, opt)
+                opts.append(("--" + opt, value or []))
+                continue
+
+            optstring = head[1:]
+            while optstring:
+                opt, optstring = optstring[0], optstring[1:]
+                has_arg = self.short_args.get(opt)
+                if has_arg is None:
+                    raise getopt.GetoptError("option -%s not recognized" % opt, opt)
+                if has_arg:
+                    value = ([optstring] if optstring else []) + token[1:]
+                    if not value:
+                        if index >= len(tokens):
+                            raise getopt.GetoptError("option -%s requires argument" % opt, opt)
+                        value = tokens[index]
+                        index += 1
+                    opts.append(("-" + opt, value))
+                    break
+                opts.append(("-" + opt, []))
+            else:
+                if len(token) > 1:  # 短选项之后紧跟着非文本的元素
+                    raise getopt.GetoptError("option -$ not recognized", "$")
+        return opts, tokens[index:]
+
+    def parse_tokens(self, tokens: List[Token]):
+        """解析分词的结果, 得到各个参数与剩余的变长参数.
+
+        Returns:
+            Tuple[Dict[str, Tuple[Any, ParamPattern]], List[MessageChain]]: 解析结果.
+        """
+        opts, variables = self.getopt(tokens)
+        parsed_args = {}
+        for k, v in opts:
+            param_name = self.map_with_bar[k]
+            argument_setting = self.arguments[param_name]
+            parsed_args[param_name] = (
+                token_to_chain(v)
+                if isinstance(argument_setting, BoxParameter)
+                else (argument_setting.auto_reverse and not argument_setting.default or True),
+                argument_setting,
             )
-            for k, v in parsed_args
-        }
-        variables = [
-            MessageChain.create(
-                [
-                    Plain(i) if not re.match("^\$\d+$", i) else id_elem_map[int(i[1:])]
-                    for i in re.split(r"((?<!\\)\$[0-9]+)", v)
-                    if i
-                ]
-            ).asMerged()
-            for v in variables
-        ]
+        variables = [token_to_chain(v) for v in variables]
         for param_name, argument_setting in self.arguments.items():
             if param_name not in parsed_args:
                 if argument_setting.default is not None:
@@ -161,53 +233,53 @@ class Literature(BaseDispatcher):
         return (parsed_args, variables)
 
     def prefix_match(self, target_chain: MessageChain):
-        target_chain = target_chain.asMerged()
-
-        chain_frames: List[MessageChain] = target_chain.split(" ", raw_string=True)
+        return self.match_frames(target_chain.asMerged().split(" ", raw_string=True))
 
+    def match_frames(self, chain_frames: List[MessageChain]):
         # 前缀匹配
         if len(self.prefixs) > len(chain_frames):
             return
         for index, current_prefix in enumerate(self.prefixs):
             current_frame = chain_frames[index]
-            if (
-                not current_frame.__root__
-                or type(current_frame.__root__[0]) is not Plain
-            ):
+            if not current_frame.__root__ or type(current_frame.__root__[0]) is not Plain:
                 return
             if current_frame.__root__[0].text != current_prefix:
                 return
 
         chain_frames = chain_frames[len(self.prefixs) :]
-        return MessageChain.create(
-            list(itertools.chain(*[i.__root__ + [Plain(" ")] for i in chain_frames]))[
-                :-1
-            ]
+        space = Plain.unchecked(text=" ")
+        return MessageChain.unchecked(
+            list(itertools.chain(*[i.__root__ + [space] for i in chain_frames]))[:-1]
         ).asMerged()
 
+    def prepared_tokens(self, prepared: PreparedChain) -> Optional[List[Token]]:
+        """对预处理后的消息链进行前缀匹配, 并对剩余的部分进行分词;
+        前缀相同的 Literature 共用同一结果.
+
+        Returns:
+            Optional[List[Token]]: 前缀不匹配时为 None.
+        """
+        try:
+            return prepared.literature[self.prefixs]
+        except KeyError:
+            pass
+        noprefix = self.match_frames(prepared.frames)
+        result = prepared.literature[self.prefixs] = tokenize(noprefix.__root__) if noprefix is not None else None
+        return result
+
     async def beforeDispatch(self, interface: DispatcherInterface):
-        message_chain: MessageChain = (
-            await interface.lookup_param(
-                "__literature_messagechain__", MessageChain, None
-            )
-        ).exclude(Source)
-        if set([i.__class__ for i in message_chain.__root__]).intersection(
-            BLOCKING_ELEMENTS
-        ):
+        prepared = prepare_chain(
+            await interface.lookup_param("__literature_messagechain__", MessageChain, None),
+            self.allow_quote,
+            self.skip_one_at_in_quote,
+        )
+        if prepared is None:
             raise ExecutionStop()
-        if self.allow_quote and message_chain.has(Quote):
-            # 自动忽略自 Quote 后第一个 At
-            message_chain = message_chain[(1, None):]
-            if self.skip_one_at_in_quote and message_chain.__root__:
-                if message_chain.__root__[0].__class__ is At:
-                    message_chain = message_chain[(1, 1):]
-        noprefix = self.prefix_match(message_chain)
-        if noprefix is None:
+        tokens = self.prepared_tokens(prepared)
+        if tokens is None:
             raise ExecutionStop()
 
-        interface.execution_contexts[-1].literature_detect_result = self.parse_message(
-            noprefix
-        )
+        interface.execution_contexts[-1].literature_detect_result = self.parse_tokens(tokens)
 
     async def catch(self, interface: DispatcherInterface):
         if interface.name == "__literature_messagechain__":
@@ -0,0 +1,154 @@
+"""参数解析器(Kanata, Literature)共用的消息链预处理.
+
+同一事件的消息链会被每个监听器上的解析器各自处理一遍: 排除 Source, 检查是否含有无法解析的元素,
+按需去除 Quote 与其后的 At, 合并相邻的 Plain 等. 这些结果只取决于消息链本身与少数几个选项,
+因此被缓存在(不可变的)消息链实例上, 对于同一事件, 每种预处理至多进行一次.
+"""
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple, Type
+
+from graia.application.message.chain import MessageChain
+from graia.application.message.elements import Element
+from graia.application.message.elements.internal import (
+    App,
+    At,
+    FlashImage,
+    Json,
+    Plain,
+    Poke,
+    Quote,
+    Source,
+    Voice,
+    Xml,
+)
+
+BLOCKING_ELEMENTS = (Xml, Json, App, Poke, Voice, FlashImage)
+"含有这些元素的消息不会被参数解析器处理."
+
+
+def chain_texts(elements: Sequence[Element]) -> List[Optional[str]]:
+    """以与 `MessageChain.asMerged` 相同的方式合并相邻的 Plain, 但只保留文本:
+    Plain 对应其文本, 其他元素对应 None.
+    """
+    result: List[Optional[str]] = []
+    plain: List[str] = []
+    for element in elements:
+        if isinstance(element, Plain):
+            plain.append(element.text)
+        else:
+            if plain:
+                result.append("".join(plain))
+                plain = []
+            result.append(None)
+    if plain:
+        result.append("".join(plain))
+    return result
+
+
+class PreparedChain:
+    """经过预处理, 可以直接交由参数解析器处理的消息链, 以及由其派生的各种形式.
+
+    Attributes:
+        chain (MessageChain): 已排除 Source, 并按选项去除了 Quote 与 At 的消息链.
+        literature (Dict[Tuple[str, ...], Any]): 以前缀为键, 由 `Literature` 写入的前缀匹配结果.
+        commands (Optional[Tuple[int, FrozenSet[Tuple[str, ...]]]]): 由 `CommandRouter` 写入的,
+            能够匹配的所有前缀, 以及查找时已登记的前缀数量.
+    """
+
+    __slots__ = ("chain", "literature", "commands", "_merged", "_texts", "_frames")
+
+    chain: MessageChain
+    literature: Dict[Tuple[str, ...], Any]
+    commands: Optional[Tuple[int, FrozenSet[Tuple[str, ...]]]]
+
+    def __init__(self, chain: MessageChain) -> None:
+        self.chain = chain
+        self.literature = {}
+        self.commands = None
+        self._merged = None
+        self._texts = None
+        self._frames = None
+
+    @property
+    def merged(self) -> MessageChain:
+        "合并了相邻 Plain 的消息链."
+        if self._merged is None:
+            self._merged = self.chain.asMerged()
+        return self._merged
+
+    @property
+    def texts(self) -> List[Optional[str]]:
+        "`chain_texts` 的结果; 请勿修改."
+        if self._texts is None:
+            self._texts = chain_texts(self.chain.__root__)
+        return self._texts
+
+    @property
+    def frames(self) -> List[MessageChain]:
+        "以空格分割合并后的消息链所得到的各个部分, 即 `Literature` 进行前缀匹配时的输入."
+        if self._frames is None:
+            self._frames = self.merged.split(" ", raw_string=True)
+        return self._frames
+
+
+class ParserMemo:
+    """缓存在消息链上的预处理结果.
+
+    Attributes:
+        stripped (MessageChain): 排除了 Source 的消息链.
+        element_types (FrozenSet[Type[Element]]): `stripped` 中出现的元素类型.
+        blocked (bool): 消息链中是否含有 `BLOCKING_ELEMENTS` 中的元素.
+    """
+
+    __slots__ = ("stripped", "element_types", "blocked", "prepared")
+
+    stripped: MessageChain
+    element_types: FrozenSet[Type[Element]]
+    blocked: bool
+    prepared: Dict[Tuple[bool, bool], PreparedChain]
+
+    def __init__(self, message_chain: MessageChain) -> None:
+        self.stripped = message_chain.exclude(Source)
+        self.element_types = frozenset(i.__class__ for i in self.stripped.__root__)
+        self.blocked = not self.element_types.isdisjoint(BLOCKING_ELEMENTS)
+        self.prepared = {}
+
+    def prepare(self, allow_quote: bool, skip_one_at_in_quote: bool) -> PreparedChain:
+        if not (allow_quote and Quote in self.element_types):
+            key = (False, False)
+        else:
+            key = (True, skip_one_at_in_quote)
+        prepared = self.prepared.get(key)
+        if prepared is None:
+            message_chain = self.stripped
+            if key[0]:
+                # 0: Quote
+                message_chain = message_chain[(1, None):]
+                if key[1] and message_chain.__root__:
+                    if message_chain.__root__[0].__class__ is At:
+                        message_chain = message_chain[(1, 1):]
+            prepared = self.prepared[key] = PreparedChain(message_chain)
+        return prepared
+
+
+def prepare_chain(
+    message_chain: MessageChain, allow_quote: bool, skip_one_at_in_quote: bool
+) -> Optional[PreparedChain]:
+    """对消息链进行参数解析器所需的预处理; 对于不可变的消息链, 结果会被缓存.
+
+    Args:
+        message_chain (MessageChain): 事件中的消息链.
+        allow_quote (bool): 是否处理回复消息中的用户输入部分, 即去除开头的 Quote.
+        skip_one_at_in_quote (bool): 去除 Quote 后, 是否再去除紧随其后的一个 At.
+
+    Returns:
+        Optional[PreparedChain]: 预处理的结果; 消息链中含有 `BLOCKING_ELEMENTS` 中的元素时为 None.
+    """
+    memo = message_chain._get_memo()
+    parser_memo = memo.get("parser") if memo is not None else None
+    if parser_memo is None:
+        parser_memo = ParserMemo(message_chain)
+        if memo is not None:
+            memo["parser"] = parser_memo
+    if parser_memo.blocked:
+        return None
+    return parser_memo.prepare(allow_quote, skip_one_at_in_quote)
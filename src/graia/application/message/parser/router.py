@@ -0,0 +1,134 @@
+"""以前缀树(trie)为所有 `Literature` 监听器进行命令路由.
+
+每个带有 `Literature` 的监听器都会各自对消息进行前缀匹配, 而对于一条消息, 至多只有少数几条命令能够匹配.
+`CommandRouter` 在第一次见到一个监听器时, 将其 `Literature` 的前缀登记到前缀树中;
+对于每条消息, 只需将其分割一次并沿前缀树查找, 即可得到所有能够匹配的前缀,
+随后直接略过前缀不匹配的监听器, 不再为它们创建任务.
+
+只有监听器 `inline_dispatchers` 中的 `Literature` 实例会被用于路由, 其余情况(例如通过命名空间注入的解析器)
+仍由 `Literature` 自身在分发时进行匹配.
+"""
+import weakref
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from graia.broadcast.entities.event import Dispatchable
+from graia.broadcast.entities.listener import Listener
+
+from graia.application.message.chain import MessageChain
+from graia.application.message.elements.internal import Plain
+
+from .literature import Literature
+from .preprocess import PreparedChain, prepare_chain
+
+
+class TrieNode:
+    __slots__ = ("children", "prefixs")
+
+    children: Dict[str, "TrieNode"]
+    prefixs: Optional[Tuple[str, ...]]
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.prefixs = None
+
+
+class CommandRouter:
+    """命令路由器, 由应用实例在分发消息事件时使用.
+
+    Attributes:
+        root (TrieNode): 前缀树的根节点.
+        known (Set[Tuple[str, ...]]): 已登记到前缀树中的所有前缀.
+        skipped (int): 因前缀不匹配而被略过的监听器的数量.
+    """
+
+    root: TrieNode
+    known: Set[Tuple[str, ...]]
+    skipped: int
+
+    literatures: "weakref.WeakKeyDictionary[Listener, Tuple[Literature, ...]]"
+
+    def __init__(self) -> None:
+        self.root = TrieNode()
+        self.known = set()
+        self.skipped = 0
+        self.literatures = weakref.WeakKeyDictionary()
+
+    def register(self, prefixs: Tuple[str, ...]) -> None:
+        "将一个前缀登记到前缀树中."
+        if prefixs in self.known:
+            return
+        node = self.root
+        for token in prefixs:
+            node = node.children.setdefault(token, TrieNode())
+        node.prefixs = prefixs
+        self.known.add(prefixs)
+
+    def literatures_of(self, listener: Listener) -> Tuple[Literature, ...]:
+        "获取监听器上的 `Literature`; 第一次见到该监听器时, 登记其前缀."
+        literatures = self.literatures.get(listener)
+        if literatures is None:
+            literatures = self.literatures[listener] = tuple(
+                i for i in listener.inline_dispatchers if isinstance(i, Literature)
+            )
+            for literature in literatures:
+                self.register(literature.prefixs)
+        return literatures
+
+    def lookup(self, prepared: PreparedChain) -> FrozenSet[Tuple[str, ...]]:
+        """沿前缀树查找预处理后的消息链所能匹配的所有前缀, 与 `Literature.match_frames` 的规则相同;
+        结果会被缓存在 `prepared` 上, 直到有新的前缀被登记.
+        """
+        cached = prepared.commands
+        if cached is not None and cached[0] == len(self.known):
+            return cached[1]
+
+        matched = []
+        node = self.root
+        if node.prefixs is not None:
+            matched.append(node.prefixs)
+        for frame in prepared.frames:
+            if not frame.__root__ or type(frame.__root__[0]) is not Plain:
+                break
+            node = node.children.get(frame.__root__[0].text)
+            if node is None:
+                break
+            if node.prefixs is not None:
+                matched.append(node.prefixs)
+
+        result = frozenset(matched)
+        prepared.commands = (len(self.known), result)
+        return result
+
+    def accepts(self, listener: Listener, message_chain: MessageChain) -> bool:
+        "判断监听器的 `Literature` 是否都可能匹配该消息链; 不确定时视为可能匹配."
+        for literature in self.literatures_of(listener):
+            if literature.prefixs not in self.known:  # 前缀在登记后被修改
+                self.register(literature.prefixs)
+            try:
+                prepared = prepare_chain(
+                    message_chain,
+                    literature.allow_quote,
+                    literature.skip_one_at_in_quote,
+                )
+            except TypeError:  # 交由 Literature 自身处理
+                continue
+            if prepared is None or literature.prefixs not in self.lookup(prepared):
+                return False
+        return True
+
+    def route(self, event: Dispatchable, listeners: List[Listener]) -> List[Listener]:
+        """从监听事件的监听器中, 略过所有前缀不匹配的监听器.
+
+        Args:
+            event (Dispatchable): 需要分发的事件; 只有带有消息链的事件会被路由.
+            listeners (List[Listener]): 监听该事件的所有监听器.
+
+        Returns:
+            List[Listener]: 需要执行的监听器.
+        """
+        message_chain = getattr(event, "messageChain", None)
+        if not isinstance(message_chain, MessageChain):
+            return listeners
+        result = [i for i in listeners if self.accepts(i, message_chain)]
+        self.skipped += len(listeners) - len(result)
+        return result
@@ -0,0 +1,126 @@
+"""直接作用于消息元素的, 与 `shlex.split` 规则相同的分词器.
+
+`Literature` 原先需要先将消息链转为以 `$n` 代替非 Plain 元素的字符串, 经 `shlex.split` 分词后,
+再以正则表达式将 `$n` 换回元素. 此处的分词器直接遍历消息元素: Plain 中的文本按 POSIX shell 的规则处理
+(空白分隔, 单双引号, 反斜杠转义), 其他元素则被视为不可分割的普通字符, 原样放入所在的词中.
+"""
+import re
+from typing import List, Optional, Sequence, Union
+
+from graia.application.message.chain import MessageChain
+from graia.application.message.elements import Element
+from graia.application.message.elements.internal import Plain
+
+Part = Union[str, Element]
+Token = List[Part]
+"一个词, 由文本与元素交替组成; 相邻的文本总是已被合并."
+
+UNQUOTED = re.compile(r"[^ \t\r\n\\'\"]+")
+WHITESPACE = re.compile(r"[ \t\r\n]+")
+DOUBLE_QUOTED = re.compile(r"[^\"\\]*")
+
+
+def append_part(token: Token, part: Part) -> None:
+    if part.__class__ is str:
+        if not part:
+            return
+        if token and token[-1].__class__ is str:
+            token[-1] += part
+            return
+    token.append(part)
+
+
+def tokenize(elements: Sequence[Element]) -> List[Token]:
+    """以 `shlex.split` 的规则对消息元素进行分词.
+
+    Args:
+        elements (Sequence[Element]): 需要分词的消息元素.
+
+    Raises:
+        ValueError: 引号未闭合, 或末尾存在未转义任何字符的反斜杠, 与 `shlex.split` 一致.
+
+    Returns:
+        List[Token]: 分词的结果.
+    """
+    tokens: List[Token] = []
+    token: Token = []
+    started = False
+    quote: Optional[str] = None
+    escape = False
+
+    for element in elements:
+        if not isinstance(element, Plain):
+            if escape:
+                if quote is not None:
+                    append_part(token, "\\")
+                escape = False
+            token.append(element)
+            started = True
+            continue
+
+        text = element.text
+        index = 0
+        length = len(text)
+        while index < length:
+            if escape:
+                char = text[index]
+                if quote == '"' and char not in '"\\':
+                    char = "\\" + char
+                append_part(token, char)
+                index += 1
+                escape = False
+            elif quote is None:
+                char = text[index]
+                if char in " \t\r\n":
+                    index = WHITESPACE.match(text, index).end()
+                    if started:
+                        tokens.append(token)
+                        token = []
+                        started = False
+                elif char == "\\":
+                    escape = True
+                    started = True
+                    index += 1
+                elif char == "'" or char == '"':
+                    quote = char
+                    started = True
+                    index += 1
+                else:
+                    match = UNQUOTED.match(text, index)
+                    append_part(token, match.group())
+                    started = True
+                    index = match.end()
+            elif quote == "'":
+                end = text.find("'", index)
+                if end == -1:
+                    append_part(token, text[index:])
+                    index = length
+                else:
+                    append_part(token, text[index:end])
+                    quote = None
+                    index = end + 1
+            else:
+                match = DOUBLE_QUOTED.match(text, index)
+                append_part(token, match.group())
+                index = match.end()
+                if index < length:
+                    if text[index] == '"':
+                        quote = None
+                    else:
+                        escape = True
+                    index += 1
+
+    if escape:
+        raise ValueError("No escaped character")
+    if quote is not None:
+        raise ValueError("No closing quotation")
+    if started:
+        tokens.append(token)
+    return tokens
+
+
+def token_to_chain(token: Token) -> MessageChain:
+    "将一个词转为(可变的)消息链, 其中的非文本元素为原有元素的副本."
+    return MessageChain.unchecked(
+        [Plain.unchecked(text=part) if part.__class__ is str else part.copy() for part in token]
+    )
@@ -0,0 +1,373 @@
+"""应用本地的消息存储.
+
+`messageFromId` 原先总是请求 `mirai-api-http` 的消息缓存, 而该缓存的大小有限(由 `cacheSize` 决定),
+消息被移出后便无法再获取. `MessageStore` 记录接收到的消息事件与应用自身发出的消息:
+
+ - 最近的消息保存在内存中的环形缓冲区内, 以 `messageId` 为索引;
+ - 若指定了 `path`, 被移出缓冲区的消息会分批写入 sqlite 数据库, 关闭时缓冲区中的消息也会被写入,
+   使得旧的消息(包括重启前的消息)依然可以被查询. 在事件循环中写入时, 数据库的写入在一个专用的线程中进行,
+   不会阻塞事件循环; 写入完成之前, 这些消息依然可以从内存中查询到. 应用实例以异步的 `lookup` 查询消息,
+   数据库的查询同样在该线程中进行.
+
+写入数据库时, 消息链以 Mirai 码(见 `graia.application.message.mirai_code`)保存.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Type, Union
+
+from .event.messages import FriendMessage, GroupMessage, TempMessage
+from .message import mirai_code
+from .message.chain import MessageChain
+from .message.elements import ExternalElement
+from .message.elements.internal import Quote, Source
+
+if TYPE_CHECKING:
+    from graia.broadcast import Broadcast
+
+MessageEvent = Union[GroupMessage, FriendMessage, TempMessage]
+
+EVENT_KINDS: Dict[Type[MessageEvent], str] = {
+    GroupMessage: "Group",
+    FriendMessage: "Friend",
+    TempMessage: "Temp",
+}
+KIND_EVENTS: Dict[str, Type[MessageEvent]] = {v: k for k, v in EVENT_KINDS.items()}
+
+
+class StoredMessage:
+    """存储中的一条消息.
+
+    Attributes:
+        id (int): 消息的 `messageId`.
+        kind (str): 消息的种类, 为 `Group`, `Friend` 或 `Temp`.
+        group (Optional[int]): 群消息与临时消息所在的群组.
+        sender (int): 发送者; 应用自身发出的消息为当前的账号.
+        target (Optional[int]): 应用自身发出的好友消息与临时消息的接收者, 其余情况为 None.
+        time (float): 消息的时间戳.
+        chain (MessageChain): 消息链.
+        event (Optional[MessageEvent]): 接收到的消息事件; 应用自身发出的消息为 None.
+    """
+
+    __slots__ = ("id", "kind", "group", "sender", "target", "time", "chain", "event")
+
+    id: int
+    kind: str
+    group: Optional[int]
+    sender: int
+    target: Optional[int]
+    time: float
+    chain: MessageChain
+    event: Optional[MessageEvent]
+
+    def __init__(
+        self,
+        id: int,
+        kind: str,
+        group: Optional[int],
+        sender: int,
+        target: Optional[int],
+        time: float,
+        chain: MessageChain,
+        event: Optional[MessageEvent] = None,
+    ) -> None:
+        self.id = id
+        self.kind = kind
+        self.group = group
+        self.sender = sender
+        self.target = target
+        self.time = time
+        self.chain = chain
+        self.event = event
+
+    @classmethod
+    def fromEvent(cls, event: MessageEvent) -> Optional["StoredMessage"]:
+        "从接收到的消息事件创建; 消息链中没有 Source 时为 None."
+        sources = event.messageChain.get(Source)
+        if not sources:
+            return None
+        sender = event.sender
+        return cls(
+            sources[0].id,
+            EVENT_KINDS[event.__class__],
+            sender.group.id if hasattr(sender, "group") else None,
+            sender.id,
+            None,
+            sources[0].time.timestamp(),
+            event.messageChain,
+            event,
+        )
+
+
+class MessageStore:
+    """消息存储.
+
+    Attributes:
+        max_entries (int): 内存中最多保存的消息数.
+        path (Optional[Path]): 数据库的路径, 为 None 时只在内存中保存.
+        batch_size (int): 被移出内存的消息每积累多少条写入一次数据库.
+        hits (int): 查询命中的次数.
+        misses (int): 查询未命中的次数.
+    """
+
+    max_entries: int
+    path: Optional[Path]
+    batch_size: int
+    hits: int
+    misses: int
+
+    entries: "OrderedDict[int, StoredMessage]"
+    pending: "OrderedDict[int, StoredMessage]"
+    connection: Optional[sqlite3.Connection]
+
+    _lock: threading.Lock
+    _executor: Optional[ThreadPoolExecutor]
+    _writing: Optional["asyncio.Future"]
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        path: Optional[Union[str, Path]] = None,
+        batch_size: int = 64,
+    ) -> None:
+        self.max_entries = max_entries
+        self.path = Path(path) if path is not None else None
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+
+        self.entries = OrderedDict()
+        self.pending = OrderedDict()
+        self.connection = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._writing = None
+        if self.path is not None:
+            self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="message-store")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY, kind TEXT, group_id INTEGER, sender INTEGER, "
+                "target INTEGER, time REAL, chain TEXT, event TEXT)"
+            )
+            self.connection.commit()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, message: StoredMessage) -> None:
+        "写入一条消息; `messageId` 相同的旧消息将被替换."
+        self.pending.pop(message.id, None)
+        self.entries[message.id] = message
+        self.entries.move_to_end(message.id)
+        while len(self.entries) > self.max_entries:
+            _, evicted = self.entries.popitem(last=False)
+            if self.connection is not None:
+                self.pending[evicted.id] = evicted
+        if len(self.pending) >= self.batch_size:
+            self._schedule_write()
+
+    def addEvent(self, event: MessageEvent) -> None:
+        "记录接收到的消息事件."
+        message = StoredMessage.fromEvent(event)
+        if message is not None:
+            self.add(message)
+
+    def addSent(self, message_id: int, target: Hashable, chain: MessageChain, account: int) -> None:
+        """记录应用自身发出的消息.
+
+        Args:
+            message_id (int): 发送所得到的 `messageId`.
+            target (Hashable): 发送对象, 为 `("Group", 群号)`, `("Friend", QQ 号)` 或 `("Temp", 群号, QQ 号)`.
+            chain (MessageChain): 已经构建好的消息链, 其中的外部态元素会被转为内部态.
+            account (int): 当前的账号.
+        """
+        if any(isinstance(i, ExternalElement) for i in chain.__root__):
+            chain = MessageChain.parse_obj(chain.__root__)
+        kind = target[0]
+        group = target[1] if kind != "Friend" else None
+        receiver = target[-1] if kind != "Group" else None
+        self.add(StoredMessage(message_id, kind, group, account, receiver, time.time(), chain))
+
+    def get(self, message_id: int) -> Optional[StoredMessage]:
+        """查询一条消息, 依次查找内存与数据库.
+
+        Args:
+            message_id (int): 消息的 `messageId`.
+
+        Returns:
+            Optional[StoredMessage]: 查询到的消息, 未找到时为 None.
+        """
+        message = self.entries.get(message_id) or self.pending.get(message_id)
+        if message is None and self.connection is not None:
+            message = self._select(message_id)
+        return self._count(message)
+
+    async def lookup(self, message_id: int) -> Optional[StoredMessage]:
+        """与 `get` 相同, 但数据库的查询在写入线程中进行, 不会阻塞事件循环; 应用实例使用该方法.
+
+        Args:
+            message_id (int): 消息的 `messageId`.
+
+        Returns:
+            Optional[StoredMessage]: 查询到的消息, 未找到时为 None.
+        """
+        message = self.entries.get(message_id) or self.pending.get(message_id)
+        if message is None and self._executor is not None:
+            message = await asyncio.get_event_loop().run_in_executor(self._executor, self._select, message_id)
+        return self._count(message)
+
+    def getEvent(self, message_id: int) -> Optional[MessageEvent]:
+        "查询接收到的消息事件; 未找到, 或为应用自身发出的消息时为 None."
+        message = self.get(message_id)
+        return message.event if message is not None else None
+
+    async def lookupEvent(self, message_id: int) -> Optional[MessageEvent]:
+        "与 `getEvent` 相同, 但不会阻塞事件循环."
+        message = await self.lookup(message_id)
+        return message.event if message is not None else None
+
+    async def lookupQuoted(self, quote: Quote) -> MessageChain:
+        """获取回复中被回复的完整消息链; 存储中没有该消息时, 为回复中附带的 `origin`.
+        应用实例自身不会解析回复, 该方法供需要完整的被回复消息的监听器使用.
+
+        Args:
+            quote (Quote): 消息中的回复.
+
+        Returns:
+            MessageChain: 被回复的消息链.
+        """
+        message = await self.lookup(quote.id)
+        return message.chain if message is not None else quote.origin
+
+    def _count(self, message: Optional[StoredMessage]) -> Optional[StoredMessage]:
+        if message is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return message
+
+    def _select(self, message_id: int) -> Optional[StoredMessage]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT id, kind, group_id, sender, target, time, chain, event FROM messages WHERE id=?",
+                (message_id,),
+            ).fetchone()
+        return self._load(row) if row is not None else None
+
+    def _load(self, row: tuple) -> StoredMessage:
+        message_id, kind, group, sender, target, timestamp, chain, event = row
+        chain = mirai_code.loads(chain)
+        if event is not None:
+            event = KIND_EVENTS[kind].parse_obj({**json.loads(event), "messageChain": chain})
+        return StoredMessage(message_id, kind, group, sender, target, timestamp, chain, event)
+
+    def _dump(self, message: StoredMessage) -> tuple:
+        return (
+            message.id,
+            message.kind,
+            message.group,
+            message.sender,
+            message.target,
+            message.time,
+            message.chain.asSerializationString(),
+            message.event.json(exclude={"type", "messageChain"}, by_alias=True) if message.event is not None else None,
+        )
+
+    def _write(self, rows: List[tuple]) -> None:
+        with self._lock:
+            self.connection.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.connection.commit()
+
+    def _schedule_write(self) -> None:
+        """将被移出内存的消息交给写入线程; 同时只有一批消息在写入, 其间被移出的消息积累到下一批.
+        不在事件循环中时, 同步地写入.
+        """
+        if self._writing is not None or self._executor is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        batch: List[StoredMessage] = list(self.pending.values())
+        self._writing = loop.run_in_executor(self._executor, self._write, [self._dump(i) for i in batch])
+        self._writing.add_done_callback(lambda future: self._written(batch, future))
+
+    def _written(self, batch: List[StoredMessage], future: "asyncio.Future") -> None:
+        self._writing = None
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            # 写入失败的消息留在 `pending` 中, 在下一次写入时重试.
+            traceback.print_exception(
+                type(future.exception()),
+                future.exception(),
+                future.exception().__traceback__,
+            )
+            return
+        for message in batch:
+            # 写入期间被重新写入内存的消息已经不在 `pending` 中, 或已是新的实例.
+            if self.pending.get(message.id) is message:
+                del self.pending[message.id]
+        if len(self.pending) >= self.batch_size:
+            self._schedule_write()
+
+    def flush(self, everything: bool = False) -> None:
+        """同步地将被移出内存的消息写入数据库; 会阻塞直到写入完成.
+
+        Args:
+            everything (bool, optional): 是否将内存中的消息也一并写入, 用于关闭前. 默认为 False.
+        """
+        if self.connection is None:
+            return
+        messages: List[StoredMessage] = list(self.pending.values())
+        if everything:
+            messages.extend(self.entries.values())
+        if messages:
+            self._write([self._dump(i) for i in messages])
+        self.pending.clear()
+
+    def install(self, broadcast: "Broadcast") -> None:
+        """在 `broadcast` 上注册用于记录消息事件的监听器.
+
+        多个应用实例共用同一个 `Broadcast` 时, 监听器只注册一次, 消息事件被记录到接收到该事件的应用实例的
+        `message_store` 中; 在应用实例的上下文之外时, 记录到本存储中.
+
+        Args:
+            broadcast (Broadcast): 应用实例所使用的事件系统.
+        """
+        from graia.broadcast.interfaces.dispatcher import DispatcherInterface
+
+        from .context import application
+        from .utilles import install_once
+
+        def message_recorder(interface: DispatcherInterface):
+            app = application.get(None)
+            store = app.message_store if app is not None else self
+            if store is not None:
+                store.addEvent(interface.event)
+
+        if not install_once(broadcast, "message_store"):
+            return
+        for event_type in EVENT_KINDS:
+            broadcast.receiver(event_type, priority=0)(message_recorder)
+
+    def close(self) -> None:
+        """等待正在进行的写入完成, 将所有消息写入数据库, 并关闭数据库连接.
+
+        该方法会阻塞; 在事件循环中应以 `loop.run_in_executor` 调用, 应用实例的 `shutdown` 即是如此.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.connection is not None:
+            self.flush(everything=True)
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,129 @@
+"""未启用 websocket 时使用的, 自适应的 HTTP 轮询.
+
+原先的轮询以固定的 0.5 秒间隔, 每次获取固定的 10 条消息: 空闲时平均增加约 0.25 秒的延迟,
+而消息突增时又需要许多次请求才能取完. `AdaptivePoller` 根据观察到的积压调整间隔与每次获取的数量:
+
+ - 获取到消息时, 间隔回到 `min_interval`; 连续未获取到消息时, 间隔逐渐增大, 直到上限;
+   上限为 `max_interval`, 指定了 `latency_target` 时不超过其两倍(轮询带来的平均延迟约为间隔的一半);
+ - 一次获取的数量达到上限时, 以 `countMessage` 查询剩余的积压, 并据此决定下一次获取的数量;
+   否则每次获取的数量逐渐回落到 `min_batch`;
+ - 仍有积压时, 下一次获取会在解码并分发本批消息之前发出, 使两者重叠进行.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from . import GraiaMiraiApplication
+
+
+class AdaptivePoller:
+    """自适应的 HTTP 轮询器, 由应用实例在未启用 websocket 时使用.
+
+    Attributes:
+        min_interval (float): 轮询间隔的下限, 单位为秒.
+        max_interval (float): 轮询间隔的上限, 单位为秒.
+        latency_target (Optional[float]): 期望的平均延迟, 单位为秒; 空闲时的轮询间隔不超过其两倍.
+        min_batch (int): 每次获取的数量的下限.
+        max_batch (int): 每次获取的数量的上限.
+        interval (float): 当前的轮询间隔.
+        batch_size (int): 当前每次获取的数量.
+        requests (int): 已发出的请求数.
+        received (int): 已获取到的事件数.
+    """
+
+    min_interval: float
+    max_interval: float
+    latency_target: Optional[float]
+    min_batch: int
+    max_batch: int
+
+    interval: float
+    batch_size: int
+    requests: int
+    received: int
+
+    def __init__(
+        self,
+        min_interval: float = 0.05,
+        max_interval: float = 1.0,
+        latency_target: Optional[float] = 0.1,
+        min_batch: int = 10,
+        max_batch: int = 100,
+    ) -> None:
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be positive and <= max_interval")
+        if not 0 < min_batch <= max_batch:
+            raise ValueError("min_batch must be positive and <= max_batch")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.latency_target = latency_target
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+
+        self.interval = min_interval
+        self.batch_size = min_batch
+        self.requests = 0
+        self.received = 0
+
+    @property
+    def ceiling(self) -> float:
+        "空闲时轮询间隔的上限."
+        if self.latency_target is None:
+            return self.max_interval
+        return max(self.min_interval, min(self.max_interval, self.latency_target * 2))
+
+    def observe(self, received: int, requested: int, backlog: Optional[int]) -> None:
+        """根据一次获取的结果调整轮询间隔与每次获取的数量.
+
+        Args:
+            received (int): 本次获取到的事件数.
+            requested (int): 本次请求获取的数量.
+            backlog (Optional[int]): 获取后 `mirai-api-http` 中剩余的消息数, 未查询时为 None.
+        """
+        self.received += received
+        if received:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.ceiling, self.interval * 1.5)
+
+        if backlog is not None:
+            size = backlog
+        elif received >= requested:
+            size = requested * 2
+        else:
+            size = max(received * 2, self.batch_size // 2)
+        self.batch_size = max(self.min_batch, min(self.max_batch, size))
+
+    async def run(self, app: "GraiaMiraiApplication") -> None:
+        """持续地获取事件并交由应用实例分发, 直到被取消.
+
+        Args:
+            app (GraiaMiraiApplication): 应用实例.
+        """
+        loop = asyncio.get_event_loop()
+        fetching: Optional[asyncio.Task] = None
+        try:
+            while True:
+                requested = self.batch_size
+                if fetching is None:
+                    fetching = loop.create_task(app.fetchRawMessage(requested))
+                    self.requests += 1
+                data = await fetching
+                fetching = None
+
+                backlog = None
+                if len(data) >= requested:
+                    backlog = await app.countMessage()
+                    self.requests += 1
+                self.observe(len(data), requested, backlog)
+
+                if backlog:
+                    fetching = loop.create_task(app.fetchRawMessage(self.batch_size))
+                    self.requests += 1
+                for event in app.decode_events(data):
+                    await app.post_received_event(event)
+                if fetching is None:
+                    await asyncio.sleep(self.interval)
+        finally:
+            if fetching is not None:
+                fetching.cancel()
@@ -0,0 +1,139 @@
+"""websocket 断线后的重连与事件补取.
+
+原先 websocket 断开后固定等待 10 秒再重连, 刷新会话时也以固定的 5 秒间隔重试, 期间推送的事件全部丢失.
+指定 `ReconnectPolicy` 后:
+
+ - 重连与刷新会话以带随机抖动的指数退避进行, 首次重试只等待数十毫秒, 连接后收到事件时退避被重置;
+ - 重新连接后, 在处理新的推送之前, 先以 `countMessage` 与 `fetchMessage` 取出 `mirai-api-http`
+   缓存中积压的事件, 并与最近处理过的事件去重(消息事件以其 Source 的 id 区分), 再继续处理推送.
+"""
+import json
+import random
+from collections import OrderedDict
+from typing import Hashable
+
+
+def event_key(data: dict) -> Hashable:
+    """获取序列化态事件的去重键: 消息事件为 (类型, 群号, 发送者, Source 的 id), 其余事件为其完整内容.
+
+    Args:
+        data (dict): 序列化态的事件.
+
+    Returns:
+        Hashable: 去重键.
+    """
+    chain = data.get("messageChain")
+    if isinstance(chain, list):
+        for element in chain:
+            if isinstance(element, dict) and element.get("type") == "Source":
+                sender = data.get("sender") or {}
+                group = sender.get("group") or {}
+                return (
+                    data.get("type"),
+                    group.get("id"),
+                    sender.get("id"),
+                    element.get("id"),
+                )
+    return (data.get("type"), json.dumps(data, sort_keys=True, default=str))
+
+
+class ReconnectPolicy:
+    """websocket 的重连策略, 由应用实例在启用 websocket 时使用.
+
+    Attributes:
+        base_delay (float): 首次重试前等待的秒数.
+        max_delay (float): 重试间隔的上限, 单位为秒.
+        factor (float): 每次重试后间隔增大的倍数.
+        jitter (float): 随机抖动的比例, 实际的间隔在 `[delay * (1 - jitter), delay]` 之间.
+        backfill (bool): 重新连接后是否补取断线期间积压的事件.
+        backfill_batch (int): 补取时每次获取的数量.
+        history (int): 用于去重的最近事件的数量.
+        attempts (int): 自上次收到事件以来的重试次数.
+        reconnects (int): 重新连接的次数.
+        backfilled (int): 补取并分发的事件数.
+        duplicates (int): 因重复而被略过的事件数.
+    """
+
+    base_delay: float
+    max_delay: float
+    factor: float
+    jitter: float
+    backfill: bool
+    backfill_batch: int
+    history: int
+
+    attempts: int
+    reconnects: int
+    backfilled: int
+    duplicates: int
+
+    seen: "OrderedDict[Hashable, None]"
+    connected: bool
+
+    def __init__(
+        self,
+        base_delay: float = 0.05,
+        max_delay: float = 10.0,
+        factor: float = 2.0,
+        jitter: float = 0.5,
+        backfill: bool = True,
+        backfill_batch: int = 100,
+        history: int = 4096,
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.backfill = backfill
+        self.backfill_batch = backfill_batch
+        self.history = history
+
+        self.attempts = 0
+        self.reconnects = 0
+        self.backfilled = 0
+        self.duplicates = 0
+        self.seen = OrderedDict()
+        self.connected = False
+
+    def delay(self, attempt: int) -> float:
+        "第 attempt 次(从 0 开始)重试前应等待的秒数."
+        delay = min(self.max_delay, self.base_delay * self.factor ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+    def next_delay(self) -> float:
+        "获取下一次重试前应等待的秒数, 并增加重试次数."
+        delay = self.delay(self.attempts)
+        self.attempts += 1
+        return delay
+
+    def on_connected(self) -> bool:
+        """在 websocket 连接成功时调用.
+
+        Returns:
+            bool: 是否为重新连接, 即是否需要补取事件.
+        """
+        reconnected = self.connected
+        self.connected = True
+        if reconnected:
+            self.reconnects += 1
+        return reconnected and self.backfill
+
+    def remember(self, data: dict) -> bool:
+        """记录一个序列化态的事件, 并重置退避.
+
+        Args:
+            data (dict): 序列化态的事件.
+
+        Returns:
+            bool: 该事件此前是否未被记录过; 为 False 时应略过该事件.
+        """
+        self.attempts = 0
+        key = event_key(data)
+        if key in self.seen:
+            self.seen.move_to_end(key)
+            self.duplicates += 1
+            return False
+        self.seen[key] = None
+        while len(self.seen) > self.history:
+            self.seen.popitem(last=False)
+        return True
@@ -0,0 +1,284 @@
+"""发送消息时使用的调度器, 用于对发出的消息进行限速.
+
+- 每个发送对象(群组, 好友, 临时会话)各自拥有一个令牌桶, 另有一个全局的令牌桶;
+- 各个发送对象之间以轮转(round-robin)的方式公平地发送, 同一对象同时最多只有一条消息正在发送;
+- 同时进行的请求数量不超过 `max_in_flight`;
+- 等待发送的消息数量达到 `high_water` 时, 新的消息会被直接拒绝(`SendQueueFull`).
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Set, Tuple
+
+from .exceptions import SendQueueFull
+
+
+class TokenBucket:
+    """令牌桶.
+
+    Attributes:
+        rate (float): 每秒补充的令牌数.
+        capacity (float): 令牌桶的容量, 即允许的突发数量.
+        tokens (float): 当前的令牌数.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated: float
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        "距离下一个令牌可用还需要等待的秒数, 为 0 时表示当前即可消耗一个令牌."
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+
+class SendRequest:
+    "一条等待发送的消息: 实际的发送操作及其结果."
+
+    __slots__ = ("action", "future")
+
+    action: Callable[[], Awaitable[Any]]
+    future: "asyncio.Future"
+
+    def __init__(self, action: Callable[[], Awaitable[Any]], future: "asyncio.Future") -> None:
+        self.action = action
+        self.future = future
+
+
+class SendScheduler:
+    """发送调度器, 由应用实例在发送消息时使用.
+
+    Attributes:
+        target_rate (float): 每个发送对象每秒最多发送的消息数.
+        target_burst (float): 每个发送对象允许的突发数量.
+        global_rate (float): 整个账号每秒最多发送的消息数.
+        global_burst (float): 整个账号允许的突发数量.
+        max_in_flight (int): 同时进行的发送请求的最大数量.
+        high_water (int): 等待发送的消息数量的上限, 达到后新的消息将被拒绝.
+        shed (int): 因超过上限而被拒绝的消息数.
+    """
+
+    target_rate: float
+    target_burst: float
+    global_rate: float
+    global_burst: float
+    max_in_flight: int
+    high_water: int
+    shed: int
+
+    global_bucket: TokenBucket
+    buckets: Dict[Hashable, TokenBucket]
+    queues: Dict[Hashable, Deque[SendRequest]]
+    ring: Deque[Hashable]
+    in_flight: Set[Hashable]
+
+    _depth: int
+    _task: Optional[asyncio.Task]
+    _executing: Set[asyncio.Task]
+    _wakeup: Optional[asyncio.Event]
+
+    def __init__(
+        self,
+        target_rate: float = 1.0,
+        target_burst: float = 3,
+        global_rate: float = 5.0,
+        global_burst: float = 10,
+        max_in_flight: int = 4,
+        high_water: int = 1000,
+    ) -> None:
+        if target_rate <= 0 or global_rate <= 0:
+            raise ValueError("rate must be positive")
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        self.target_rate = target_rate
+        self.target_burst = target_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.max_in_flight = max_in_flight
+        self.high_water = high_water
+        self.shed = 0
+
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.buckets = {}
+        self.queues = {}
+        self.ring = deque()
+        self.in_flight = set()
+
+        self._depth = 0
+        self._task = None
+        self._executing = set()
+        self._wakeup = None
+
+    @property
+    def depth(self) -> int:
+        "等待发送的消息数量, 不含正在发送的消息."
+        return self._depth
+
+    def submit(self, target: Hashable, action: Callable[[], Awaitable[Any]]) -> "asyncio.Future":
+        """提交一条等待发送的消息.
+
+        Args:
+            target (Hashable): 发送对象的标识, 同一标识共享限速与轮转的位置.
+            action (Callable[[], Awaitable[Any]]): 实际进行发送的操作.
+
+        Raises:
+            SendQueueFull: 等待发送的消息数量已达到 `high_water`.
+
+        Returns:
+            asyncio.Future: 以发送操作的返回值(或异常)完成的 Future.
+        """
+        if self._depth >= self.high_water:
+            self.shed += 1
+            raise SendQueueFull("there are {0} messages waiting to be sent".format(self._depth))
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+        if len(self.buckets) > 2 * len(self.queues) + 256:
+            self._prune()
+
+        future = asyncio.get_event_loop().create_future()
+        queue = self.queues.get(target)
+        if queue is None:
+            queue = self.queues[target] = deque()
+            self.ring.append(target)
+        queue.append(SendRequest(action, future))
+        self._depth += 1
+        self._wakeup.set()
+        return future
+
+    async def stop(self) -> None:
+        """停止调度, 取消所有尚未发送的消息, 并等待正在发送的请求完成.
+
+        正在发送的请求已经发出, 取消它们无法确定消息是否送达, 因此等待其完成, 使调用者得到确定的结果.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in self.queues.values():
+            for request in queue:
+                request.future.cancel()
+        self.queues.clear()
+        self.ring.clear()
+        self._depth = 0
+        if self._executing:
+            # `_execute` 会将异常交给各自的 future, 自身不会抛出异常.
+            await asyncio.wait(set(self._executing))
+
+    def _bucket(self, target: Hashable) -> TokenBucket:
+        bucket = self.buckets.get(target)
+        if bucket is None:
+            bucket = self.buckets[target] = TokenBucket(self.target_rate, self.target_burst)
+        return bucket
+
+    def _prune(self) -> None:
+        "移除空闲且已经回满的令牌桶; 这些对象再次发送时会重新创建令牌桶, 效果相同."
+        for target, bucket in list(self.buckets.items()):
+            if target in self.queues or target in self.in_flight:
+                continue
+            bucket.refill()
+            if bucket.tokens >= bucket.capacity:
+                del self.buckets[target]
+
+    def _select(self) -> Tuple[Optional[Hashable], Optional[float]]:
+        """按轮转的顺序选出下一个可以发送的对象.
+
+        Returns:
+            Tuple[Optional[Hashable], Optional[float]]: 选出的对象; 若没有, 则同时给出最短的等待时间,
+                为 None 时表示只能等待正在发送的消息完成.
+        """
+        shortest = None
+        for _ in range(len(self.ring)):
+            target = self.ring[0]
+            self.ring.rotate(-1)
+            queue = self.queues[target]
+            while queue and queue[0].future.done():  # 调用方已取消
+                queue.popleft()
+                self._depth -= 1
+            if not queue:
+                self.ring.remove(target)
+                del self.queues[target]
+                continue
+            if target in self.in_flight:
+                continue
+            delay = self._bucket(target).delay()
+            if delay == 0:
+                return target, None
+            if shortest is None or delay < shortest:
+                shortest = delay
+        return None, shortest
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if len(self.in_flight) >= self.max_in_flight or not self._depth:
+                await self._wakeup.wait()
+                continue
+
+            target, delay = self._select()
+            if target is None:
+                if delay is None:
+                    await self._wakeup.wait()
+                else:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+
+            global_delay = self.global_bucket.delay()
+            if global_delay > 0:
+                await asyncio.sleep(global_delay)
+                continue
+
+            self.global_bucket.consume()
+            self._bucket(target).consume()
+            queue = self.queues[target]
+            request = queue.popleft()
+            self._depth -= 1
+            if not queue:
+                del self.queues[target]
+                self.ring.remove(target)
+            self.in_flight.add(target)
+            task = asyncio.ensure_future(self._execute(target, request))
+            self._executing.add(task)
+            task.add_done_callback(self._executing.discard)
+
+    async def _execute(self, target: Hashable, request: SendRequest) -> None:
+        try:
+            result = await request.action()
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            if not request.future.done():
+                request.future.set_result(result)
+        finally:
+            if not request.future.done():
+                request.future.cancel()
+            self.in_flight.discard(target)
+            if self._wakeup is not None:
+                self._wakeup.set()
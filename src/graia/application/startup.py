@@ -0,0 +1,171 @@
+"""并行, 流水线化的应用启动.
+
+`initialize` 原先依次进行 `authenticate`, `activeSession`, `ApplicationLaunchedBlocking` 的监听器,
+`getVersion`, `getConfig` 与 `modifyConfig`, 全部完成后才开始接收事件. 指定 `StartupPipeline` 后,
+启动按依赖关系分为两个阶段, 同一阶段中相互独立的步骤并发进行:
+
+ - 第一阶段: `authenticate` 与 `activeSession` 依次进行, 与之并发的是 `getVersion`(`/about` 不需要会话)
+   以及预热: 预先编译事件解码器的构造器, 将 `CommandRouter` 所需的 `Literature` 前缀登记到前缀树中,
+   并以一次编解码预热 JSON 编解码器;
+ - 第二阶段: 会话可用后, `ApplicationLaunchedBlocking` 的监听器与事件接收方式的检查(`getConfig`,
+   必要时 `modifyConfig`)并发进行. 后者完成后立即开始接收事件(建立 websocket 连接, 或开始轮询),
+   而在监听器全部完成之前, 接收到的事件会等待, 不会被分发; 指定了 `prefetch_contacts` 时,
+   群组列表与好友列表在后台被预先载入联系人目录.
+
+各阶段的耗时被记录在 `timings` 中, 并在初始化完成时输出到日志.
+"""
+import asyncio
+import time
+from typing import TYPE_CHECKING, Awaitable, Dict, Optional, Type
+
+from .event import MiraiEvent
+from .event.decoder import compile_constructor
+from .event.lifecycle import ApplicationLaunched, ApplicationLaunchedBlocking
+
+if TYPE_CHECKING:
+    from . import GraiaMiraiApplication
+
+
+def event_classes(base: Type[MiraiEvent] = MiraiEvent):
+    "递归地列出 `base` 的所有子类."
+    for subclass in base.__subclasses__():
+        yield subclass
+        yield from event_classes(subclass)
+
+
+class StartupPipeline:
+    """应用实例的启动流水线, 由 `initialize` 使用.
+
+    Attributes:
+        warmup (bool): 是否在启动时进行预热.
+        prefetch_contacts (bool): 是否在后台预先载入群组列表与好友列表.
+        early_connect (bool): 是否在事件接收方式检查完成后立即开始接收事件,
+            而非等到 `initialize` 返回; 仅在指定了 `Broadcast` 时生效.
+        timings (Dict[str, float]): 各阶段的耗时, 单位为秒.
+        ready (Optional[asyncio.Event]): 在 `ApplicationLaunchedBlocking` 的监听器全部完成后被设置,
+            此前接收到的事件会等待该事件.
+        fetching (Optional[asyncio.Task]): 提前开始的事件接收任务.
+        prefetching (Optional[asyncio.Task]): 后台载入联系人的任务.
+    """
+
+    warmup: bool
+    prefetch_contacts: bool
+    early_connect: bool
+
+    timings: Dict[str, float]
+    ready: Optional[asyncio.Event]
+    fetching: Optional[asyncio.Task]
+    prefetching: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        warmup: bool = True,
+        prefetch_contacts: bool = False,
+        early_connect: bool = True,
+    ) -> None:
+        self.warmup = warmup
+        self.prefetch_contacts = prefetch_contacts
+        self.early_connect = early_connect
+
+        self.timings = {}
+        self.ready = None
+        self.fetching = None
+        self.prefetching = None
+
+    async def timed(self, phase: str, awaitable: Awaitable) -> None:
+        "等待 `awaitable` 完成, 并将其耗时记为 `phase`."
+        start = time.perf_counter()
+        try:
+            await awaitable
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    async def wait_ready(self) -> None:
+        "等待启动完成; 未在启动中时立即返回."
+        if self.ready is not None and not self.ready.is_set():
+            await self.ready.wait()
+
+    async def warm(self, app: "GraiaMiraiApplication") -> None:
+        """预热启动后才会用到的, 代价较高的惰性状态; 每一步之间让出事件循环, 以免阻塞网络请求.
+
+        Args:
+            app (GraiaMiraiApplication): 应用实例.
+        """
+        codec = app.json_codec
+        codec.loads(codec.dumps({"code": 0, "data": [{"id": 1, "time": 1.0}]}))
+        await asyncio.sleep(0)
+
+        if app.event_decoder.trusted:
+            for event_type in event_classes():
+                compile_constructor(event_type, app.event_decoder.lazy)
+                await asyncio.sleep(0)
+
+        if app.broadcast is not None and app.command_router is not None:
+            for listener in app.broadcast.listeners:
+                app.command_router.literatures_of(listener)
+            await asyncio.sleep(0)
+
+    async def session(self, app: "GraiaMiraiApplication") -> None:
+        await self.timed("authenticate", app.authenticate())
+        await self.timed("activeSession", app.activeSession())
+
+    async def detect_method(self, app: "GraiaMiraiApplication") -> None:
+        await self.timed("config", app.switch_event_detect_method())
+        if self.early_connect and app.broadcast is not None:
+            self.fetching = app.broadcast.loop.create_task(app.getFetching()())
+
+    async def prefetch(self, app: "GraiaMiraiApplication") -> None:
+        try:
+            await self.timed("contacts", app.contacts.prefetch())
+        except Exception as e:
+            app.logger.warn("failed to prefetch contacts: {0!r}".format(e))
+
+    async def run(self, app: "GraiaMiraiApplication") -> None:
+        """按流水线进行启动.
+
+        Args:
+            app (GraiaMiraiApplication): 应用实例.
+
+        Raises:
+            Exception: 认证或激活会话失败时, 原样抛出其异常.
+        """
+        start = time.perf_counter()
+        self.timings.clear()
+        self.ready = asyncio.Event()
+        try:
+            steps = [
+                self.session(app),
+                self.timed("version", app.detect_version()),
+            ]
+            if self.warmup:
+                steps.append(self.timed("warmup", self.warm(app)))
+            await asyncio.gather(*steps)
+
+            steps = [self.detect_method(app)]
+            if app.broadcast is not None:
+                app.broadcast.postEvent(ApplicationLaunched(app))
+                steps.append(
+                    self.timed(
+                        "launched",
+                        app.broadcast.layered_scheduler(
+                            listener_generator=app.broadcast.default_listener_generator(ApplicationLaunchedBlocking),
+                            event=ApplicationLaunchedBlocking(app),
+                        ),
+                    )
+                )
+            if self.prefetch_contacts and app.contacts.enabled:
+                self.prefetching = asyncio.ensure_future(self.prefetch(app))
+            await asyncio.gather(*steps)
+        except BaseException:
+            for task in (self.fetching, self.prefetching):
+                if task is not None:
+                    task.cancel()
+            self.fetching = self.prefetching = None
+            raise
+        finally:
+            self.ready.set()
+            self.timings["total"] = time.perf_counter() - start
+
+    def report(self) -> str:
+        "以 `阶段=耗时` 的形式列出各阶段的耗时."
+        return ", ".join("{0}={1:.3f}s".format(phase, seconds) for phase, seconds in self.timings.items())
@@ -0,0 +1,220 @@
+"""性能基准, 用于比较各个实现在优化前后的耗时.
+
+以 `python -m graia.application.test.benchmark [名称 ...]` 运行; 不指定名称时运行全部基准.
+"""
+import argparse
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+BENCHMARKS: Dict[str, Callable[[int], List[Tuple[str, float]]]] = {}
+
+
+def benchmark(name: str):
+    "将函数登记为基准; 函数接受重复次数, 返回 (实现的名称, 总耗时) 的列表."
+
+    def wrapper(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return wrapper
+
+
+@benchmark("literature")
+def bench_literature(number: int) -> List[Tuple[str, float]]:
+    import getopt
+    import re
+    import shlex
+
+    from graia.application.message.chain import MessageChain
+    from graia.application.message.elements.internal import At, Plain
+    from graia.application.message.parser.literature import Literature
+    from graia.application.message.parser.pattern import BoxParameter, SwitchParameter
+
+    literature = Literature(
+        "remind",
+        arguments={
+            "target": BoxParameter(["target", "to"], "t"),
+            "time": BoxParameter(["time"], "T", default="now"),
+            "repeat": SwitchParameter(["repeat"], "r"),
+            "silent": SwitchParameter(["silent"], "s"),
+        },
+    )
+
+    def legacy_parse(message_chain: MessageChain):
+        # 原先的 `Literature.parse_message`: 以 `shlex.split` 与 `getopt.getopt` 解析 `trans_to_map` 的结果;
+        # 选项表使用预先生成的 `shortopts` 等, 与新的实现相同.
+        string_result, id_elem_map = literature.trans_to_map(message_chain)
+        parsed_args, variables = getopt.getopt(shlex.split(string_result), literature.shortopts, literature.longopts)
+
+        def to_chain(value: str) -> MessageChain:
+            return MessageChain.create(
+                [
+                    Plain(i) if not re.match(r"^\$\d+$", i) else id_elem_map[int(i[1:])]
+                    for i in re.split(r"((?<!\\)\$[0-9]+)", value)
+                    if i
+                ]
+            ).asMerged()
+
+        parsed = {}
+        for k, v in parsed_args:
+            argument = literature.arguments[literature.map_with_bar[k]]
+            parsed[literature.map_with_bar[k]] = (
+                to_chain(v) if isinstance(argument, BoxParameter) else True,
+                argument,
+            )
+        for name, argument in literature.arguments.items():
+            if name not in parsed and argument.default is not None:
+                parsed[name] = (argument.default, argument)
+        return parsed, [to_chain(v) for v in variables]
+
+    message = MessageChain.create(
+        [
+            Plain("-rs --target "),
+            At(123456789),
+            Plain(" --time=\"tomorrow 9:00\" 记得 '带上 伞' "),
+            At(987654321),
+            Plain(" 和 钥匙"),
+        ]
+    ).asMerged()
+
+    return [
+        (
+            "shlex + getopt",
+            timeit.timeit(
+                lambda: legacy_parse(message),
+                number=number,
+            ),
+        ),
+        (
+            "tokenizer",
+            timeit.timeit(lambda: literature.parse_message(message), number=number),
+        ),
+    ]
+
+
+@benchmark("mirai-code")
+def bench_mirai_code(number: int) -> List[Tuple[str, float]]:
+    import regex
+
+    from graia.application.message import mirai_code
+    from graia.application.message.chain import MessageChain
+    from graia.application.message.elements.internal import (
+        At,
+        AtAll,
+        Face,
+        FlashImage,
+        Image,
+        Plain,
+        Source,
+    )
+
+    def legacy_loads(string: str) -> MessageChain:
+        # 原先的 `MessageChain.fromSerializationString`, 仅支持以下几种元素.
+        parse_functions = {
+            "atall": lambda args: AtAll(),
+            "source": lambda args: Source(id=args[0], time=args[1]),
+            "at": lambda args: At(target=args[0], display=args[1]),
+            "face": lambda args: Face(faceId=args[0]),
+            "image": lambda args: Image(imageId=args[0]),
+            "flash": lambda args: FlashImage(imageId=args[0]),
+        }
+        result = []
+        for match in regex.split(r"(\[mirai:.+?\])", string):
+            mirai = regex.fullmatch(r"\[mirai:(.+?)(:(.+?))\]", match)
+            if mirai:
+                args = mirai.group(3).split(",")
+                result.append(parse_functions[mirai.group(1)](args))
+            elif match:
+                result.append(Plain(match.replace("[_", "[")))
+        return MessageChain.create(result)
+
+    message = MessageChain.create(
+        [
+            Source(id=123456, time=1600000000),
+            At(123456789, display="@someone"),
+            Plain(" 看看这张图 [1/2] "),
+            Image(imageId="{01E9451B-70ED-EAE3-B37C-101F1EEBF5B5}.mirai"),
+            Plain(" 还有这个 "),
+            Face(faceId=14),
+            Plain(" 以及一段比较长的文字, 用于模拟普通的聊天内容." * 3),
+        ]
+    )
+    string = mirai_code.dumps(message)
+
+    return [
+        (
+            "legacy loads",
+            timeit.timeit(lambda: legacy_loads(string), number=number),
+        ),
+        ("loads", timeit.timeit(lambda: mirai_code.loads(string), number=number)),
+        ("dumps", timeit.timeit(lambda: mirai_code.dumps(message), number=number)),
+    ]
+
+
+IMPORTS: Dict[str, str] = {
+    "graia.application": "import graia.application",
+    "message.chain": "import graia.application.message.chain",
+    "event.decoder": "import graia.application.event.decoder",
+    "app": "from graia.application import GraiaMiraiApplication",
+    "entry (everything)": "from graia.application.entry import *",
+}
+"import 基准所测量的语句; 每个样本都在新的解释器中执行, 不计解释器本身的启动时间."
+
+RESOLVE_CHECK = """
+import asyncio
+from graia.broadcast import Broadcast
+for name in ("GroupMessage", "MemberJoinEvent", "NudgeEvent"):
+    assert Broadcast.findEvent(name) is not None, name
+async def listener():
+    pass
+loop = asyncio.new_event_loop()
+Broadcast(loop=loop).receiver("MemberJoinEvent")(listener)
+loop.close()
+"""
+"在导入了应用实例的语句之后执行(不计入耗时), 确认创建应用实例之前即可以类型名找到内置事件."
+
+RESOLVING = ("app", "entry (everything)")
+
+
+@benchmark("import")
+def bench_import(number: int) -> List[Tuple[str, float]]:
+    import subprocess
+    import sys
+
+    # 每个样本都需要启动一个解释器, 因此至多取 10 个样本, 以最小值乘以重复次数作为总耗时.
+    samples = max(1, min(number, 10))
+    script = "import time\nt = time.perf_counter()\nexec({0!r})\n" "print(time.perf_counter() - t)\nexec({1!r})"
+    results = []
+    for impl, statement in IMPORTS.items():
+        check = RESOLVE_CHECK if impl in RESOLVING else ""
+        elapsed = min(
+            float(
+                subprocess.run(
+                    [sys.executable, "-c", script.format(statement, check)],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                ).stdout
+            )
+            for _ in range(samples)
+        )
+        results.append((impl, elapsed * number))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    parser.add_argument("-n", "--number", type=int, default=10000)
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"[{name}] x{args.number}")
+        for impl, elapsed in BENCHMARKS[name](args.number):
+            print(f"  {impl:<24}{elapsed:10.4f}s{elapsed / args.number * 1e6:10.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""以内容哈希为键的上传缓存.
+
+`uploadImage` 与 `uploadVoice` 在上传前计算数据的 SHA-1, 并以 (资源种类, 上传类型, 哈希) 为键查询缓存;
+命中时直接使用此前上传所得到的 `imageId`/`voiceId` 与 `url`, 不再重复上传.
+
+缓存分为两层: 内存中的 LRU, 以及可选的, 基于 sqlite 的磁盘缓存(在重启后依然有效).
+应用实例使用异步的 `lookup` 与 `store`, 磁盘缓存的查询与写入在一个专用的线程中进行, 不会阻塞事件循环.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncContextManager, AsyncIterable, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+from .entities import UploadMethods
+
+CacheKey = Tuple[str, str, str]
+
+UploadSource = Union[
+    bytes, Path, BinaryIO, AsyncIterable[bytes], Callable[[], AsyncContextManager[AsyncIterable[bytes]]]
+]
+"""可被上传的数据: 原始数据, 文件的路径, 以二进制模式打开的文件对象, 异步的数据流,
+或每次调用时重新打开数据源的函数(返回一个产出异步数据流的异步上下文管理器, 例如网络图片的下载).
+异步的数据流只能被读取一次, 上传失败后无法重试; 后者则会在每次尝试上传时重新打开."""
+
+file_digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+"以 (路径, 修改时间, 大小) 为键的文件哈希缓存, 使得未变化的本地文件不必被重复读取."
+
+FILE_DIGESTS_SIZE = 1024
+
+file_digests_lock = threading.Lock()
+"`digest_file` 可能在线程池中并发地运行, 对 `file_digests` 的访问需要加锁."
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def digest_file(path: Union[str, Path]) -> str:
+    """计算文件内容的 SHA-1; 在文件未被修改时直接返回此前的结果.
+    需要读取整个文件, 在事件循环中应以 `loop.run_in_executor` 调用.
+
+    Args:
+        path (Union[str, Path]): 文件的路径.
+
+    Returns:
+        str: 十六进制表示的哈希值.
+    """
+    path = os.fspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with file_digests_lock:
+        digest = file_digests.get(key)
+        if digest is not None:
+            file_digests.move_to_end(key)
+            return digest
+
+    hasher = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    with file_digests_lock:
+        file_digests[key] = digest
+        while len(file_digests) > FILE_DIGESTS_SIZE:
+            file_digests.popitem(last=False)
+    return digest
+
+
+def digest_fileobj(file: BinaryIO) -> str:
+    """计算文件对象从当前位置起的内容的 SHA-1, 完成后恢复其位置; 文件对象需要支持 seek.
+    与 `digest_file` 相同, 在事件循环中应以 `loop.run_in_executor` 调用.
+
+    Args:
+        file (BinaryIO): 以二进制模式打开的文件对象.
+
+    Returns:
+        str: 十六进制表示的哈希值.
+    """
+    position = file.tell()
+    hasher = hashlib.sha1()
+    for chunk in iter(lambda: file.read(65536), b""):
+        hasher.update(chunk)
+    file.seek(position)
+    return hasher.hexdigest()
+
+
+class UploadCache:
+    """上传缓存.
+
+    Attributes:
+        max_entries (int): 内存中最多保存的条目数.
+        ttl (Optional[float]): 条目的有效时间, 单位为秒; 为 None 时永不过期.
+        path (Optional[Path]): 磁盘缓存所使用的 sqlite 数据库的路径, 为 None 时不使用磁盘缓存.
+        hits (int): 命中的次数.
+        misses (int): 未命中的次数.
+    """
+
+    max_entries: int
+    ttl: Optional[float]
+    path: Optional[Path]
+    hits: int
+    misses: int
+
+    entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Optional[str]]]]"
+    connection: Optional[sqlite3.Connection]
+
+    _lock: threading.Lock
+    _executor: Optional[ThreadPoolExecutor]
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = Path(path) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+
+        self.entries = OrderedDict()
+        self.connection = None
+        self._lock = threading.Lock()
+        self._executor = None
+        if self.path is not None:
+            self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="upload-cache")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "kind TEXT, method TEXT, digest TEXT, payload TEXT, created REAL, "
+                "PRIMARY KEY (kind, method, digest))"
+            )
+            self.connection.commit()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, kind: str, method: UploadMethods, digest: str) -> Optional[Dict[str, Optional[str]]]:
+        """同步地查询缓存; 在事件循环中应使用 `lookup`.
+
+        Args:
+            kind (str): 资源种类, 为 `image` 或 `voice`.
+            method (UploadMethods): 上传类型.
+            digest (str): 数据的哈希值.
+
+        Returns:
+            Optional[Dict[str, Optional[str]]]: 此前上传所返回的数据, 未命中时为 None.
+        """
+        key = (kind, method.value, digest)
+        entry = self.entries.get(key)
+        if entry is None and self.connection is not None:
+            entry = self._select(key)
+        if self._check(key, entry):
+            return dict(entry[1])
+        if entry is not None and self.connection is not None:
+            self._delete(key)
+        return None
+
+    async def lookup(self, kind: str, method: UploadMethods, digest: str) -> Optional[Dict[str, Optional[str]]]:
+        "与 `get` 相同, 但磁盘缓存的查询在专用的线程中进行."
+        key = (kind, method.value, digest)
+        entry = self.entries.get(key)
+        if entry is None and self.connection is not None:
+            entry = await self._run(self._select, key)
+        if self._check(key, entry):
+            return dict(entry[1])
+        if entry is not None and self.connection is not None:
+            await self._run(self._delete, key)
+        return None
+
+    def put(
+        self,
+        kind: str,
+        method: UploadMethods,
+        digest: str,
+        payload: Dict[str, Optional[str]],
+    ) -> None:
+        """同步地写入缓存; 在事件循环中应使用 `store`.
+
+        Args:
+            kind (str): 资源种类, 为 `image` 或 `voice`.
+            method (UploadMethods): 上传类型.
+            digest (str): 数据的哈希值.
+            payload (Dict[str, Optional[str]]): 上传所返回的数据, 如 `imageId` 与 `url`.
+        """
+        key = (kind, method.value, digest)
+        entry = (time.time(), dict(payload))
+        self._remember(key, entry)
+        if self.connection is not None:
+            self._insert(key, entry)
+
+    async def store(
+        self,
+        kind: str,
+        method: UploadMethods,
+        digest: str,
+        payload: Dict[str, Optional[str]],
+    ) -> None:
+        "与 `put` 相同, 但磁盘缓存的写入在专用的线程中进行."
+        key = (kind, method.value, digest)
+        entry = (time.time(), dict(payload))
+        self._remember(key, entry)
+        if self.connection is not None:
+            await self._run(self._insert, key, entry)
+
+    def discard(self, kind: str, method: UploadMethods, digest: str) -> None:
+        "移除一个条目, 例如在远端已经无法使用该资源时."
+        key = (kind, method.value, digest)
+        self.entries.pop(key, None)
+        if self.connection is not None:
+            self._delete(key)
+
+    def _check(self, key: CacheKey, entry: Optional[Tuple[float, Dict[str, Optional[str]]]]) -> bool:
+        "统计命中与未命中; 条目有效时将其移至内存 LRU 的末尾, 过期时将其移出内存."
+        if entry is not None:
+            if not self._expired(entry[0]):
+                self._remember(key, entry)
+                self.hits += 1
+                return True
+            self.entries.pop(key, None)
+        self.misses += 1
+        return False
+
+    def _run(self, func, *args) -> "asyncio.Future":
+        return asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    def _select(self, key: CacheKey) -> Optional[Tuple[float, Dict[str, Optional[str]]]]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT created, payload FROM uploads WHERE kind=? AND method=? AND digest=?",
+                key,
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row is not None else None
+
+    def _insert(self, key: CacheKey, entry: Tuple[float, Dict[str, Optional[str]]]) -> None:
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(entry[1]), entry[0]),
+            )
+            self.connection.commit()
+
+    def _delete(self, key: CacheKey) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM uploads WHERE kind=? AND method=? AND digest=?", key)
+            self.connection.commit()
+
+    def _remember(self, key: CacheKey, entry: Tuple[float, Dict[str, Optional[str]]]) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def close(self) -> None:
+        "等待正在进行的查询与写入完成, 并关闭磁盘缓存的数据库连接; 会阻塞, 在事件循环中应以 `loop.run_in_executor` 调用."
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.connection is not None:
+            with self._lock:
+                self.connection.close()
+                self.connection = None
@@ -1,5 +1,21 @@
+import asyncio
 import functools
-from typing import Any, Callable, ContextManager, Iterable, List, Union, TypeVar
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    ContextManager,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Union,
+    TypeVar,
+)
 from graia.broadcast.entities.dispatcher import BaseDispatcher
 from graia.broadcast.interfaces.dispatcher import DispatcherInterface
 
@@ -13,12 +29,32 @@ from .exceptions import (
     TooLongMessage,
     UnauthorizedSession,
     UnknownTarget,
+    UploadTooLarge,
 )
-from .context import enter_context
+from .context import application, enter_context
 import inspect
 
+if TYPE_CHECKING:
+    from graia.broadcast import Broadcast
+
 _T = TypeVar("_T")
 
+installed: "weakref.WeakKeyDictionary[Broadcast, Set[str]]" = weakref.WeakKeyDictionary()
+"各个 `Broadcast` 上已经注册过的, 由应用实例提供的监听器或调度器的名称."
+
+
+def install_once(broadcast: "Broadcast", name: str) -> bool:
+    """判断名为 `name` 的监听器或调度器是否尚未在 `broadcast` 上注册过, 并将其记为已注册.
+
+    多个应用实例共用同一个 `Broadcast` 时, 这些监听器只注册一次, 并在执行时从上下文中获取应用实例,
+    而不是为每个应用实例各注册一份(那样每个事件都会使每个应用实例的监听器执行一次).
+    """
+    names = installed.setdefault(broadcast, set())
+    if name in names:
+        return False
+    names.add(name)
+    return True
+
 
 def applicationContextManager(func: Callable):
     @functools.wraps(func)
@@ -44,14 +80,9 @@ def SinceVersion(*version: int):
     def wrapper(func):
         @functools.wraps(func)
         def inside_wrapper(self, *args, **kwargs):
-            if (
-                self.connect_info.current_version
-                and self.connect_info.current_version < version
-            ):
+            if self.connect_info.current_version and self.connect_info.current_version < version:
                 raise NotSupportedVersion(
-                    "the current version does not support this feature: {0}".format(
-                        self.connect_info.current_version
-                    )
+                    "the current version does not support this feature: {0}".format(self.connect_info.current_version)
                 )
             return func(self, *args, **kwargs)
 
@@ -67,15 +98,10 @@ def DeprecatedSince(*version: int, action: str = "warn"):
     def wrapper(func):
         @functools.wraps(func)
         def inside_wrapper(self, *args, **kwargs):
-            if (
-                self.connect_info.current_version
-                and self.connect_info.current_version > version
-            ):
+            if self.connect_info.current_version and self.connect_info.current_version > version:
                 if action == "error":
                     raise NotSupportedVersion(
-                        "the current version deprecated this feature: {0}".format(
-                            self.connect_info.current_version
-                        )
+                        "the current version deprecated this feature: {0}".format(self.connect_info.current_version)
                     )
                 elif action == "warn":
                     import warnings
@@ -126,6 +152,12 @@ def print_traceback_javay():
 
 
 class AppMiddlewareAsDispatcher(BaseDispatcher):
+    """为监听器提供应用实例的全局调度器.
+
+    多个应用实例共用同一个 `Broadcast` 时, 提供的是当前上下文(由 `enter_context` 设置)中的应用实例,
+    即接收到该事件的应用实例; 在上下文之外时, 退而使用创建本调度器的应用实例.
+    """
+
     always = True
     context: ContextManager
 
@@ -133,7 +165,7 @@ class AppMiddlewareAsDispatcher(BaseDispatcher):
         self.app = app
 
     def beforeExecution(self, interface: "DispatcherInterface"):
-        self.context = enter_context(self.app, interface.event)
+        self.context = enter_context(application.get(self.app), interface.event)
         self.context.__enter__()
 
     def afterExecution(self, interface: "DispatcherInterface", exception, tb):
@@ -143,7 +175,7 @@ class AppMiddlewareAsDispatcher(BaseDispatcher):
         from graia.application import GraiaMiraiApplication
 
         if interface.annotation is GraiaMiraiApplication:
-            return self.app
+            return application.get(self.app)
 
 
 def context_enter_auto(context):
@@ -212,3 +244,59 @@ class AutoUnpackTuple:
 
 def yes_or_no(value: bool) -> str:
     return "yes" if value else "no"
+
+
+async def iterate_file(file: BinaryIO, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    "在线程池中分块读取一个文件对象, 使读取不会阻塞事件循环."
+    loop = asyncio.get_event_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, file.read, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def iterate_stream(stream, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    """分块读取一个具有 `async read(n)` 方法的数据流, 例如 `aiohttp.StreamReader` 与 `asyncio.StreamReader`.
+
+    这些数据流自身的异步迭代是按行进行的, 而二进制数据中的一行可能超过其缓冲区的上限.
+    """
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class LimitedStream:
+    """转发一个异步的数据流, 同时统计其长度并(可选地)计算哈希; 长度超过上限时中止.
+
+    Attributes:
+        limit (Optional[int]): 长度的上限, 单位为字节, 为 None 时不作限制.
+        size (int): 已经转发的长度.
+        exceeded (bool): 数据流是否因超过上限而被中止.
+    """
+
+    limit: Optional[int]
+    size: int
+    exceeded: bool
+
+    def __init__(self, source: AsyncIterable[bytes], limit: Optional[int] = None, hasher=None) -> None:
+        self.source = source
+        self.limit = limit
+        self.hasher = hasher
+        self.size = 0
+        self.exceeded = False
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[bytes]:
+        async for chunk in self.source:
+            self.size += len(chunk)
+            if self.limit is not None and self.size > self.limit:
+                self.exceeded = True
+                raise UploadTooLarge("the data is larger than the limit of {0} bytes".format(self.limit))
+            if self.hasher is not None:
+                self.hasher.update(chunk)
+            yield chunk